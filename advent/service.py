@@ -202,6 +202,15 @@ def _get_supabase_client():
     return client if client else None
 
 
+def _invalidate_trainer_record(trainer_username: str) -> None:
+    """Let the host app drop its cached trainer row after a stamp award."""
+    if not has_app_context():
+        return
+    invalidator = current_app.config.get("TRAINER_RECORD_INVALIDATOR")
+    if callable(invalidator):
+        invalidator(trainer_username)
+
+
 def _get_user_opened_days_sql(user_id: int) -> List[int]:
     rows: List[AdventClaim] = (
         AdventClaim.query.filter_by(user_id=user_id)
@@ -268,6 +277,7 @@ def award_advent_passport_stamp(trainer_username: Optional[str], day: int) -> Tu
     }
     try:
         client.rpc("lugia_admin_adjust", payload).execute()
+        _invalidate_trainer_record(trainer_username)
         return True, None
     except Exception as exc:  # pragma: no cover - external dependency
         _log_supabase_warning("awarding advent passport stamp", exc)
@@ -1,22 +1,21 @@
 import os
 import copy
+import csv
 import hashlib
 import json
-import requests
 import uuid
 import re
 import math
 import secrets
+import threading
 from collections import Counter, defaultdict
-from flask import Flask, render_template, abort, request, redirect, url_for, session, flash, send_from_directory, jsonify, g, make_response, current_app
+from flask import Flask, Response, render_template, abort, request, redirect, url_for, session, flash, send_from_directory, jsonify, g, make_response, current_app, has_request_context
 from werkzeug.utils import secure_filename
-from PIL import Image
 from pywebpush import webpush, WebPushException
-import pytesseract
 from datetime import datetime, date, timezone, timedelta
 from dateutil import parser
 import io, base64, time
-from markupsafe import Markup
+from markupsafe import Markup, escape
 from pathlib import Path
 from zoneinfo import ZoneInfo
 from urllib.parse import urlencode, quote_plus
@@ -25,7 +24,20 @@ from bleach.linkifier import DEFAULT_CALLBACKS
 from typing import Any, Optional
 from sqlalchemy import or_
 
-from rdab.trainer_detection import extract_trainer_name
+from rdab.assets import AssetManifest
+from rdab.bulletin_feed import VISIBLE_STATUSES, BulletinFeed
+from rdab.cache import CircuitBreaker, CircuitOpenError, MtimeMemo, StaleWhileRevalidateCache, TTLCache
+from rdab.event_catalog import EventCatalog
+from rdab.http_transport import CallPolicy, HttpTransport, request_not_sent
+from rdab.query_log import QueryLog, describe_postgrest_call
+from rdab.inbox_feed import compare_keys, decode_cursor, encode_cursor, keyset_condition, merge_sorted, pg_quote
+from rdab.jobs import JobFailed, JobQueue, RetryJob
+from rdab.stamp_icons import StampIconRegistry
+from rdab.stats_engine import StatsEngine
+from rdab.ocr import OcrEngine, OcrError, extract_trainer_name
+from rdab.unread_counts import UnreadCounter
+from rdab.upcoming_events import UpcomingEvents
+from rdab.uploads import process_image, spool_upload, sweep_spool, thumbnail_key, thumbnail_url, upload_object_key
 from extensions import db
 from advent import create_advent_blueprint, create_player_advent_blueprint
 from advent.service import load_advent_config
@@ -46,6 +58,18 @@ def _env_flag(name: str, default: bool) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    """Parse integer tuning knobs from the environment, falling back on bad input."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return max(minimum, int(value))
+    except ValueError:
+        print(f"⚠️ Invalid {name} value: {value!r}. Using default {default}.")
+        return default
+
+
 USE_SUPABASE = _env_flag("USE_SUPABASE", True)  # ✅ Supabase for stamps/meetups
 MAINTENANCE_MODE = _env_flag("MAINTENANCE_MODE", False)  # ⛔️ Change to True to enable maintenance mode
 USE_GEOCACHE_QUEST = _env_flag("USE_GEOCACHE_QUEST", False)  # 🧭 Toggle Geocache quest endpoints
@@ -73,6 +97,10 @@ MAX_TRAINER_LEVEL = 80
 INBOX_PAGE_SIZE = 20
 INBOX_METADATA_READ_KEY = "read_by"
 INBOX_METADATA_HIDDEN_KEY = "hidden_for"
+# Per-trainer read/hidden state lives in notification_receipts once
+# scripts/migrate_notification_receipts.py has backfilled it.
+USE_NOTIFICATION_RECEIPTS = _env_flag("USE_NOTIFICATION_RECEIPTS", False)
+NOTIFICATION_RECEIPTS_TABLE = "notification_receipts"
 DIGITAL_CODE_KEYWORDS = ("code",)
 
 # ====== Auth security settings ======
@@ -134,9 +162,9 @@ ABOUT_CREDIT_AUTHOR = "admin"
 
 # Try to import Supabase client
 try:
-    from supabase import create_client, Client  # type: ignore
+    from supabase import create_client, Client, ClientOptions  # type: ignore
 except Exception:
-    create_client, Client = None, None
+    create_client, Client, ClientOptions = None, None, None
 
 # ====== Flask setup ======
 app = Flask(__name__)
@@ -173,6 +201,7 @@ def check_maintenance_mode():
         "static",
         "manifest",
         "service_worker",
+        "offline_page",
         "maintenance",
         "home",
     }
@@ -183,6 +212,70 @@ def check_maintenance_mode():
     if MAINTENANCE_MODE:
         return render_template("maintenance.html"), 503
 
+# ====== Static asset pipeline ======
+# scripts/build_assets.py writes hashed, compressed copies of static/ images
+# to static/build plus a manifest. url_for("static", ...) resolves through it
+# to the hashed original, so rendered URLs are the same for every client and
+# safe to keep in shared caches (stamp icons, passport projections). Serving
+# a hashed image picks its WebP/AVIF variant from that image request's Accept
+# header (with Vary: Accept). Hashed files are cached for a year; without a
+# build everything serves as before.
+USE_ASSET_MANIFEST = _env_flag("USE_ASSET_MANIFEST", True)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STATIC_ASSETS = AssetManifest(Path(app.static_folder), enabled=USE_ASSET_MANIFEST)
+
+
+def _accepted_image_types() -> frozenset:
+    """Explicitly listed image types from the request's Accept header (no wildcards)."""
+    if not has_request_context():
+        return frozenset()
+    accepted = g.get("accepted_image_types")
+    if accepted is None:
+        accepted = frozenset(value for value, quality in request.accept_mimetypes
+                             if quality > 0 and value.startswith("image/"))
+        g.accepted_image_types = accepted
+    return accepted
+
+
+@app.url_defaults
+def hashed_static_urls(endpoint, values):
+    if endpoint == "static" and values.get("filename"):
+        values["filename"] = STATIC_ASSETS.resolve(values["filename"])
+
+
+@app.before_request
+def negotiate_static_variant():
+    """Serve a hashed image's WebP/AVIF variant when this request accepts it."""
+    if request.endpoint != "static" or not request.view_args:
+        return
+    variant = STATIC_ASSETS.variant_for(request.view_args.get("filename", ""), _accepted_image_types())
+    if variant:
+        return app.send_static_file(variant)
+
+
+def static_srcset_attrs(filename: str, sizes: str) -> Markup:
+    """``srcset``/``sizes`` attributes for a static <img>; empty before the first asset build."""
+    candidates = STATIC_ASSETS.srcset(filename)
+    if not candidates:
+        return Markup("")
+    srcset = ", ".join(f"{url_for('static', filename=path)} {width}w" for path, width in candidates)
+    return Markup('srcset="{}" sizes="{}"').format(srcset, sizes)
+
+
+app.jinja_env.globals["static_srcset_attrs"] = static_srcset_attrs
+
+
+@app.after_request
+def cache_hashed_static(response):
+    if request.endpoint != "static":
+        return response
+    requested = (request.view_args or {}).get("filename", "")
+    if STATIC_ASSETS.is_hashed(requested) and response.status_code in (200, 206, 304):
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        if STATIC_ASSETS.has_variants(requested):
+            response.vary.add("Accept")
+    return response
+
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
@@ -287,19 +380,41 @@ COMMUNITY_BULLETIN_POSTS: list[dict] = []
 MAX_BULLETIN_COMMENT_DEPTH = 2  # depth 0 = root, depth 2 = deepest nested reply
 
 
+def _bulletin_feed_snapshot() -> list[dict]:
+    """
+    Published + scheduled posts with sections, from READ_CACHE without copying
+    so BULLETIN_FEED can tell when the snapshot changed. Admin writes call
+    invalidate_read_cache("bulletin_posts").
+    """
+    if not _bulletin_supabase_enabled():
+        return []
+    try:
+        return READ_CACHE.get(
+            ("bulletin_posts", "feed"),
+            lambda: _load_bulletin_posts(include_sections=True, status=VISIBLE_STATUSES),
+        )
+    except Exception as exc:
+        print("⚠️ Supabase bulletin feed fetch failed:", exc)
+        return []
+
+
 def get_community_bulletin_posts(include_sections: bool = False) -> list[dict]:
     """Return newest-first RDAB Community Bulletin entries."""
 
-    posts = fetch_bulletin_posts_from_supabase(include_sections=include_sections)
+    posts = BULLETIN_FEED.posts(include_sections=include_sections)
     if not posts:
         posts = copy.deepcopy(COMMUNITY_BULLETIN_POSTS)
-    posts.sort(key=lambda post: parse_dt_safe(post.get("published_at")), reverse=True)
+        posts.sort(key=lambda post: parse_dt_safe(post.get("published_at")), reverse=True)
     return posts
 
 
 def get_community_bulletin_post(slug: str) -> Optional[dict]:
     """Return a single bulletin post by slug, if present."""
 
+    feed_post = BULLETIN_FEED.post(slug)
+    if feed_post:
+        return feed_post
+    # Drafts and not-yet-live posts stay reachable by direct link.
     supa_post = fetch_bulletin_post_from_supabase(slug, include_sections=True)
     if supa_post:
         return supa_post
@@ -382,9 +497,7 @@ def _normalize_supabase_post(row: dict, include_sections: bool = False) -> dict:
     return post
 
 
-def fetch_bulletin_posts_from_supabase(include_sections: bool = False, status: Optional[str] = "published") -> list[dict]:
-    if not _bulletin_supabase_enabled():
-        return []
+def _load_bulletin_posts(include_sections: bool, status: Optional[str | tuple[str, ...]]) -> list[dict]:
     select_cols = [
         "*",
         "author:bulletin_authors(*)",
@@ -393,16 +506,27 @@ def fetch_bulletin_posts_from_supabase(include_sections: bool = False, status: O
     if include_sections:
         select_cols.append("sections:bulletin_post_sections(*)")
     query = supabase.table("bulletin_posts").select(",".join(select_cols)).order("published_at", desc=True)
-    if status:
+    if isinstance(status, tuple):
+        query = query.in_("status", list(status))
+    elif status:
         query = query.eq("status", status)
-    try:
-        data = query.execute().data or []
-    except Exception as exc:
-        print("⚠️ Supabase bulletin posts fetch failed:", exc)
-        return []
+    data = query.execute().data or []
     return [_normalize_supabase_post(row, include_sections=include_sections) for row in data]
 
 
+def fetch_bulletin_posts_from_supabase(include_sections: bool = False, status: Optional[str] = "published") -> list[dict]:
+    if not _bulletin_supabase_enabled():
+        return []
+    return cached_read(
+        ("bulletin_posts", include_sections, status),
+        lambda: _load_bulletin_posts(include_sections, status),
+        fallback=[],
+    )
+
+
+BULLETIN_FEED = BulletinFeed(_bulletin_feed_snapshot, lambda value: parse_dt_safe(value))
+
+
 def fetch_bulletin_post_from_supabase(slug: str, include_sections: bool = True) -> Optional[dict]:
     if not _bulletin_supabase_enabled():
         return None
@@ -631,44 +755,69 @@ def _write_featured_stamps(username: str, stamps: list[dict]) -> None:
         else:
             update_payload[key] = None
     supabase.table("sheet1").update(update_payload).eq("trainer_username", username).execute()
+    invalidate_trainer_record(username)
+
+
+def _bulletin_comment_node(row: dict) -> dict:
+    """API/template shape for one bulletin_post_comments row (replies empty)."""
+    trainer_username = row.get("trainer_username")
+    profile_url = None
+    if trainer_username:
+        try:
+            profile_url = url_for("api_public_trainer_profile", username=trainer_username)
+        except RuntimeError:
+            profile_url = f"/api/trainers/{quote_plus(trainer_username)}/profile"
+    avatar_icon = row.get("trainer_avatar") or _trainer_avatar_fallback(row.get("trainer_username"))
+    return {
+        "id": row.get("id"),
+        "author": trainer_username or "Trainer",
+        "avatar": avatar_icon,
+        "timestamp": row.get("created_at"),
+        "body": row.get("body"),
+        "replies": [],
+        "trainer_username": trainer_username,
+        "trainer_profile_url": profile_url,
+        "parent_id": row.get("parent_comment_id"),
+        "depth": int(row.get("depth") or 0),
+    }
+
+
+def _bulletin_comment_cursor(rows: list[dict]) -> Optional[str]:
+    """Opaque ?since= cursor pointing after the newest of ``rows``."""
+    if not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor([last.get("created_at"), str(last.get("id"))])
 
 
-def fetch_bulletin_comments_from_supabase(post_id: str) -> list[dict]:
+def _fetch_bulletin_comment_rows(post_id: str, since: Optional[list] = None) -> list[dict]:
+    query = (supabase.table("bulletin_post_comments")
+             .select("*")
+             .eq("post_id", post_id))
+    if since and len(since) == 2 and since[0]:
+        query = query.or_(keyset_condition([("created_at", since[0], False), ("id", since[1], False)]))
+    return (query.order("created_at", desc=False)
+            .order("id", desc=False)
+            .execute().data or [])
+
+
+def fetch_bulletin_comments_from_supabase(post_id: str, *, with_cursor: bool = False):
+    """
+    Comment tree for a post (roots with nested replies). With
+    ``with_cursor=True`` returns (tree, cursor) for follow-up ?since= polls.
+    """
     if not _bulletin_supabase_enabled():
-        return []
+        return ([], None) if with_cursor else []
     try:
-        rows = (supabase.table("bulletin_post_comments")
-                .select("*")
-                .eq("post_id", post_id)
-                .order("created_at", desc=False)
-                .execute().data or [])
+        rows = _fetch_bulletin_comment_rows(post_id)
     except Exception as exc:
         print("⚠️ Supabase bulletin comments fetch failed:", exc)
-        return []
+        return ([], None) if with_cursor else []
     by_id: dict[str, dict] = {}
     roots: list[dict] = []
     for row in rows:
-        cid = row.get("id")
-        trainer_username = row.get("trainer_username")
-        profile_url = None
-        if trainer_username:
-            try:
-                profile_url = url_for("api_public_trainer_profile", username=trainer_username)
-            except RuntimeError:
-                profile_url = f"/api/trainers/{quote_plus(trainer_username)}/profile"
-        avatar_icon = row.get("trainer_avatar") or _trainer_avatar_fallback(row.get("trainer_username"))
-        comment = {
-            "id": cid,
-            "author": trainer_username or "Trainer",
-            "avatar": avatar_icon,
-            "timestamp": row.get("created_at"),
-            "body": row.get("body"),
-            "replies": [],
-            "trainer_username": trainer_username,
-            "trainer_profile_url": profile_url,
-            "depth": 0,
-        }
-        by_id[cid] = comment
+        comment = _bulletin_comment_node(row)
+        by_id[comment["id"]] = comment
         parent_id = row.get("parent_comment_id")
         if parent_id and parent_id in by_id:
             parent = by_id[parent_id]
@@ -676,7 +825,10 @@ def fetch_bulletin_comments_from_supabase(post_id: str) -> list[dict]:
             comment["depth"] = parent_depth + 1
             parent["replies"].append(comment)
         else:
+            comment["depth"] = 0
             roots.append(comment)
+    if with_cursor:
+        return roots, _bulletin_comment_cursor(rows)
     return roots
 
 
@@ -761,7 +913,11 @@ def _count_comment_nodes(comments: list[dict]) -> int:
 
 
 def _bulletin_comment_depth(post_id: str, comment_id: str) -> Optional[int]:
-    """Return the nesting depth (0-based) for a comment id, or None if invalid."""
+    """
+    Return the nesting depth (0-based) for a comment id, or None if invalid.
+    Walks the parent chain one query per level; only used for rows written
+    before bulletin_post_comments had stored depth/root_id columns.
+    """
 
     if not comment_id or not _bulletin_supabase_enabled():
         return None
@@ -962,6 +1118,8 @@ def _bulletin_admin_upsert_post(data: dict) -> tuple[bool, dict | str]:
     except Exception as exc:
         print("⚠️ Supabase bulletin post save failed:", exc)
         return False, "Unable to save post"
+    finally:
+        invalidate_read_cache("bulletin_posts")
 
 
 def _bulletin_admin_toggle_feature(post_id: str, value: bool) -> bool:
@@ -969,6 +1127,7 @@ def _bulletin_admin_toggle_feature(post_id: str, value: bool) -> bool:
         return False
     try:
         supabase.table("bulletin_posts").update({"is_featured": value}).eq("id", post_id).execute()
+        invalidate_read_cache("bulletin_posts")
         return True
     except Exception as exc:
         print("⚠️ Supabase toggle feature failed:", exc)
@@ -1023,6 +1182,7 @@ def _bulletin_admin_delete_post(post_id: str) -> bool:
         supabase.table("bulletin_post_comments").delete().eq("post_id", post_id).execute()
         supabase.table("bulletin_post_likes").delete().eq("post_id", post_id).execute()
         supabase.table("bulletin_posts").delete().eq("id", post_id).execute()
+        invalidate_read_cache("bulletin_posts")
         return True
     except Exception as exc:
         print("⚠️ Supabase bulletin post delete failed:", exc)
@@ -1055,6 +1215,7 @@ def _bulletin_admin_upsert_author(data: dict) -> tuple[bool, dict | str]:
         else:
             resp = supabase.table("bulletin_authors").insert(record).execute()
             author = (resp.data or [{}])[0]
+        invalidate_read_cache("bulletin_posts")
         return True, author
     except Exception as exc:
         print("⚠️ Supabase author create failed:", exc)
@@ -1066,6 +1227,7 @@ def _bulletin_admin_delete_author(author_id: str) -> bool:
         return False
     try:
         supabase.table("bulletin_authors").delete().eq("id", author_id).execute()
+        invalidate_read_cache("bulletin_posts")
         return True
     except Exception as exc:
         print("⚠️ Supabase author delete failed:", exc)
@@ -1228,12 +1390,17 @@ def fetch_pvp_tournaments(statuses: list[str] | None = None, limit: int | None =
     """Return tournaments filtered by status (default: upcoming & live)."""
     if statuses is None:
         statuses = ["REGISTRATION", "LIVE"]
-    rows = _supabase_execute(
-        supabase.table("pvp_tournament_summary")
-        .select("*")
-        .in_("status", statuses)
-        .order("start_at", desc=False)
-    , [])
+    rows = []
+    if supabase:
+        rows = cached_read(
+            ("pvp_tournaments", tuple(statuses)),
+            lambda: (supabase.table("pvp_tournament_summary")
+                     .select("*")
+                     .in_("status", statuses)
+                     .order("start_at", desc=False)
+                     .execute().data or []),
+            fallback=[],
+        )
     tournaments: list[dict] = []
     for row in rows:
         start_at = parse_dt_safe(row.get("start_at"))
@@ -1448,6 +1615,7 @@ def register_trainer_for_pvp(tournament_id: str, trainer_name: str, notes: str |
     }
     try:
         resp = supabase.table("pvp_registrations").upsert(payload, on_conflict="tournament_id,trainer_id").execute()
+        invalidate_read_cache("pvp_tournaments")  # registrant_count changes
         data = getattr(resp, "data", None) or []
         if data:
             return data[0], None
@@ -1646,6 +1814,8 @@ def upsert_pvp_tournament(data: dict, actor: str):
     except Exception as exc:
         print("⚠️ PvP tournament save failed:", exc)
         return None, "Unable to save tournament."
+    finally:
+        invalidate_read_cache("pvp_tournaments")
 
     rules_lines = data.get("rules_block", "").splitlines()
     prizes_lines = data.get("prizes_block", "").splitlines()
@@ -1665,6 +1835,7 @@ def update_pvp_tournament_status(tournament_id: str, status: str):
         supabase.table("pvp_tournaments").update({
             "status": status,
         }).eq("id", tournament_id).execute()
+        invalidate_read_cache("pvp_tournaments")
         return True
     except Exception as exc:
         print("⚠️ PvP status update failed:", exc)
@@ -1672,103 +1843,76 @@ def update_pvp_tournament_status(tournament_id: str, status: str):
 
 
 
-def fetch_upcoming_events(limit: int | None = None):
-    """Fetch upcoming meetup events ordered by start time in London timezone."""
-    if not (USE_SUPABASE and supabase):
-        upcoming = []
-    else:
-        upcoming = []
+UPCOMING_EVENTS_TTL_SECONDS = _env_int("UPCOMING_EVENTS_TTL_SECONDS", 120)
 
-    now_local = datetime.now(LONDON_TZ)
-    now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
-    sentinel = datetime.min.replace(tzinfo=timezone.utc)
 
-    if USE_SUPABASE and supabase:
-        try:
-            resp = (supabase.table("events")
-                    .select("id,event_id,name,start_time,end_time,location,url,cover_photo_url")
-                    .order("start_time", desc=False)
-                    .execute())
-            rows = resp.data or []
-        except Exception as exc:
-            print("⚠️ Supabase upcoming events fetch failed:", exc)
-            rows = []
+def _normalize_upcoming_event(row: dict, *, source: str) -> Optional[dict]:
+    """Calendar-ready event from an `events` row or a custom_events.json entry."""
+    sentinel = datetime.min.replace(tzinfo=timezone.utc)
+    start_dt = parse_dt_safe(row.get("start_time"))
+    if start_dt <= sentinel:
+        return None
+    end_dt = parse_dt_safe(row.get("end_time"))
+    if end_dt <= sentinel:
+        end_dt = start_dt + timedelta(hours=2)
 
-        for row in rows:
-            record_id = str(row.get("id") or "").strip()
-            start_dt = parse_dt_safe(row.get("start_time"))
-            if start_dt <= sentinel:
-                continue
-            end_dt = parse_dt_safe(row.get("end_time"))
-            if end_dt <= sentinel:
-                end_dt = start_dt + timedelta(hours=2)
+    record_id = str(row.get("id") or "").strip() if source == "supabase" else (row.get("record_id") or "")
+    event_id = str(row.get("event_id") or "").strip()
+    if not event_id:
+        # Derived from the row, not random, so calendar UIDs and the
+        # /meetups.ics ETag agree across workers.
+        derived = hashlib.sha1(f"{row.get('name')}|{row.get('start_time')}".encode("utf-8")).hexdigest()[:16]
+        event_id = (record_id or f"evt-{derived}") if source == "supabase" else f"local-{derived}"
 
-            start_local = start_dt.astimezone(LONDON_TZ)
-            if start_local < now_local:
-                continue
+    return {
+        "event_id": event_id,
+        "record_id": record_id,
+        "name": row.get("name") or ("Unnamed Meetup" if source == "supabase" else "Community Meetup"),
+        "location": row.get("location") or "",
+        "campfire_url": row.get("url") or "",
+        "cover_photo_url": row.get("cover_photo_url") or "",
+        "start": start_dt,
+        "end": end_dt,
+        "start_local": start_dt.astimezone(LONDON_TZ),
+        "end_local": end_dt.astimezone(LONDON_TZ),
+        "source": source,
+    }
 
-            end_utc = end_dt.astimezone(timezone.utc)
-            if end_utc <= now_utc:
-                continue
 
-            event_id = str(row.get("event_id") or "").strip()
-            if not event_id:
-                event_id = record_id or f"evt-{uuid.uuid4().hex}"
-
-            upcoming.append({
-                "event_id": event_id,
-                "record_id": record_id,
-                "name": row.get("name") or "Unnamed Meetup",
-                "location": row.get("location") or "",
-                "campfire_url": row.get("url") or "",
-                "cover_photo_url": row.get("cover_photo_url") or "",
-                "start": start_dt,
-                "end": end_dt,
-                "start_local": start_local,
-                "end_local": end_dt.astimezone(LONDON_TZ),
-                "source": "supabase",
-            })
+def _load_upcoming_supabase_events() -> list[dict]:
+    """Future `events` rows only; raises so READ_CACHE keeps the last good list."""
+    now_utc = datetime.now(timezone.utc)
+    resp = (supabase.table("events")
+            .select("id,event_id,name,start_time,end_time,location,url,cover_photo_url")
+            .gte("start_time", now_utc.isoformat())
+            .order("start_time", desc=False)
+            .execute())
+    events = (_normalize_upcoming_event(row, source="supabase") for row in resp.data or [])
+    return [event for event in events if event]
 
-    # Add locally managed events
-    local_events = load_custom_events()
-    for row in local_events:
-        start_dt = parse_dt_safe(row.get("start_time"))
-        if start_dt <= sentinel:
-            continue
-        end_dt = parse_dt_safe(row.get("end_time"))
-        if end_dt <= sentinel:
-            end_dt = start_dt + timedelta(hours=2)
 
-        start_local = start_dt.astimezone(LONDON_TZ)
-        if start_local < now_local:
-            continue
+def _upcoming_supabase_events() -> list[dict]:
+    if not (USE_SUPABASE and supabase):
+        return []
+    try:
+        return READ_CACHE.get(("events", "upcoming"), _load_upcoming_supabase_events,
+                              ttl=UPCOMING_EVENTS_TTL_SECONDS)
+    except Exception as exc:
+        print("⚠️ Supabase upcoming events fetch failed:", exc)
+        return []
 
-        end_utc = end_dt.astimezone(timezone.utc)
-        if end_utc <= now_utc:
-            continue
 
-        event_id = str(row.get("event_id") or "").strip()
-        if not event_id:
-            event_id = f"local-{uuid.uuid4().hex}"
+# Re-normalized only when data/custom_events.json changes on disk.
+CUSTOM_UPCOMING_EVENTS = MtimeMemo(
+    CUSTOM_EVENTS_PATH,
+    lambda: [event for event in (_normalize_upcoming_event(row, source="local") for row in load_custom_events()) if event],
+)
+UPCOMING_EVENTS = UpcomingEvents(_upcoming_supabase_events, CUSTOM_UPCOMING_EVENTS.get)
 
-        upcoming.append({
-            "event_id": event_id,
-            "record_id": row.get("record_id") or "",
-            "name": row.get("name") or "Community Meetup",
-            "location": row.get("location") or "",
-            "campfire_url": row.get("url") or "",
-            "cover_photo_url": row.get("cover_photo_url") or "",
-            "start": start_dt,
-            "end": end_dt,
-            "start_local": start_local,
-            "end_local": end_dt.astimezone(LONDON_TZ),
-            "source": "local",
-        })
 
-    upcoming.sort(key=lambda ev: ev["start"])
-    if limit is not None:
-        upcoming = upcoming[:limit]
-    return upcoming
+def fetch_upcoming_events(limit: int | None = None):
+    """Fetch upcoming meetup events ordered by start time in London timezone."""
+    return UPCOMING_EVENTS.events(limit)
 
 def build_google_calendar_link(name: str, location: str, start_dt: datetime, end_dt: datetime, campfire_url: str) -> str:
     """Return a Google Calendar deep link for the provided event."""
@@ -1821,15 +1965,214 @@ SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 EVENTS_CLUB_ID = "8166b35b-0f52-480e-8a0b-85c68f33cec0"
 
+# ====== Outbound HTTP ======
+# One pooled keep-alive transport for every outbound call. Each call site
+# gets its own timeouts/retry budget; GET /admin/http.json shows per-site stats.
+HTTP = HttpTransport(
+    pool_connections=_env_int("HTTP_POOL_CONNECTIONS", 10, minimum=1),
+    pool_maxsize=_env_int("HTTP_POOL_MAXSIZE", 20, minimum=1),
+    keepalive_seconds=_env_int("HTTP_KEEPALIVE_SECONDS", 60, minimum=1),
+    policies={
+        # PostgREST/RPC traffic through supabase-py (reads retried, writes not).
+        "supabase": CallPolicy(read_timeout=_env_int("SUPABASE_TIMEOUT_SECONDS", 20, minimum=1), retries=2),
+        # Raw REST insert fallback: a POST, never retried to avoid duplicate rows.
+        "supabase_rest_insert": CallPolicy(read_timeout=10, retries=0),
+        # Apps Script can be slow to cold-start; retries belong to the job queue.
+        "lugia_refresh": CallPolicy(read_timeout=30, retries=0),
+    },
+)
+
+def _supabase_client_options():
+    if ClientOptions is None:
+        return None
+    try:
+        return ClientOptions(httpx_client=HTTP.httpx_client(site="supabase"))
+    except TypeError:
+        # Older supabase-py without httpx_client support keeps its own transport.
+        return None
+
 supabase = None
 if USE_SUPABASE and create_client and SUPABASE_URL and SUPABASE_KEY:
     try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        options = _supabase_client_options()
+        if options is not None:
+            supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+        else:
+            supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
     except Exception as e:
         print("⚠️ Could not init Supabase client:", e)
         supabase = None
 app.config["SUPABASE_CLIENT"] = supabase
 
+# ====== Query accounting ======
+# Every Supabase round trip (tables, RPCs, blueprints on the shared client) is
+# observed at the transport and logged on `g.query_log`. Admins (and every
+# client in debug mode or with SERVER_TIMING=1) get a Server-Timing header,
+# which names tables, so anonymous visitors never see it by default.
+# LOG_SUPABASE_QUERIES prints one line per request and QUERY_DEBUG_FOOTER
+# overlays the query list on HTML pages for admins.
+SERVER_TIMING_ENABLED = _env_flag("SERVER_TIMING", False)
+LOG_SUPABASE_QUERIES = _env_flag("LOG_SUPABASE_QUERIES", False)
+QUERY_DEBUG_FOOTER = _env_flag("QUERY_DEBUG_FOOTER", False)
+# Requests above this many queries are logged even with LOG_SUPABASE_QUERIES off.
+SUPABASE_QUERY_WARN_COUNT = _env_int("SUPABASE_QUERY_WARN_COUNT", 25)
+SUPABASE_QUERY_REPEAT_THRESHOLD = _env_int("SUPABASE_QUERY_REPEAT_THRESHOLD", 3, minimum=2)
+
+
+def _request_query_log() -> Optional[QueryLog]:
+    try:
+        log = g.get("query_log")
+        if log is None:
+            log = QueryLog()
+            g.query_log = log
+        return log
+    except RuntimeError:
+        return None
+
+
+def _observe_supabase_call(call) -> None:
+    if not call.site.startswith("supabase"):
+        return
+    described = describe_postgrest_call(call.method, call.url, call.request_headers, call.response_headers)
+    if described is None:
+        return
+    log = _request_query_log()
+    if log is None:
+        return
+    table, operation, rows, signature = described
+    log.record(table, operation, rows, call.ms, call.status, signature)
+
+
+HTTP.add_observer(_observe_supabase_call)
+
+
+@app.after_request
+def report_request_queries(response):
+    try:
+        log = g.get("query_log")
+    except RuntimeError:
+        return response
+    if log is None:
+        log = QueryLog()
+    # Only look at the session when there is something to report, so static
+    # and cache-only responses do not pick up Vary: Cookie.
+    if SERVER_TIMING_ENABLED or app.debug or (log.count and session.get("account_type") == "Admin"):
+        response.headers.add("Server-Timing", log.server_timing())
+
+    repeats = log.repeated(SUPABASE_QUERY_REPEAT_THRESHOLD)
+    noisy = SUPABASE_QUERY_WARN_COUNT and log.count >= SUPABASE_QUERY_WARN_COUNT
+    if LOG_SUPABASE_QUERIES or LOG_TRAINER_LOOKUPS or noisy:
+        line = f"🧮 {request.method} {request.path} {response.status_code} {log.summary_line()}"
+        stats = g.get("trainer_lookup_stats")
+        if stats:
+            line += f" sheet1 cache fetches={stats['fetches']} cached={stats['hits']}"
+        if repeats:
+            line += " repeated: " + "; ".join(f"{sig} ×{n}" for sig, n in repeats)
+        print(line)
+
+    if (
+        QUERY_DEBUG_FOOTER
+        and session.get("account_type") == "Admin"
+        and response.mimetype == "text/html"
+        and not response.direct_passthrough
+        and not response.is_streamed
+    ):
+        body = response.get_data(as_text=True)
+        marker = body.rfind("</body>")
+        if marker != -1:
+            # Render without context processors so the footer adds no queries of its own.
+            footer = app.jinja_env.get_template("partials/_query_debug.html").render(query_log=log)
+            response.set_data(body[:marker] + footer + body[marker:])
+    return response
+
+# ====== Read-through cache & circuit breakers ======
+# Slow-changing datasets (events catalog, catalog items, bulletin posts,
+# meetups, PvP tournaments) are served from READ_CACHE: the last good value
+# comes back immediately and is refreshed in the background once older than
+# its TTL, so an upstream incident shows stale data instead of blank pages.
+# Each Supabase table also has a circuit breaker checked at the transport:
+# after SUPABASE_BREAKER_THRESHOLD consecutive failures further calls fail
+# fast for SUPABASE_BREAKER_RESET_SECONDS, then a single probe is allowed.
+# A probe with no outcome after SUPABASE_BREAKER_PROBE_TIMEOUT_SECONDS
+# (default: longer than one call with all its retries) counts as lost.
+SUPABASE_BREAKER_THRESHOLD = _env_int("SUPABASE_BREAKER_THRESHOLD", 5, minimum=1)
+SUPABASE_BREAKER_RESET_SECONDS = _env_int("SUPABASE_BREAKER_RESET_SECONDS", 30, minimum=1)
+SUPABASE_BREAKER_PROBE_TIMEOUT_SECONDS = _env_int(
+    "SUPABASE_BREAKER_PROBE_TIMEOUT_SECONDS",
+    int(HTTP.policy("supabase").read_timeout * (1 + HTTP.policy("supabase").retries)) + 10,
+    minimum=1,
+)
+SUPABASE_BREAKERS: dict[str, CircuitBreaker] = {}
+_SUPABASE_BREAKERS_LOCK = threading.Lock()
+
+
+def _supabase_breaker(table: str) -> CircuitBreaker:
+    with _SUPABASE_BREAKERS_LOCK:
+        breaker = SUPABASE_BREAKERS.get(table)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                table,
+                failure_threshold=SUPABASE_BREAKER_THRESHOLD,
+                reset_seconds=SUPABASE_BREAKER_RESET_SECONDS,
+                probe_timeout=SUPABASE_BREAKER_PROBE_TIMEOUT_SECONDS,
+            )
+            SUPABASE_BREAKERS[table] = breaker
+        return breaker
+
+
+def _guard_supabase_call(site: str, method: str, url: str) -> None:
+    if not site.startswith("supabase"):
+        return
+    described = describe_postgrest_call(method, url)
+    if described is not None:
+        _supabase_breaker(described[0]).allow()
+
+
+def _track_supabase_health(call) -> None:
+    if not call.site.startswith("supabase"):
+        return
+    described = describe_postgrest_call(call.method, call.url)
+    if described is None:
+        return
+    breaker = _supabase_breaker(described[0])
+    # 4xx means a bad query, not an unhealthy upstream.
+    if call.error is not None or (call.status or 0) >= 500 or call.status == 429:
+        breaker.record_failure()
+    elif call.status is not None:
+        breaker.record_success()
+
+
+HTTP.add_guard(_guard_supabase_call)
+HTTP.add_observer(_track_supabase_health)
+
+READ_CACHE = StaleWhileRevalidateCache(
+    ttl=_env_int("READ_CACHE_TTL_SECONDS", 60),
+    max_stale=_env_int("READ_CACHE_MAX_STALE_SECONDS", 86400),
+    context_factory=app.app_context,
+)
+
+
+def cached_read(key: tuple, loader, *, ttl: Optional[float] = None, fallback=None):
+    """
+    Serve ``key`` (a tuple led by the dataset name) from READ_CACHE. The
+    loader must raise on failure so the last good value keeps serving; a
+    cold miss that fails returns ``fallback``. Callers get their own copy.
+    """
+    try:
+        return copy.deepcopy(READ_CACHE.get(key, loader, ttl=ttl))
+    except Exception as exc:
+        print(f"⚠️ Supabase {key[0]} read failed:", exc)
+        try:
+            g.supabase_last_error = str(exc)
+        except RuntimeError:
+            pass
+        return fallback
+
+
+def invalidate_read_cache(*datasets: str) -> None:
+    """Drop cached reads for the datasets a write just touched."""
+    READ_CACHE.invalidate(lambda key: key[0] in datasets)
+
 
 def _clear_supabase_error():
     try:
@@ -1856,7 +2199,7 @@ def _supabase_rest_insert(table: str, payload: dict) -> bool:
         "Prefer": "return=minimal",
     }
     try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=10)
+        resp = HTTP.post(url, site="supabase_rest_insert", json=payload, headers=headers)
         if resp.status_code >= 400:
             print(
                 "❌ Supabase REST insert failed:",
@@ -2072,10 +2415,39 @@ import mimetypes
 import io
 import uuid
 
+# Uploads are spooled to DATA_DIR/upload_spool and their raw bytes are stored
+# under the final key before the request returns, so the URL callers save
+# always works. The "process_upload" job (see rdab/uploads.py) then
+# overwrites that object: decodable images are EXIF-oriented, stripped,
+# downsized and stored as WebP with a thumbs/ copy. The spool and jobs.db are
+# on local disk, so a recycled container can lose the job; the upload then
+# simply stays unoptimized. Spool files left behind by jobs that failed for
+# good are swept on the next upload once UPLOAD_SPOOL_MAX_AGE_SECONDS old.
+# USE_UPLOAD_PIPELINE=0 restores the plain raw upload.
+USE_UPLOAD_PIPELINE = _env_flag("USE_UPLOAD_PIPELINE", True)
+UPLOAD_SPOOL_DIR = DATA_DIR / "upload_spool"
+UPLOAD_SPOOL_MAX_AGE_SECONDS = _env_int("UPLOAD_SPOOL_MAX_AGE_SECONDS", 86400, minimum=3600)
+UPLOAD_MAX_DIMENSION = _env_int("UPLOAD_MAX_DIMENSION", 2048, minimum=256)
+UPLOAD_THUMB_DIMENSION = _env_int("UPLOAD_THUMB_DIMENSION", 400, minimum=64)
+UPLOAD_CACHE_SECONDS = "31536000"  # keys are unique per upload
+# The raw placeholder is replaced by the job, so it must not be cached long.
+UPLOAD_RAW_CACHE_SECONDS = "60"
+
+
+def _upload_error_text(exc: Exception) -> str:
+    err_txt = str(exc)
+    try:
+        if hasattr(exc, "args") and exc.args and isinstance(exc.args[0], dict):
+            err_txt = json.dumps(exc.args[0])
+    except Exception:
+        pass
+    return err_txt
+
+
 def _upload_to_supabase(file_storage, folder="catalog", bucket="catalog"):
     """
-    Uploads a file to the Supabase 'catalog' bucket and returns its public URL.
-    Compatible with supabase-py >= 2.0.
+    Store the raw upload under its final key, queue it for the background
+    pipeline and return its public URL. Compatible with supabase-py >= 2.0.
     """
     if not supabase:
         print("❌ Supabase client not initialized.")
@@ -2083,7 +2455,107 @@ def _upload_to_supabase(file_storage, folder="catalog", bucket="catalog"):
     if not file_storage or not getattr(file_storage, "filename", ""):
         print("❌ No file supplied to upload.")
         return None
+    if not USE_UPLOAD_PIPELINE:
+        return _upload_raw_to_supabase(file_storage, folder=folder, bucket=bucket)
+
+    try:
+        sweep_spool(UPLOAD_SPOOL_DIR, UPLOAD_SPOOL_MAX_AGE_SECONDS)
+    except OSError as exc:
+        print("⚠️ Upload spool sweep failed:", exc)
+    try:
+        object_key = upload_object_key(file_storage.filename, folder)
+        spool_path = spool_upload(file_storage, UPLOAD_SPOOL_DIR)
+    except Exception as e:
+        print(f"❌ Upload spool failed: {_upload_error_text(e)}")
+        return None
+
+    content_type = (
+        file_storage.mimetype
+        or mimetypes.guess_type(file_storage.filename)[0]
+        or "application/octet-stream"
+    )
+    transcode = object_key.endswith(".webp")
+    try:
+        storage = supabase.storage.from_(bucket)
+        storage.upload(
+            object_key,
+            spool_path.read_bytes(),
+            {
+                "content-type": content_type,
+                "cache-control": UPLOAD_RAW_CACHE_SECONDS if transcode else UPLOAD_CACHE_SECONDS,
+            },
+        )
+        public_url = storage.get_public_url(object_key)
+    except Exception as e:
+        spool_path.unlink(missing_ok=True)
+        print(f"❌ Supabase upload failed: {_upload_error_text(e)}")
+        return None
+
+    if not transcode:
+        # Nothing to transcode (PDFs, unknown types): the raw object is final.
+        spool_path.unlink(missing_ok=True)
+        return public_url
 
+    payload = {
+        "spool_path": str(spool_path),
+        "bucket": bucket,
+        "object_key": object_key,
+        "content_type": content_type,
+        "original_bytes": spool_path.stat().st_size,
+    }
+    try:
+        JOB_QUEUE.enqueue("process_upload", payload)
+    except Exception as exc:
+        print("⚠️ Upload job could not be queued, processing inline:", exc)
+        try:
+            _job_process_upload(payload)
+        except Exception as e:
+            # The raw upload is already stored, so the URL still works.
+            spool_path.unlink(missing_ok=True)
+            print(f"⚠️ Upload processing failed, keeping the raw file: {_upload_error_text(e)}")
+    return public_url
+
+
+def _job_process_upload(payload: dict) -> dict:
+    """
+    Transcode a spooled upload and overwrite its raw placeholder (thumbnail
+    first); retried on storage errors.
+    """
+    spool_path = Path(payload["spool_path"])
+    object_key = payload["object_key"]
+    if not spool_path.exists():
+        # The raw upload stays in place; only the optimization is lost.
+        raise JobFailed(f"Spooled upload for {object_key} is gone", {"ok": False})
+    image = process_image(
+        spool_path,
+        object_key=object_key,
+        content_type=payload.get("content_type"),
+        max_dimension=UPLOAD_MAX_DIMENSION,
+        thumb_dimension=UPLOAD_THUMB_DIMENSION,
+    )
+    storage = supabase.storage.from_(payload["bucket"])
+
+    def _store(key: str, data: bytes, content_type: str) -> None:
+        storage.upload(key, data, {"content-type": content_type, "cache-control": UPLOAD_CACHE_SECONDS, "upsert": "true"})
+
+    if image.thumbnail:
+        _store(thumbnail_key(object_key), image.thumbnail, "image/webp")
+    elif thumbnail_url(object_key) != object_key:
+        # Undecodable upload under a .webp key: pages still link its thumbnail.
+        _store(thumbnail_key(object_key), image.data, image.content_type)
+    _store(object_key, image.data, image.content_type)
+    spool_path.unlink(missing_ok=True)
+    return {
+        "ok": True,
+        "object_key": object_key,
+        "bytes": len(image.data),
+        "original_bytes": payload.get("original_bytes"),
+        "thumbnail": bool(image.thumbnail),
+    }
+
+
+def _upload_raw_to_supabase(file_storage, folder="catalog", bucket="catalog"):
+    """Synchronously upload the raw bytes (used when the pipeline is disabled)."""
     try:
         # Build unique key
         fname = secure_filename(file_storage.filename)
@@ -2107,15 +2579,12 @@ def _upload_to_supabase(file_storage, folder="catalog", bucket="catalog"):
         print("✅ Uploaded file URL:", public_url)
         return public_url
     except Exception as e:
-        err_txt = str(e)
-        try:
-            if hasattr(e, "args") and e.args and isinstance(e.args[0], dict):
-                err_txt = json.dumps(e.args[0])
-        except Exception:
-            pass
-        print(f"❌ Supabase upload failed: {err_txt}")
+        print(f"❌ Supabase upload failed: {_upload_error_text(e)}")
         return None
 
+
+app.jinja_env.filters["thumbnail"] = thumbnail_url
+
 def _is_allowed_image_file(filename: str) -> bool:
     if not filename or "." not in filename:
         return False
@@ -2204,11 +2673,59 @@ VAPID_CLAIMS = {"sub": "mailto:raidingdoncaster@gmail.com"}
 def manifest():
     return send_from_directory('static', 'manifest.json')
 
+# The worker precaches this shell and keeps the last dashboard/passport HTML
+# for poor venue signal; its version follows the asset manifest so each
+# asset build installs a new worker and drops old caches.
+SERVICE_WORKER_SHELL = (
+    "styles.css",
+    "js/overlay-manager.js",
+    "nav/pikachu-card.png",
+    "nav/stamp-icon.png",
+    "nav/mail-icon.png",
+    "icons/app-icon-192.png",
+    "icons/app-icon-512.png",
+)
+SERVICE_WORKER_NETWORK_FIRST = ("dashboard", "passport")
+# Any request to these clears the cached pages, so one trainer's dashboard is
+# never shown to the next person who signs in on the same device.
+SERVICE_WORKER_LOGIN_ENDPOINTS = ("login", "api_session_login", "admin_login", "signup")
+SERVICE_WORKER_PAGE_TIMEOUT_MS = _env_int("SERVICE_WORKER_PAGE_TIMEOUT_MS", 3000, minimum=500)
+SERVICE_WORKER_SOURCE = MtimeMemo(
+    Path(app.static_folder) / "service-worker.js",
+    lambda: (Path(app.static_folder) / "service-worker.js").read_text(encoding="utf-8"),
+)
+
+
 @app.route("/service-worker.js")
 def service_worker():
-    response = make_response(send_from_directory("static", "service-worker.js"))
+    source = SERVICE_WORKER_SOURCE.get()
+    shell = [url_for("static", filename=name) for name in SERVICE_WORKER_SHELL]
+    shell += [url_for("offline_page"), url_for("manifest")]
+    version = hashlib.sha256(
+        "\n".join([STATIC_ASSETS.version, source, *shell]).encode("utf-8")
+    ).hexdigest()[:12]
+    config = {
+        "version": version,
+        "shell": shell,
+        "offlineUrl": url_for("offline_page"),
+        "networkFirstPages": [url_for(endpoint) for endpoint in SERVICE_WORKER_NETWORK_FIRST],
+        "logoutPaths": [url_for("logout"), url_for("logout_everywhere")],
+        "loginPaths": [url_for(endpoint) for endpoint in SERVICE_WORKER_LOGIN_ENDPOINTS],
+        "pageTimeoutMs": SERVICE_WORKER_PAGE_TIMEOUT_MS,
+    }
+    body = f"self.RDAB_SW_CONFIG = {json.dumps(config)};\n{source}"
+    response = make_response(body)
+    response.headers["Content-Type"] = "application/javascript; charset=utf-8"
     response.headers["Cache-Control"] = "no-cache"
-    return response
+    response.set_etag(version)
+    return response.make_conditional(request)
+
+
+@app.route("/offline")
+def offline_page():
+    # Precached by the service worker, so render without the per-trainer
+    # context processors.
+    return app.jinja_env.get_template("offline.html").render(url_for=url_for)
 
 # ===== Header =====
 @app.context_processor
@@ -2219,17 +2736,13 @@ def inject_header_data():
     inbox_preview = []
 
     if trainer and supabase:
-        # Stamp count from Supabase.sheet1
-        try:
-            r = (supabase.table("sheet1")
-                 .select("stamps")
-                 .eq("trainer_username", trainer)
-                 .limit(1)
-                 .execute())
-            if r.data:
-                current_stamps = int(r.data[0].get("stamps") or 0)
-        except Exception as e:
-            print("⚠️ header stamps fetch failed:", e)
+        # Stamp count from the request's cached sheet1 record
+        user = get_current_trainer_user()
+        if user:
+            try:
+                current_stamps = int(user.get("stamps") or 0)
+            except (TypeError, ValueError):
+                current_stamps = 0
 
         # Latest inbox messages (subject + created_at)
         try:
@@ -2269,11 +2782,104 @@ def normalize_account_type(value: str | None) -> str:
     return cleaned
 
 
-def find_user(username):
-    """Find a trainer in Supabase.sheet1 (case-insensitive)."""
+# ====== Trainer record caches ======
+# Context processors and route handlers all resolve the same trainer during a
+# render; memoize sheet1 lookups on `g` so each request pays for one fetch.
+# Behind that sits a per-worker LRU+TTL cache so busy meetups don't refetch
+# the same few hundred rows; writers evict, other workers age out via TTL.
+LOG_TRAINER_LOOKUPS = _env_flag("LOG_TRAINER_LOOKUPS", False)
+TRAINER_PROFILE_CACHE = TTLCache(
+    maxsize=_env_int("TRAINER_PROFILE_CACHE_SIZE", 512, minimum=1),
+    ttl=_env_int("TRAINER_PROFILE_CACHE_TTL_SECONDS", 60),
+)
+
+
+def _trainer_record_key(username: str | None) -> str:
+    return (username or "").strip().lower()
+
+
+def _request_trainer_records() -> Optional[dict]:
+    """Return the per-request trainer record cache, or None outside a request."""
+    try:
+        cache = g.get("trainer_records")
+        if cache is None:
+            cache = {}
+            g.trainer_records = cache
+        return cache
+    except RuntimeError:
+        return None
+
+
+def _note_trainer_lookup(kind: str) -> None:
+    try:
+        stats = g.get("trainer_lookup_stats")
+        if stats is None:
+            stats = {"fetches": 0, "hits": 0}
+            g.trainer_lookup_stats = stats
+        stats[kind] += 1
+    except RuntimeError:
+        pass
+
+
+def invalidate_trainer_record(*usernames: str | None) -> None:
+    """Drop cached trainer records after a profile write so later reads refetch."""
+    keys = [_trainer_record_key(username) for username in usernames]
+    TRAINER_PROFILE_CACHE.evict(*keys)
+    cache = _request_trainer_records()
+    if cache is None:
+        return
+    for key in keys:
+        cache.pop(key, None)
+
+
+def _invalidate_trainer_state(username: str | None) -> None:
+    """Hook for blueprints that award stamps outside app.py (e.g. Advent)."""
+    invalidate_trainer_record(username)
+    invalidate_passport_projection(username)
+
+
+app.config["TRAINER_RECORD_INVALIDATOR"] = _invalidate_trainer_state
+
+
+def find_user(username, *, fresh: bool = False):
+    """
+    Find a trainer in Supabase.sheet1 (case-insensitive).
+    Served from the request cache, then the worker cache; pass fresh=True
+    where stale credentials matter (login, PIN recovery).
+    """
     if not supabase:
         return None, None
 
+    key = _trainer_record_key(username)
+    cache = _request_trainer_records()
+    if not fresh:
+        if cache is not None and key in cache:
+            _note_trainer_lookup("hits")
+            return None, dict(cache[key])
+        record = TRAINER_PROFILE_CACHE.get(key)
+        if record is not None:
+            _note_trainer_lookup("hits")
+            if cache is not None:
+                cache[key] = record
+            return None, dict(record)
+
+    _, record = _fetch_trainer_record(username)
+    if not record:
+        return None, record
+    canonical_key = _trainer_record_key(record.get("trainer_username"))
+    TRAINER_PROFILE_CACHE.set(key, record)
+    if canonical_key and canonical_key != key:
+        TRAINER_PROFILE_CACHE.set(canonical_key, record)
+    if cache is not None:
+        cache[key] = record
+        # Keep lookups by the canonical username warm as well.
+        cache.setdefault(canonical_key, record)
+    return None, dict(record)
+
+
+def _fetch_trainer_record(username):
+    """Load a trainer row straight from Supabase.sheet1, bypassing caches."""
+    _note_trainer_lookup("fetches")
     try:
         resp = supabase.table("sheet1") \
             .select("*") \
@@ -2401,14 +3007,29 @@ def search_trainers(query, limit=10):
             pass
         return []
 
+LUGIA_REFRESH_URL = "https://script.google.com/macros/s/AKfycbwx33Twu9HGwW4bsSJb7vwHoaBS56gCldNlqiNjxGBJEhckVDAnv520MN4ZQWxI1U9D/exec"
+
+def _run_lugia_refresh():
+    """Call the Apps Script refresh; raises so the job queue can retry."""
+    resp = HTTP.get(LUGIA_REFRESH_URL, site="lugia_refresh", params={"action": "lugiaRefresh"})
+    resp.raise_for_status()
+    # The refresh can sync new Campfire events; reload covers on next use.
+    EVENT_CATALOG.invalidate()
+    invalidate_read_cache("events")
+    STATS_ENGINE.mark_stale()
+    return {"status_code": resp.status_code}
+
 def trigger_lugia_refresh():
-    url = "https://script.google.com/macros/s/AKfycbwx33Twu9HGwW4bsSJb7vwHoaBS56gCldNlqiNjxGBJEhckVDAnv520MN4ZQWxI1U9D/exec"
+    """Queue a Lugia refresh instead of blocking the request for up to 10s."""
     try:
-        requests.get(url, params={"action": "lugiaRefresh"}, timeout=10)
+        JOB_QUEUE.enqueue("lugia_refresh", {}, unique=True)
     except Exception as e:
-        print("⚠️ Lugia refresh error:", e)
+        print("⚠️ Lugia refresh could not be queued, running inline:", e)
+        try:
+            _run_lugia_refresh()
+        except Exception as exc:
+            print("⚠️ Lugia refresh error:", exc)
 
-import os, requests
 LUGIA_URL = os.getenv("LUGIA_WEBAPP_URL")
 
 def adjust_stamps(trainer_username: str, count: int, reason: str, action: str, actor: str = "Admin"):
@@ -2422,16 +3043,21 @@ def adjust_stamps(trainer_username: str, count: int, reason: str, action: str, a
       - Updates the trainer's stamp total
       - Returns the new total
     """
+    ok, msg, _ = adjust_stamps_with_total(trainer_username, count, reason, action, actor)
+    return ok, msg
+
+def adjust_stamps_with_total(trainer_username: str, count: int, reason: str, action: str, actor: str = "Admin"):
+    """adjust_stamps, plus the ledger's post-adjustment total (None if the RPC did not return one)."""
     if not supabase:
-        return False, "Supabase client not initialized on server"
+        return False, "Supabase client not initialized on server", None
 
     # 1) Validate number
     try:
         n = int(count)
         if n <= 0:
-            return False, "Count must be a positive number"
+            return False, "Count must be a positive number", None
     except Exception:
-        return False, "Invalid count"
+        return False, "Invalid count", None
 
     # 2) Work out delta: +n for award, -n for anything else (remove)
     delta = n if action == "award" else -n
@@ -2451,31 +3077,126 @@ def adjust_stamps(trainer_username: str, count: int, reason: str, action: str, a
                 "p_awardedby": awarded_by,
             },
         ).execute()
-
-        data = getattr(resp, "data", None) or {}
-        new_total = None
-        # The RPC might return a dict or a list – handle both safely
-        if isinstance(data, dict):
-            new_total = data.get("new_total")
-        elif isinstance(data, list) and data:
-            maybe = data[0]
-            if isinstance(maybe, dict):
-                new_total = maybe.get("new_total")
-
-        # 5) Build a friendly message
-        msg = f"✅ Updated {target_username}. Applied {'+' if delta > 0 else ''}{delta} stamps."
-        if new_total is not None:
-            msg += f" New total: {new_total}"
-
-        return True, msg
-
     except Exception as e:
         # Store error so admin routes / AJAX can include it in logs
         try:
             g.supabase_last_error = str(e)
         except RuntimeError:
             pass
-        return False, f"❌ Failed to update: {e}"
+        return False, f"❌ Failed to update: {e}", None
+
+    data = getattr(resp, "data", None) or {}
+    new_total = None
+    # The RPC might return a dict or a list – handle both safely
+    if isinstance(data, dict):
+        new_total = data.get("new_total")
+    elif isinstance(data, list) and data:
+        maybe = data[0]
+        if isinstance(maybe, dict):
+            new_total = maybe.get("new_total")
+
+    # 5) The write is committed from here on: bookkeeping errors must not
+    #    turn it into a "failure" an admin would retry.
+    return True, _after_stamp_adjust(target_username, delta, reason, new_total), new_total
+
+def _after_stamp_adjust(target_username: str, delta: int, reason: str, new_total) -> str:
+    """
+    Refresh caches after a committed ledger write and return the admin-facing
+    message. Never raises: a cache that misses this update catches up on its
+    own TTL, whereas an error here would read as a failed (retryable) award.
+    """
+    try:
+        invalidate_trainer_record(target_username)
+        record_passport_ledger_entry(target_username, {"reason": reason or "", "count": delta})
+        if new_total is not None:
+            STATS_ENGINE.record_account(target_username, stamps=new_total)
+    except Exception as exc:
+        print(f"⚠️ Stamp bookkeeping failed for {target_username} after a committed update:", exc)
+    msg = f"✅ Updated {target_username}. Applied {'+' if delta > 0 else ''}{delta} stamps."
+    if new_total is not None:
+        msg += f" New total: {new_total}"
+    return msg
+
+MASS_STAMP_BULK_CHUNK = _env_int("MASS_STAMP_BULK_CHUNK", 100, minimum=1)
+
+# PostgREST "function not found" and Postgres undefined_function.
+RPC_MISSING_CODES = frozenset({"PGRST202", "42883"})
+
+def _rpc_missing(exc: Exception) -> bool:
+    return str(getattr(exc, "code", "") or "") in RPC_MISSING_CODES
+
+def _rpc_never_ran(exc: Exception) -> bool:
+    """
+    True only when an RPC error proves the function did not execute, so a
+    fallback cannot double-apply it. Timeouts and dropped responses may
+    follow a commit and return False.
+    """
+    return _rpc_missing(exc) or isinstance(exc, CircuitOpenError) or request_not_sent(exc)
+
+def award_stamps_bulk(usernames: list[str], count: int, reason: str, actor: str = "Admin"):
+    """
+    Award ``count`` stamps to every trainer via the `lugia_admin_adjust_bulk`
+    RPC, one round trip per MASS_STAMP_BULK_CHUNK trainers. Rows the RPC
+    reports as failed are retried one by one through adjust_stamps, and so
+    are whole chunks whose call provably never ran (function not deployed,
+    connection refused). Any other error may have arrived after Postgres
+    committed, so that chunk is reported as unknown rather than re-applied.
+
+    Returns {username: (ok, message)} in input order; ``ok`` is None when
+    the outcome is unknown and the ledger must be checked before retrying.
+    """
+    awarded_by = (actor or "Admin").strip() or "Admin"
+    targets = [u.strip() for u in dict.fromkeys(usernames) if u and u.strip()]
+    results: dict[str, tuple[bool, str]] = {}
+    retry: list[str] = []
+
+    for i in range(0, len(targets), MASS_STAMP_BULK_CHUNK):
+        chunk = targets[i:i + MASS_STAMP_BULK_CHUNK]
+        if not supabase:
+            retry.extend(chunk)
+            continue
+        try:
+            resp = supabase.rpc(
+                "lugia_admin_adjust_bulk",
+                {
+                    "p_trainers": chunk,
+                    "p_delta": count,
+                    "p_reason": reason or "",
+                    "p_awardedby": awarded_by,
+                },
+            ).execute()
+        except Exception as exc:
+            if _rpc_never_ran(exc):
+                print(f"⚠️ Bulk stamp RPC unavailable for {len(chunk)} trainers; awarding individually:", exc)
+                retry.extend(chunk)
+            else:
+                print(f"⚠️ Bulk stamp RPC outcome unknown for {len(chunk)} trainers; not re-applying:", exc)
+                for username in chunk:
+                    results[username] = (
+                        None,
+                        f"⚠️ Unknown outcome for {username}: {exc}. Check their passport ledger before retrying.",
+                    )
+            continue
+
+        rows = getattr(resp, "data", None) or []
+        by_trainer = {
+            (row.get("trainer") or "").strip().lower(): row
+            for row in rows
+            if isinstance(row, dict)
+        }
+        for username in chunk:
+            row = by_trainer.get(username.lower())
+            if row and row.get("ok"):
+                results[username] = (True, _after_stamp_adjust(username, count, reason, row.get("new_total")))
+            else:
+                if row and row.get("error"):
+                    print(f"⚠️ Bulk stamp award failed for {username}:", row.get("error"))
+                retry.append(username)
+
+    for username in retry:
+        results[username] = adjust_stamps(username, count, reason, "award", awarded_by)
+
+    return {username: results[username] for username in targets}
 
 @app.route("/admin/trainers/<username>/adjust-stamps", methods=["POST"], endpoint="admin_adjust_stamps_v2")
 @app.route("/admin/trainers/<username>/adjust_stamps", methods=["POST"], endpoint="admin_adjust_stamps_legacy")
@@ -2536,35 +3257,64 @@ def admin_mass_stamp():
         or "Admin"
     )
 
+    if payload.get("background"):
+        job_id = JOB_QUEUE.enqueue(
+            "mass_stamp",
+            {"usernames": usernames, "amount": count, "reason": reason, "actor": actor},
+            created_by=actor,
+        )
+        return jsonify({
+            "success": True,
+            "queued": True,
+            "job_id": job_id,
+            "status_url": url_for("admin_job_status", job_id=job_id),
+            "message": "⏳ Stamp awards queued.",
+        }), 202
+
+    response, status = _mass_stamp_response(usernames, count, reason, actor)
+    return jsonify(response), status
+
+def _mass_stamp_response(usernames: list[str], count: int, reason: str, actor: str):
     successes = []
     failures = []
+    unknown = []
 
-    for username in dict.fromkeys(usernames):  # dedupe while preserving order
-        ok, message = adjust_stamps(username, count, reason, "award", actor)
+    for username, (ok, message) in award_stamps_bulk(usernames, count, reason, actor).items():
         entry = {"username": username, "message": message}
         if ok:
             successes.append(entry)
+        elif ok is None:
+            unknown.append(entry)
         else:
             failures.append(entry)
 
     response = {
-        "success": not failures,
+        "success": not failures and not unknown,
         "awarded": successes,
         "failed": failures,
+        "unknown": unknown,
         "summary": {
             "total_requested": len(usernames),
             "awarded": len(successes),
             "failed": len(failures),
+            "unknown": len(unknown),
         },
     }
 
-    if not failures:
-        response["message"] = f"✅ Awarded {count} stamp{'s' if count != 1 else ''} to {len(successes)} trainer{'s' if len(successes) != 1 else ''}."
-    else:
+    if unknown:
+        names = ", ".join(entry["username"] for entry in unknown[:10])
+        more = f" and {len(unknown) - 10} more" if len(unknown) > 10 else ""
+        response["message"] = (
+            f"⚠️ Could not confirm awards for {names}{more}. "
+            "Check their passport ledgers before retrying so nobody is awarded twice."
+        )
+    elif failures:
         response["message"] = "⚠️ Some awards failed. Check details."
+    else:
+        response["message"] = f"✅ Awarded {count} stamp{'s' if count != 1 else ''} to {len(successes)} trainer{'s' if len(successes) != 1 else ''}."
 
-    status = 200 if not failures else 207  # multi-status style response
-    return jsonify(response), status
+    status = 200 if not failures and not unknown else 207  # multi-status style response
+    return response, status
 
 def get_classic_submissions_for_trainer(trainer_username: str) -> list[dict]:
     if not (supabase and trainer_username):
@@ -2613,6 +3363,42 @@ def list_classic_submissions(status: str | None = None) -> list[dict]:
         return []
 
 # ====== Data: stamps, inbox & meetups ======
+EVENT_CATALOG_COLUMNS = "event_id,name,start_time,cover_photo_url,location"
+EVENT_CATALOG_PAGE_SIZE = 1000
+
+
+def _load_event_catalog_rows() -> Optional[list[dict]]:
+    """Page through the events table for the shared catalog; None on failure."""
+    if not (USE_SUPABASE and supabase):
+        return []
+    rows: list[dict] = []
+    offset = 0
+    try:
+        while True:
+            batch = (supabase.table("events")
+                     .select(EVENT_CATALOG_COLUMNS)
+                     .order("start_time", desc=False)
+                     .range(offset, offset + EVENT_CATALOG_PAGE_SIZE - 1)
+                     .execute().data or [])
+            rows.extend(batch)
+            if len(batch) < EVENT_CATALOG_PAGE_SIZE:
+                return rows
+            offset += EVENT_CATALOG_PAGE_SIZE
+    except Exception as exc:
+        print("⚠️ Supabase events catalog refresh failed:", exc)
+        return None
+
+
+# Passport, dashboard and meetup history covers all resolve through this
+# snapshot instead of re-reading the events table per render.
+EVENT_CATALOG = EventCatalog(
+    _load_event_catalog_rows,
+    ttl=_env_int("EVENT_CATALOG_TTL_SECONDS", 300),
+    background=True,
+    retry_seconds=_env_int("EVENT_CATALOG_RETRY_SECONDS", 30, minimum=1),
+)
+
+
 def _advent_day_from_reason(reason: str) -> Optional[int]:
     if not reason:
         return None
@@ -2729,99 +3515,154 @@ def _passport_record_sort_key(record: dict[str, Any]) -> datetime:
         return datetime.min.replace(tzinfo=timezone.utc)
 
 
-def get_passport_stamps(username: str, campfire_username: str | None = None):
+# Reason → icon rules live in rdab/config/stamp_icons.json; the compiled
+# matcher is rebuilt only when that file changes.
+STAMP_ICONS = StampIconRegistry(lambda path: url_for("static", filename=path))
+
+
+def _passport_stamp_from_record(r: dict[str, Any], icons=None) -> Optional[dict]:
+    """Render one lugia_ledger row as a passport stamp; None for removals."""
+    reason = (r.get("reason") or "").strip()
+    event_name = (r.get("eventname") or r.get("event_name") or "").strip()
     try:
-        # 🔑 Pull all ledger rows where trainer OR campfire matches
-        if campfire_username:
-            resp = supabase.table("lugia_ledger").select("*") \
-                .or_(f"trainer.ilike.{username},campfire.ilike.{campfire_username}") \
-                .execute()
-        else:
-            resp = supabase.table("lugia_ledger").select("*") \
-                .ilike("trainer", username) \
-                .execute()
+        count = int(r.get("count") or 1)
+    except (ValueError, TypeError):
+        count = 1
 
-        records = resp.data or []
-        records.sort(key=_passport_record_sort_key, reverse=True)
+    if count <= 0:
+        # Negative ledger entries represent stamp removals; skip showing them.
+        return None
 
-        # Fetch event cover photos
-        ev_rows = supabase.table("events").select("event_id, cover_photo_url").execute().data or []
-        event_map = {
-            str(e.get("event_id", "")).strip().lower(): (e.get("cover_photo_url") or "")
-            for e in ev_rows
-        }
+    # Handle both eventid and event_id
+    event_id = str(r.get("eventid") or r.get("event_id") or "").strip().lower()
+    event_cover = EVENT_CATALOG.cover_for_id(event_id) if event_id else ""
 
-        stamps, total_count = [], 0
-        for r in records:
-            reason = (r.get("reason") or "").strip()
-            event_name = (r.get("eventname") or r.get("event_name") or "").strip()
-            try:
-                count = int(r.get("count") or 1)
-            except (ValueError, TypeError):
-                count = 1
+    icons = icons or STAMP_ICONS.resolver()
+    icon = (
+        _passport_advent_icon(reason)
+        or icons.resolve(reason)
+        or event_cover
+        or icons.icon_url("icons/tickstamp.png")
+    )
 
-            if count <= 0:
-                # Negative ledger entries represent stamp removals; skip showing them.
-                continue
+    reason_label, reason_description = _describe_passport_reason(reason, event_name)
+    timestamp_value = r.get("timestamp") or r.get("created_at")
+    awarded_iso, awarded_display, awarded_time = _format_passport_awarded_at(timestamp_value)
+    stamp_name = reason or event_name or "Passport stamp"
+    return {
+        "name": stamp_name,
+        "count": count,
+        "icon": icon,
+        "reason_label": reason_label,
+        "reason_description": reason_description,
+        "awarded_at_iso": awarded_iso,
+        "awarded_at": awarded_display,
+        "awarded_at_time": awarded_time,
+    }
 
-            total_count += count
-
-            # Handle both eventid and event_id
-            event_id = str(r.get("eventid") or r.get("event_id") or "").strip().lower()
-
-            rl = reason.lower()
-            advent_icon = _passport_advent_icon(reason)
-            if advent_icon:
-                icon = advent_icon
-            elif rl == "signup bonus":
-                icon = url_for("static", filename="icons/signup.png")
-            elif "cdl" in rl:
-                icon = url_for("static", filename="icons/cdl.png")
-            elif "win" in rl:
-                icon = url_for("static", filename="icons/win.png")
-            elif "normal" in rl:
-                icon = url_for("static", filename="icons/normal.png")
-            elif "owed" in rl:
-                icon = url_for("static", filename="icons/owed.png")
-            elif "classic" in rl:
-                icon = url_for("static", filename="icons/classic.png")
-            elif "lccgowa" in rl:
-                icon = url_for("static", filename="icons/gowa.png")
-            elif "beta" in rl:
-                icon = url_for("static", filename="icons/beta.png")
-            elif "newyear26" in rl:
-                icon = url_for("static", filename="icons/newyear26.png")
-            elif "birthday" in rl:
-                icon = url_for("static", filename="icons/birthday.png")
-            elif "awards25" in rl:
-                icon = url_for("static", filename="icons/awards25.png")
-            elif "cdex" in rl:
-                icon = url_for("static", filename="icons/cdex.png")
-            
-            elif event_id and event_id in event_map and event_map[event_id]:
-                icon = event_map[event_id]
-            else:
-                icon = url_for("static", filename="icons/tickstamp.png")
 
-            reason_label, reason_description = _describe_passport_reason(reason, event_name)
-            timestamp_value = r.get("timestamp") or r.get("created_at")
-            awarded_iso, awarded_display, awarded_time = _format_passport_awarded_at(timestamp_value)
-            stamp_name = reason or event_name or "Passport stamp"
-            stamps.append(
-                {
-                    "name": stamp_name,
-                    "count": count,
-                    "icon": icon,
-                    "reason_label": reason_label,
-                    "reason_description": reason_description,
-                    "awarded_at_iso": awarded_iso,
-                    "awarded_at": awarded_display,
-                    "awarded_at_time": awarded_time,
-                }
-            )
+def _passport_ledger_query(columns: str, username: str, campfire_username: str | None = None, **select_options):
+    # 🔑 All ledger rows where trainer OR campfire matches
+    query = supabase.table("lugia_ledger").select(columns, **select_options)
+    if campfire_username:
+        return query.or_(f"trainer.ilike.{username},campfire.ilike.{campfire_username}")
+    return query.ilike("trainer", username)
+
+
+def _load_passport_projection(username: str, campfire_username: str | None = None) -> dict:
+    """Read the trainer's full ledger and render every stamp, newest first."""
+    resp = _passport_ledger_query("*", username, campfire_username).execute()
+
+    records = resp.data or []
+    records.sort(key=_passport_record_sort_key, reverse=True)
+
+    icons = STAMP_ICONS.resolver()
+    stamps, total_count = [], 0
+    for r in records:
+        stamp = _passport_stamp_from_record(r, icons)
+        if stamp is None:
+            continue
+        total_count += stamp["count"]
+        stamps.append(stamp)
+    return {
+        "campfire": (campfire_username or "").strip().lower(),
+        "rows": len(records),
+        "total": total_count,
+        "stamps": stamps,
+    }
+
+
+def _passport_projection_is_current(projection: dict, username: str, campfire_username: str | None) -> bool:
+    """
+    Compare the cached ledger row count with a count-only query, so rows
+    appended by another worker (or outside the app) are seen on the next view.
+    """
+    try:
+        resp = _passport_ledger_query("id", username, campfire_username, count="exact").limit(1).execute()
+    except Exception as exc:
+        print("⚠️ Passport ledger count failed, serving cached stamps:", exc)
+        return True
+    return resp.count is None or resp.count == projection["rows"]
+
+
+# Rendered passports per trainer. Ledger appends made through this worker
+# (adjust_stamps, meetup check-ins) are folded in via
+# record_passport_ledger_entry; appends from anywhere else change the row
+# count checked before each cached view. In-place edits age out via the TTL.
+PASSPORT_PROJECTIONS = TTLCache(
+    maxsize=_env_int("PASSPORT_PROJECTION_CACHE_SIZE", 256, minimum=1),
+    ttl=_env_int("PASSPORT_PROJECTION_TTL_SECONDS", 600),
+)
+
+
+def _passport_projection_key(username: str | None) -> str:
+    return (username or "").strip().lower()
+
+
+def invalidate_passport_projection(*usernames: str | None) -> None:
+    PASSPORT_PROJECTIONS.evict(*(_passport_projection_key(name) for name in usernames))
 
+
+def record_passport_ledger_entry(username: str, record: dict[str, Any]) -> None:
+    """Fold a freshly written ledger row into the trainer's cached passport."""
+    if not has_request_context():
+        # Stamp icons come from url_for, which needs a request; background
+        # jobs drop the projection instead and the next view rebuilds it.
+        invalidate_passport_projection(username)
+        return
+    key = _passport_projection_key(username)
+    projection = PASSPORT_PROJECTIONS.get(key)
+    if projection is None:
+        return
+    entry = dict(record)
+    entry.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+    stamp = _passport_stamp_from_record(entry)
+    # Removals render no stamp but still add a ledger row to the count.
+    # Copy-on-write so requests already holding the old list are unaffected.
+    PASSPORT_PROJECTIONS.set(key, {
+        "campfire": projection["campfire"],
+        "rows": projection["rows"] + 1,
+        "total": projection["total"] + (stamp["count"] if stamp else 0),
+        "stamps": [stamp] + projection["stamps"] if stamp else projection["stamps"],
+    })
+
+
+def get_passport_stamps(username: str, campfire_username: str | None = None):
+    try:
+        key = _passport_projection_key(username)
+        projection = PASSPORT_PROJECTIONS.get(key)
+        if projection is not None and (
+            projection["campfire"] != (campfire_username or "").strip().lower()
+            or not _passport_projection_is_current(projection, username, campfire_username)
+        ):
+            projection = None
+        if projection is None:
+            projection = _load_passport_projection(username, campfire_username)
+            PASSPORT_PROJECTIONS.set(key, projection)
+
+        stamps = projection["stamps"]
         most_recent = stamps[-1] if stamps else None
-        return total_count, stamps, most_recent
+        return projection["total"], stamps, most_recent
 
     except Exception as e:
         print("⚠️ Supabase get_passport_stamps failed:", e)
@@ -2933,9 +3774,7 @@ def get_most_recent_meetup(username: str, campfire_username: str | None = None):
 
         # 1) Try by event_id
         if eid:
-            ev = supabase.table("events").select("event_id, cover_photo_url").eq("event_id", eid).limit(1).execute().data or []
-            if ev and (ev[0].get("cover_photo_url") or ""):
-                icon = ev[0]["cover_photo_url"]
+            icon = EVENT_CATALOG.cover_for_id(eid) or icon
         # 2) Fallback: resolve by name
         if not icon or icon.endswith("tickstamp.png"):
             by_name = cover_from_event_name(title)
@@ -2983,13 +3822,6 @@ def get_meetup_history(username: str, campfire_username: str | None = None):
             if not checked_in_ids:
                 return [], 0
 
-            # Step 3: Fetch events table
-            ev_rows = supabase.table("events") \
-                .select("event_id, name, start_time, cover_photo_url") \
-                .execute().data or []
-
-            ev_map = {str(e.get("event_id", "")).strip().lower(): e for e in ev_rows}
-
             # Step 3b: Fetch check-in counts for each event
             checkins_by_event: dict[str, int] = defaultdict(int)
             unique_ids = sorted(set(checked_in_ids))
@@ -3013,7 +3845,7 @@ def get_meetup_history(username: str, campfire_username: str | None = None):
             # Step 4: Build meetups list
             meetups = []
             for eid in checked_in_ids:
-                ev = ev_map.get(eid)
+                ev = EVENT_CATALOG.get(eid)
                 if ev:
                     meetups.append({
                         "event_id": ev.get("event_id") or eid,
@@ -3035,53 +3867,143 @@ def get_meetup_history(username: str, campfire_username: str | None = None):
 def cover_from_event_name(event_name: str) -> str:
     """
     Find an event cover photo by matching the events.name field to event_name.
-    Tries exact (case-insensitive) first, then a wildcard match.
-    Returns cover_photo_url or "".
+    Tries exact (case-insensitive) first, then a substring match, against the
+    in-memory event catalog. Returns cover_photo_url or "".
     """
     if not (supabase and event_name):
         return ""
+    return EVENT_CATALOG.cover_for_name(event_name)
+
+
+def _inbox_trainer_key(trainer: str | None) -> str:
+    """The one spelling of a trainer stored in, and matched against, inbox read/hidden state."""
+    return (trainer or "").strip().lower()
+
+
+def _inbox_trainer_spellings(trainer: str | None) -> list[str]:
+    """The normalized key, plus the name as typed for array entries written before keys were lowercased."""
+    key = _inbox_trainer_key(trainer)
+    typed = (trainer or "").strip()
+    return [key] if typed == key else [key, typed]
+
+
+def _notifications_for_trainer(trainer: str, columns: str = "*", *, count: str | None = None):
+    """
+    Notifications addressed to the trainer or ALL. With receipts enabled this
+    goes through the `inbox_notifications` RPC, which joins the trainer's
+    notification_receipts row and adds read_at / hidden_at columns.
+    """
+    if USE_NOTIFICATION_RECEIPTS:
+        return supabase.rpc("inbox_notifications", {"p_trainer": trainer}, count=count).select(columns)
+    return supabase.table("notifications").select(columns, count=count)
+
+
+def _notification_state_conditions(trainer: str, *, read: Optional[bool] = None) -> list[str]:
+    """Audience + not-hidden filters, optionally narrowed to read/unread rows."""
+    if USE_NOTIFICATION_RECEIPTS:
+        conditions = ["hidden_at.is.null"]
+        if read is True:
+            conditions.append("read_at.not.is.null")
+        elif read is False:
+            conditions.append("read_at.is.null")
+        return conditions
+    conditions = [f"or(audience.eq.{pg_quote(trainer)},audience.eq.ALL)", _inbox_hidden_condition(trainer)]
+    read_literal = pg_quote("{" + ",".join(_inbox_trainer_spellings(trainer)) + "}")
+    if read is True:
+        conditions.append(f"read_by.ov.{read_literal}")
+    elif read is False:
+        conditions.append(f"or(read_by.is.null,read_by.not.ov.{read_literal})")
+    return conditions
+
+
+def _with_receipt_state(row: dict, trainer: str) -> dict:
+    """Expose receipt state through the legacy read_by list the templates check."""
+    if USE_NOTIFICATION_RECEIPTS and "read_at" in row:
+        row["read_by"] = [_inbox_trainer_key(trainer)] if row.get("read_at") else []
+    return row
+
+
+def _notification_receipts_for(trainer: str, notification_ids: list[str]) -> dict[str, dict]:
+    """The trainer's receipt rows for the given notifications, keyed by id."""
+    ids = [str(i) for i in notification_ids if i]
+    if not ids:
+        return {}
+    resp = (supabase.table(NOTIFICATION_RECEIPTS_TABLE)
+            .select("notification_id, read_at, hidden_at")
+            .eq("trainer", _inbox_trainer_key(trainer))
+            .in_("notification_id", ids)
+            .execute())
+    return {str(row.get("notification_id")): row for row in (resp.data or [])}
+
+
+def _set_notification_receipts(notification_ids: list[str], trainer: str, *,
+                               read: Optional[bool] = None, hidden: bool = False) -> None:
+    """Upsert one receipt row per notification; untouched columns keep their value."""
+    now = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for notification_id in notification_ids:
+        row = {"notification_id": notification_id, "trainer": _inbox_trainer_key(trainer), "updated_at": now}
+        if read is not None:
+            row["read_at"] = now if read else None
+        if hidden:
+            row["hidden_at"] = now
+        rows.append(row)
+    if rows:
+        (supabase.table(NOTIFICATION_RECEIPTS_TABLE)
+         .upsert(rows, on_conflict="notification_id,trainer")
+         .execute())
+
+
+def _recount_unread_notifications(trainer: str) -> Optional[int]:
+    """Exact unread total for the badge, counted server-side without downloading rows."""
+    if not supabase:
+        return 0
     try:
-        # exact (case-insensitive)
-        exact = supabase.table("events") \
-            .select("name, cover_photo_url") \
-            .ilike("name", event_name) \
-            .limit(1).execute().data or []
-        if exact:
-            return exact[0].get("cover_photo_url") or ""
-
-        # wildcard
-        like = supabase.table("events") \
-            .select("name, cover_photo_url") \
-            .ilike("name", f"%{event_name}%") \
-            .limit(1).execute().data or []
-        if like:
-            return like[0].get("cover_photo_url") or ""
+        query = _notifications_for_trainer(trainer, "id", count="exact")
+        query = _inbox_apply_conditions(query, _notification_state_conditions(trainer, read=False))
+        resp = query.limit(1).execute()
+        return int(resp.count or 0)
     except Exception as e:
-        print("⚠️ cover_from_event_name failed:", e)
-    return ""
+        print("⚠️ Supabase unread recount failed:", e)
+        return None
+
+
+# Badge counts are nudged by send_notification and the read/unread handlers,
+# and recounted on a timer once they are older than the reconcile window.
+# Trainers who stop loading pages are dropped after the idle window.
+INBOX_UNREAD = UnreadCounter(
+    _recount_unread_notifications,
+    reconcile_seconds=_env_int("INBOX_UNREAD_RECONCILE_SECONDS", 300),
+    idle_seconds=_env_int("INBOX_UNREAD_IDLE_SECONDS", 1800),
+    maxsize=_env_int("INBOX_UNREAD_MAX_TRAINERS", 4096, minimum=1),
+    context_factory=app.app_context,
+)
+
 
 def get_inbox_preview(trainer: str, limit: int = 3):
-    """Fetch recent notifications + unread count."""
+    """Fetch recent notifications + unread count (memoized per request)."""
     if not supabase:
         return {"preview": [], "unread_count": 0}
+    memo_key = (trainer.lower(), limit)
+    try:
+        memo = g.setdefault("inbox_previews", {})
+    except RuntimeError:
+        memo = {}
+    if memo_key in memo:
+        return memo[memo_key]
     try:
         # Fetch ALL + user-targeted
-        resp = (supabase.table("notifications")
-                .select("id, subject, message, sent_at, read_by")
-                .or_(f"audience.eq.{trainer},audience.eq.ALL")
-                .order("sent_at", desc=True)
-                .limit(limit)
-                .execute())
-        preview = resp.data or []
-
-        # Unread count
-        unread_resp = (supabase.table("notifications")
-                       .select("id, read_by")
-                       .or_(f"audience.eq.{trainer},audience.eq.ALL")
-                       .execute())
-        unread_count = sum(1 for n in unread_resp.data or [] if trainer not in (n.get("read_by") or []))
+        columns = "id, subject, message, sent_at, " + ("read_at" if USE_NOTIFICATION_RECEIPTS else "read_by")
+        query = _inbox_apply_conditions(
+            _notifications_for_trainer(trainer, columns),
+            _notification_state_conditions(trainer),
+        )
+        resp = query.order("sent_at", desc=True).limit(limit).execute()
+        preview = [_with_receipt_state(row, trainer) for row in (resp.data or [])]
 
-        return {"preview": preview, "unread_count": unread_count}
+        result = {"preview": preview, "unread_count": INBOX_UNREAD.get(trainer)}
+        memo[memo_key] = result
+        return result
     except Exception as e:
         print("⚠️ Supabase inbox preview fetch failed:", e)
         return {"preview": [], "unread_count": 0}
@@ -3236,6 +4158,7 @@ def send_notification(audience, subject, message, notif_type="system", metadata=
             if error_text:
                 print("⚠️ Supabase REST notification insert failed:", error_text)
             return None
+    INBOX_UNREAD.record_sent(audience)
 
     if returning:
         if inserted_row and inserted_row.get("id"):
@@ -3794,6 +4717,79 @@ def assign_digital_code_to_trainer(
 
     return True, f"🎉 Sent code {code_value} to {resolved_trainer}."
 
+# ====== Background jobs ======
+# Slow admin work (bulk stamps, code drops, broadcasts, Lugia refreshes) runs
+# on a per-process thread pool fed from a SQLite queue in DATA_DIR, so it
+# survives restarts and the request can return straight away.
+JOB_QUEUE = JobQueue(
+    DATA_DIR / "jobs.db",
+    workers=_env_int("JOB_WORKERS", 2),
+    lease_seconds=_env_int("JOB_LEASE_SECONDS", 600, minimum=1),
+    backoff_seconds=_env_int("JOB_RETRY_BACKOFF_SECONDS", 5),
+    retention_days=_env_int("JOB_RETENTION_DAYS", 7),
+    context_factory=app.app_context,
+)
+
+def _job_mass_stamp(payload: dict) -> dict:
+    response, status = _mass_stamp_response(
+        payload.get("usernames") or [],
+        int(payload.get("amount") or 0),
+        payload.get("reason") or "",
+        payload.get("actor") or "Admin",
+    )
+    return {**response, "status_code": status}
+
+def _job_digital_code_assign(payload: dict) -> dict:
+    ok, msg = assign_digital_code_to_trainer(
+        payload.get("trainer_username") or "",
+        payload.get("actor") or "Admin",
+        payload.get("code_id"),
+        payload.get("subject"),
+        assignment_source=payload.get("assignment_source"),
+        preferred_category=payload.get("preferred_category"),
+        actor_type_hint="admin",
+        reward_description=payload.get("reward_description"),
+        bucket_reason=payload.get("bucket_reason"),
+    )
+    if not ok:
+        raise JobFailed(msg, {"ok": False, "message": msg})
+    return {"ok": True, "message": msg}
+
+def _job_broadcast_notification(payload: dict) -> dict:
+    """Send to every recipient; retries only carry the recipients that failed."""
+    recipients = payload.get("recipients") or []
+    sent = int(payload.get("sent") or 0)
+    failed = []
+    for recipient in recipients:
+        note = send_notification(
+            recipient,
+            payload.get("subject") or "",
+            payload.get("message") or "",
+            notif_type=payload.get("notif_type") or "announcement",
+            metadata={},
+        )
+        if note:
+            sent += 1
+        else:
+            failed.append(recipient)
+    if failed:
+        raise RetryJob(
+            f"Sent {sent} notification(s), but {len(failed)} failed.",
+            {**payload, "recipients": failed, "sent": sent},
+        )
+    return {"ok": True, "sent": sent, "message": f"✅ Sent {sent} notification{'s' if sent != 1 else ''}."}
+
+JOB_QUEUE.register("mass_stamp", _job_mass_stamp)  # not idempotent: never retried wholesale
+JOB_QUEUE.register("digital_code_assign", _job_digital_code_assign)
+JOB_QUEUE.register("broadcast_notification", _job_broadcast_notification, max_attempts=3)
+JOB_QUEUE.register("lugia_refresh", lambda _payload: _run_lugia_refresh(), max_attempts=3)
+JOB_QUEUE.register("process_upload", _job_process_upload, max_attempts=3)
+
+@app.before_request
+def start_job_workers():
+    # Lazily per process: threads started before a gunicorn fork would be lost.
+    JOB_QUEUE.ensure_started()
+
 # ====== Admin Panel ======
 from functools import wraps
 from flask import session, redirect, url_for, flash
@@ -3830,9 +4826,11 @@ def change_account_type(trainer_username: str, new_type: str, actor: str = "Admi
     try:
         resp = supabase.table("sheet1").update({"account_type": label}) \
             .eq("trainer_username", trainer_username).execute()
+        invalidate_trainer_record(trainer_username)
         data = getattr(resp, "data", None)
         if not data:
             return False, f"Trainer not found: {trainer_username}"
+        STATS_ENGINE.record_account(trainer_username, account_type=label)
         return True, f"✅ {trainer_username} is now “{label}”."
     except Exception as e:
         return False, f"❌ Failed to change account type: {e}"
@@ -3881,6 +4879,7 @@ def reset_pin(trainer_username: str, new_pin: str, actor: str = "Admin"):
         hashed = _hash_pin(new_pin, trainer_username)
         resp = supabase.table("sheet1").update({"pin_hash": hashed}) \
             .eq("trainer_username", trainer_username).execute()
+        invalidate_trainer_record(trainer_username)
         data = getattr(resp, "data", None)
         if data:
             return True, "✅ PIN reset."
@@ -3892,6 +4891,7 @@ def reset_pin(trainer_username: str, new_pin: str, actor: str = "Admin"):
     try:
         resp = supabase.table("sheet1").update({"pin": new_pin}) \
             .eq("trainer_username", trainer_username).execute()
+        invalidate_trainer_record(trainer_username)
         data = getattr(resp, "data", None)
         if data:
             return True, "✅ PIN reset."
@@ -4219,6 +5219,8 @@ def update_trainer_username(current_username: str, new_username: str, actor: str
                 .update({"trainer_username": desired})
                 .eq("trainer_username", current_username)
                 .execute())
+        invalidate_trainer_record(current_username, desired)
+        invalidate_passport_projection(current_username, desired)
         data = getattr(resp, "data", None)
         if not data:
             return False, f"Trainer “{current_username}” was not found.", current_username
@@ -4238,6 +5240,7 @@ def update_campfire_username(trainer_username: str, campfire_username: str | Non
                 .update({"campfire_username": value or None})
                 .eq("trainer_username", trainer_username)
                 .execute())
+        invalidate_trainer_record(trainer_username)
         data = getattr(resp, "data", None)
         if not data:
             return False, f"Trainer “{trainer_username}” was not found."
@@ -4258,6 +5261,7 @@ def update_memorable_password(trainer_username: str, new_memorable: str, actor:
                 .update({"memorable_password": new_value})
                 .eq("trainer_username", trainer_username)
                 .execute())
+        invalidate_trainer_record(trainer_username)
         data = getattr(resp, "data", None)
         if not data:
             return False, f"Trainer “{trainer_username}” was not found."
@@ -4278,6 +5282,8 @@ def delete_trainer_account_record(trainer_username: str, actor: str = "Admin"):
                 .delete()
                 .eq("trainer_username", target)
                 .execute())
+        invalidate_trainer_record(target)
+        invalidate_passport_projection(target)
         data = getattr(resp, "data", None)
         # Supabase returns the deleted rows when RLS allows it; treat empty payload as success if no error raised.
         if isinstance(data, list) and not data:
@@ -4526,6 +5532,7 @@ def admin_digital_codes():
         digital_code_bucket_presets=DIGITAL_CODE_BUCKET_PRESETS,
         digital_code_default_bucket=DIGITAL_CODE_DEFAULT_BUCKET,
         digital_code_extra_buckets=extra_bucket_options,
+        background_jobs=JOB_QUEUE.recent(5, kind="digital_code_assign"),
     )
 
 
@@ -4588,18 +5595,29 @@ def admin_digital_codes_assign():
         category_filter = custom_bucket_name
 
     actor = _current_actor()
-    ok, msg = assign_digital_code_to_trainer(
-        trainer_username,
-        actor,
-        code_id,
-        subject,
-        assignment_source=assignment_source,
-        preferred_category=category_filter,
-        actor_type_hint="admin",
-        reward_description=reward_description,
-        bucket_reason=bucket_reason,
-    )
-    flash(msg, "success" if ok else "error")
+    if not (trainer_username or "").strip():
+        flash("Enter a trainer username.", "error")
+        return redirect(url_for("admin_digital_codes"))
+    try:
+        JOB_QUEUE.enqueue(
+            "digital_code_assign",
+            {
+                "trainer_username": trainer_username,
+                "actor": actor,
+                "code_id": code_id,
+                "subject": subject,
+                "assignment_source": assignment_source,
+                "preferred_category": category_filter,
+                "reward_description": reward_description,
+                "bucket_reason": bucket_reason,
+            },
+            created_by=actor,
+        )
+    except Exception as exc:
+        print("⚠️ Failed to queue digital code assignment:", exc)
+        flash("Could not queue the code assignment. Please try again.", "error")
+        return redirect(url_for("admin_digital_codes"))
+    flash(f"⏳ Code for {trainer_username.strip()} queued. Progress shows under Background jobs.", "success")
     return redirect(url_for("admin_digital_codes"))
 
 
@@ -5274,6 +6292,7 @@ def admin_catalog_update(item_id):
 
     try:
         resp = supabase.table("catalog_items").update(data).eq("id", item_id).execute()
+        invalidate_read_cache("catalog_items")
         updated_item = resp.data[0] if resp.data else _fetch_catalog_item(item_id)
         if wants_json_response():
             if not updated_item:
@@ -5300,6 +6319,7 @@ def admin_catalog_delete(item_id):
 
     try:
         supabase.table("catalog_items").delete().eq("id", item_id).execute()
+        invalidate_read_cache("catalog_items")
         flash("🗑️ Item deleted.", "success")
     except Exception as e:
         print("⚠️ Catalog delete failed:", e)
@@ -5350,6 +6370,7 @@ def admin_catalog_create():
             "created_at": datetime.utcnow().isoformat(),
             "updated_at": datetime.utcnow().isoformat()
         }).execute()
+        invalidate_read_cache("catalog_items")
         flash(f"✅ '{name}' created.", "success")
     except Exception as e:
         print("⚠️ admin_catalog_create failed:", e)
@@ -5370,6 +6391,7 @@ def admin_catalog_toggle(item_id):
             "active": new_state,
             "updated_at": datetime.utcnow().isoformat()
         }).eq("id", item_id).execute()
+        invalidate_read_cache("catalog_items")
         flash(("🟢 Online" if new_state else "⚫ Offline"), "success")
     except Exception as e:
         print("⚠️ admin_catalog_toggle failed:", e)
@@ -5398,6 +6420,7 @@ def admin_meetups():
             .lte("date", today) \
             .eq("active", True) \
             .execute()
+        invalidate_read_cache("meetups")
     except Exception as e:
         print("⚠️ Failed auto-disable meetups:", e)
 
@@ -5430,6 +6453,7 @@ def admin_meetups_create():
     }
     try:
         supabase.table("meetups").insert(data).execute()
+        invalidate_read_cache("meetups")
         flash("✅ Meetup created!", "success")
     except Exception as e:
         print("⚠️ Failed creating meetup:", e)
@@ -5456,6 +6480,7 @@ def admin_meetups_update(meetup_id):
     }
     try:
         supabase.table("meetups").update(data).eq("id", meetup_id).execute()
+        invalidate_read_cache("meetups")
         flash("✅ Meetup updated!", "success")
     except Exception as e:
         print("⚠️ Failed updating meetup:", e)
@@ -5475,6 +6500,7 @@ def admin_meetups_delete(meetup_id):
 
     try:
         supabase.table("meetups").delete().eq("id", meetup_id).execute()
+        invalidate_read_cache("meetups")
         flash("🗑️ Meetup deleted.", "success")
     except Exception as e:
         print("⚠️ Failed deleting meetup:", e)
@@ -6139,6 +7165,7 @@ def admin_change_account_type(username):
             .update({"account_type": new_type}) \
             .eq("trainer_username", trainer_username) \
             .execute()
+        invalidate_trainer_record(trainer_username)
         flash(f"✅ {trainer_username}'s account type updated to {new_type}", "success")
     except Exception as e:
         print("⚠️ Error updating account type:", e)
@@ -6180,6 +7207,7 @@ def admin_reset_pin(username):
             .update({"pin_hash": hashed}) \
             .eq("trainer_username", trainer_username) \
             .execute()
+        invalidate_trainer_record(trainer_username)
         flash(f"✅ PIN for {trainer_username} has been reset.", "success")
     except Exception as e:
         print("⚠️ Error resetting PIN:", e)
@@ -6203,16 +7231,27 @@ STATS_GROUP_OPTIONS = [
     ("year", "Yearly"),
 ]
 
-def _load_supabase_table(table: str, columns: str = "*") -> list[dict]:
-    """Return the raw rows for a Supabase table or an empty list on failure."""
+STATS_PAGE_SIZE = 1000
+STATS_EVENT_ID_CHUNK = 90
+
+def _iter_supabase_rows(table: str, columns: str = "*", *, order: tuple[str, ...] = (),
+                        in_filter: tuple[str, list] | None = None,
+                        page_size: int = STATS_PAGE_SIZE):
+    """Yield a table page by page via .range(); errors propagate to the caller."""
     if not (USE_SUPABASE and supabase):
-        return []
-    try:
-        response = supabase.table(table).select(columns).execute()
-        return response.data or []
-    except Exception as exc:
-        print(f"⚠️ {table} fetch failed:", exc)
-        return []
+        return
+    offset = 0
+    while True:
+        query = supabase.table(table).select(columns)
+        if in_filter:
+            query = query.in_(in_filter[0], in_filter[1])
+        for column in order:
+            query = query.order(column, desc=False)
+        batch = query.range(offset, offset + page_size - 1).execute().data or []
+        yield from batch
+        if len(batch) < page_size:
+            return
+        offset += page_size
 
 def _stats_time_bounds(range_key: str):
     now = datetime.now(timezone.utc)
@@ -6236,41 +7275,41 @@ def _stats_time_bounds(range_key: str):
         label = label_lookup["90d"]
     return range_key, start, now, label
 
-def _parse_event_dt(value: str | None):
-    if not value:
-        return None
-    raw = value.replace("Z", "+00:00")
-    try:
-        dt = datetime.fromisoformat(raw)
-    except Exception:
-        try:
-            dt = parser.isoparse(value)
-        except Exception:
-            return None
-    if not dt.tzinfo:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt
-
-def _group_bucket(dt: datetime, group_key: str):
-    if not dt:
-        return ((0,), "Unknown")
-    group_key = group_key.lower()
-    if group_key == "year":
-        return ((dt.year,), str(dt.year))
-    if group_key == "quarter":
-        quarter = ((dt.month - 1) // 3) + 1
-        return ((dt.year, quarter), f"Q{quarter} {dt.year}")
-    # default: month
-    return ((dt.year, dt.month), dt.strftime("%b %Y"))
+def _load_stats_events() -> Optional[list[dict]]:
+    return EVENT_CATALOG.rows()
 
-def _normalize_status(value: str | None) -> str:
-    return (value or "").upper().replace("-", "_").strip()
+def _load_stats_attendance(event_ids: Optional[list] = None) -> Optional[list[dict]]:
+    """Every attendance row, or only those for ``event_ids``; None on failure."""
+    columns = "event_id,campfire_username,display_name,rsvp_status,checked_in_at"
+    try:
+        if event_ids is None:
+            return list(_iter_supabase_rows("attendance", columns))
+        rows: list[dict] = []
+        for i in range(0, len(event_ids), STATS_EVENT_ID_CHUNK):
+            chunk = event_ids[i:i + STATS_EVENT_ID_CHUNK]
+            rows.extend(_iter_supabase_rows("attendance", columns, in_filter=("event_id", chunk)))
+        return rows
+    except Exception as exc:
+        print("⚠️ attendance fetch failed:", exc)
+        return None
 
-def _normalize_user(row: dict) -> str:
-    return (row.get("campfire_username") or row.get("display_name") or "").strip().lower()
+def _load_stats_accounts() -> Optional[list[dict]]:
+    try:
+        return list(_iter_supabase_rows("sheet1", "trainer_username,account_type,stamps"))
+    except Exception as exc:
+        print("⚠️ sheet1 fetch failed:", exc)
+        return None
 
-def _display_name(row: dict) -> str:
-    return row.get("display_name") or row.get("campfire_username") or "Unknown Trainer"
+# Rollups are rebuilt every STATS_REBUILD_SECONDS; in between only meetups from
+# the last STATS_HOT_WINDOW_DAYS (plus upcoming ones) have attendance re-pulled.
+STATS_ENGINE = StatsEngine(
+    _load_stats_events,
+    _load_stats_attendance,
+    _load_stats_accounts,
+    hot_window_days=_env_int("STATS_HOT_WINDOW_DAYS", 14),
+    delta_seconds=_env_int("STATS_DELTA_SECONDS", 120),
+    rebuild_seconds=_env_int("STATS_REBUILD_SECONDS", 6 * 3600),
+)
 
 @app.route("/admin/stats")
 @admin_required
@@ -6281,161 +7320,24 @@ def admin_stats():
     if group_key not in dict(STATS_GROUP_OPTIONS):
         group_key = "month"
 
-    events = _load_supabase_table("events")
-    attendance = _load_supabase_table("attendance")
-    accounts = _load_supabase_table("sheet1", "trainer_username,account_type,stamps")
-
-    ev_map: dict[str, dict] = {}
-    filtered_event_ids: list[str] = []
-    for e in events:
-        eid = str(e.get("event_id") or "").strip().lower()
-        dt = _parse_event_dt(e.get("start_time"))
-        if not dt:
-            continue
-        ev_map[eid] = {
-            "id": eid,
-            "name": e.get("name") or "Unnamed meetup",
-            "dt": dt,
-            "date_iso": dt.isoformat(),
-            "date_display": dt.strftime("%d %b %Y • %H:%M") if dt else "",
-            "cover": e.get("cover_photo_url") or "",
-            "location": e.get("location") or "",
-        }
-        if start_dt and dt < start_dt:
-            continue
-        if dt > end_dt:
-            continue
-        filtered_event_ids.append(eid)
+    stats = STATS_ENGINE.summarize(start_dt, end_dt, group_key, normalize_account_type)
+    filtered_event_ids = stats["filtered_event_ids"]
+    counts_by_event = stats["counts_by_event"]
+    counts_by_trainer = stats["counts_by_trainer"]
 
-    filtered_event_ids = sorted(filtered_event_ids, key=lambda eid: ev_map[eid]["dt"], reverse=True)
-    filtered_set = set(filtered_event_ids)
-
-    event_people: dict[str, dict] = defaultdict(dict)
-    counts_by_event = Counter()
-    counts_by_trainer = Counter()
-    unique_attendees = set()
-
-    for row in attendance:
-        eid = str(row.get("event_id") or "").strip().lower()
-        if not eid or eid not in filtered_set:
-            continue
-        user_key = _normalize_user(row)
-        if not user_key:
-            continue
-        status = _normalize_status(row.get("rsvp_status"))
-        entry = event_people[eid].setdefault(user_key, {
-            "id": user_key,
-            "display_name": _display_name(row),
-            "campfire": (row.get("campfire_username") or "").strip(),
-            "checked_in": False,
-            "checked_in_at": None,
-            "rsvp_status": None,
-        })
-        if status and status != "CHECKED_IN":
-            entry["rsvp_status"] = status
-        if status == "CHECKED_IN":
-            entry["checked_in"] = True
-            entry["checked_in_at"] = row.get("checked_in_at")
-            unique_attendees.add(user_key)
-            counts_by_trainer[entry["display_name"]] += 1
-            counts_by_event[eid] += 1
-
-    rsvp_totals = Counter({eid: len(roster) for eid, roster in event_people.items()})
     total_attendances = sum(counts_by_event.values())
-    total_rsvps = sum(rsvp_totals.values())
+    total_rsvps = sum(stats["rsvp_totals"].values())
     meetup_count = len(filtered_event_ids)
     meetings_with_checkins = sum(1 for eid in filtered_event_ids if counts_by_event[eid] > 0)
     avg_attendance = round(total_attendances / max(meetup_count, 1), 1)
 
     new_attendees = sum(1 for _, c in counts_by_trainer.items() if c == 1)
-    unique_attendee_count = len(unique_attendees)
+    unique_attendee_count = len(counts_by_trainer)
     returning_pct = round(
         100 * (1 - (new_attendees / max(unique_attendee_count, 1))),
         1,
     ) if unique_attendee_count else 0.0
 
-    top_meetups = []
-    for eid in sorted(filtered_event_ids,
-                      key=lambda e: counts_by_event[e],
-                      reverse=True)[:10]:
-        meta = ev_map[eid]
-        top_meetups.append({
-            "event_id": eid,
-            "name": meta["name"],
-            "date": meta["date_iso"],
-            "count": counts_by_event[eid],
-            "rsvp": rsvp_totals.get(eid, 0),
-        })
-
-    top_trainers = [
-        {"trainer": name, "count": count}
-        for name, count in counts_by_trainer.most_common(10)
-    ]
-
-    grouped = {}
-    for eid in filtered_event_ids:
-        meta = ev_map[eid]
-        key, label = _group_bucket(meta["dt"], group_key)
-        bucket = grouped.setdefault(key, {"label": label, "events": 0, "attendance": 0})
-        bucket["events"] += 1
-    for eid, count in counts_by_event.items():
-        meta = ev_map.get(eid)
-        if not meta:
-            continue
-        key, label = _group_bucket(meta["dt"], group_key)
-        bucket = grouped.setdefault(key, {"label": label, "events": 0, "attendance": 0})
-        bucket["attendance"] += count
-    growth_labels = []
-    growth_events = []
-    growth_attend = []
-    for key in sorted(grouped.keys()):
-        bucket = grouped[key]
-        growth_labels.append(bucket["label"])
-        growth_events.append(bucket["events"])
-        growth_attend.append(bucket["attendance"])
-
-    bins = {"0–4": 0, "5–9": 0, "10–19": 0, "20+": 0}
-    for acct in accounts:
-        try:
-            stamps = int(acct.get("stamps") or 0)
-        except Exception:
-            stamps = 0
-        if stamps <= 4:
-            bins["0–4"] += 1
-        elif stamps <= 9:
-            bins["5–9"] += 1
-        elif stamps <= 19:
-            bins["10–19"] += 1
-        else:
-            bins["20+"] += 1
-    stamp_labels = list(bins.keys())
-    stamp_counts = list(bins.values())
-
-    acct_counter = Counter(normalize_account_type(acct.get("account_type")) for acct in accounts)
-    account_labels = list(acct_counter.keys())
-    account_counts = list(acct_counter.values())
-
-    meetup_browser = []
-    for eid in filtered_event_ids:
-        meta = ev_map[eid]
-        roster = list(event_people.get(eid, {}).values())
-        roster_sorted = sorted(roster, key=lambda a: a["display_name"].lower())
-        checked = [p for p in roster_sorted if p["checked_in"]]
-        rsvps_only = [p for p in roster_sorted if not p["checked_in"]]
-        meetup_browser.append({
-            "id": eid,
-            "name": meta["name"],
-            "date": meta["date_display"],
-            "date_iso": meta["date_iso"],
-            "cover": meta["cover"],
-            "location": meta["location"],
-            "rsvp_count": len(roster_sorted),
-            "checkin_count": len(checked),
-            "attendees": roster_sorted,
-            "checked_in": checked,
-            "rsvps": rsvps_only,
-        })
-
     highlights = {
         "avg_attendance": avg_attendance,
         "unique_attendees": unique_attendee_count,
@@ -6469,11 +7371,12 @@ def admin_stats():
         "total_checkins": total_attendances,
     }
 
+    # The page only previews a few rows; the full export lives at /admin/stats/raw.json.
     supabase_snapshot = {
-        "events": events,
-        "attendance": attendance,
-        "events_count": len(events),
-        "attendance_count": len(attendance),
+        "events": stats["events_sample"],
+        "attendance": stats["attendance_sample"],
+        "events_count": stats["events_count"],
+        "attendance_count": stats["attendance_count"],
     }
 
     return render_template(
@@ -6484,34 +7387,175 @@ def admin_stats():
         selected_group=group_key,
         highlights=highlights,
         total_attendances=total_attendances,
-        top_meetups=top_meetups,
-        top_trainers=top_trainers,
-        growth_labels=growth_labels,
-        growth_events=growth_events,
-        growth_attend=growth_attend,
-        stamp_labels=stamp_labels,
-        stamp_counts=stamp_counts,
-        account_labels=account_labels,
-        account_counts=account_counts,
-        meetup_browser=meetup_browser,
+        top_meetups=stats["top_meetups"],
+        top_trainers=stats["top_trainers"],
+        growth_labels=stats["growth_labels"],
+        growth_events=stats["growth_events"],
+        growth_attend=stats["growth_attend"],
+        stamp_labels=stats["stamp_labels"],
+        stamp_counts=stats["stamp_counts"],
+        account_labels=stats["account_labels"],
+        account_counts=stats["account_counts"],
+        meetup_browser=stats["meetup_browser"],
         meetup_picker=meetup_picker,
         timeframe_meta=timeframe_meta,
         supabase_snapshot=supabase_snapshot,
     )
 
+# Stable sort keys so .range() pages neither skip nor repeat rows.
+STATS_EXPORT_TABLES = {
+    "events": ("start_time", "event_id"),
+    "attendance": ("event_id", "campfire_username", "display_name"),
+}
+STATS_EXPORT_FORMATS = {
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+STATS_EXPORT_PAGE_SIZE = _env_int("STATS_EXPORT_PAGE_SIZE", 1000, minimum=1)
+
+
+def _export_rows(table: str):
+    return _iter_supabase_rows(
+        table,
+        order=STATS_EXPORT_TABLES[table],
+        page_size=STATS_EXPORT_PAGE_SIZE,
+    )
+
+
+def _stream_stats_json(tables: list[str]):
+    """Chunked JSON with the same keys as the old payload; counts trail the arrays."""
+    yield '{"generated_at": %s' % json.dumps(datetime.now(timezone.utc).isoformat())
+    counts: dict[str, int] = {}
+    for table in tables:
+        yield ', "%s": [' % table
+        counts[table] = 0
+        try:
+            for row in _export_rows(table):
+                yield ("," if counts[table] else "") + json.dumps(row, default=str)
+                counts[table] += 1
+        except Exception as exc:
+            print(f"⚠️ {table} export failed:", exc)
+            yield '], "error": %s' % json.dumps(f"{table} export failed after {counts[table]} rows")
+            break
+        yield "]"
+    for table, count in counts.items():
+        yield ', "%s_count": %d' % (table, count)
+    yield "}\n"
+
+
+def _stream_stats_ndjson(tables: list[str]):
+    for table in tables:
+        count = 0
+        try:
+            for row in _export_rows(table):
+                yield json.dumps({"table": table, "row": row}, default=str) + "\n"
+                count += 1
+        except Exception as exc:
+            print(f"⚠️ {table} export failed:", exc)
+            yield json.dumps({"table": table, "error": "export failed", "rows": count}) + "\n"
+            return
+        yield json.dumps({"table": table, "count": count}) + "\n"
+
+
+def _stream_stats_csv(table: str):
+    buffer = io.StringIO()
+    writer = None
+    count = 0
+    try:
+        for row in _export_rows(table):
+            if writer is None:
+                # Header comes from the first row; later rows are projected onto it.
+                writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow({
+                key: json.dumps(value) if isinstance(value, (dict, list)) else value
+                for key, value in row.items()
+            })
+            count += 1
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    except Exception as exc:
+        print(f"⚠️ {table} export failed:", exc)
+        # CSV has no error field: leave a marker row, then re-raise so the
+        # chunked response is cut off instead of ending like a full download.
+        yield f"# {table} export failed after {count} rows\r\n"
+        raise
+
+
 @app.route("/admin/stats/raw.json")
 @admin_required
 def admin_stats_raw():
-    events = _load_supabase_table("events")
-    attendance = _load_supabase_table("attendance")
-    payload = {
+    """
+    Stream the events/attendance tables without holding them in memory.
+      ?format=json (default) | ndjson | csv
+      ?table=events|attendance (required for csv, optional otherwise)
+    """
+    fmt = (request.args.get("format") or "json").strip().lower()
+    if fmt not in STATS_EXPORT_FORMATS:
+        abort(400)
+    table = (request.args.get("table") or "").strip().lower()
+    if table and table not in STATS_EXPORT_TABLES:
+        abort(400)
+    tables = [table] if table else list(STATS_EXPORT_TABLES)
+    if fmt == "csv":
+        if not table:
+            abort(400)
+        body = _stream_stats_csv(table)
+    elif fmt == "ndjson":
+        body = _stream_stats_ndjson(tables)
+    else:
+        body = _stream_stats_json(tables)
+
+    mimetype, extension = STATS_EXPORT_FORMATS[fmt]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    filename = f"rdab-stats-{table or 'all'}-{stamp}.{extension}"
+    response = Response(body, mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    # Let Cloud Run / nginx pass chunks straight through.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@app.route("/admin/jobs.json")
+@admin_required
+def admin_jobs():
+    kind = (request.args.get("kind") or "").strip() or None
+    try:
+        limit = min(100, max(1, int(request.args.get("limit", 25))))
+    except (TypeError, ValueError):
+        limit = 25
+    JOB_QUEUE.ensure_started()
+    return jsonify({"counts": JOB_QUEUE.counts(), "jobs": JOB_QUEUE.recent(limit, kind=kind)})
+
+@app.route("/admin/http.json")
+@admin_required
+def admin_http_stats():
+    return jsonify({
+        "sites": HTTP.stats(),
+        "breakers": {table: breaker.stats() for table, breaker in sorted(SUPABASE_BREAKERS.items())},
+        "read_cache": READ_CACHE.stats(),
+    })
+
+@app.route("/admin/jobs/<job_id>.json")
+@admin_required
+def admin_job_status(job_id):
+    JOB_QUEUE.ensure_started()
+    job = JOB_QUEUE.get(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "Job not found."}), 404
+    return jsonify({"success": True, "job": job})
+
+@app.route("/admin/cache-stats.json")
+@admin_required
+def admin_cache_stats():
+    return jsonify({
         "generated_at": datetime.now(timezone.utc).isoformat(),
-        "events_count": len(events),
-        "attendance_count": len(attendance),
-        "events": events,
-        "attendance": attendance,
-    }
-    return jsonify(payload)
+        "trainer_profiles": TRAINER_PROFILE_CACHE.stats(),
+        "passport_projections": PASSPORT_PROJECTIONS.stats(),
+    })
 
 @app.route("/toggle_maintenance")
 def toggle_maintenance():
@@ -6785,29 +7829,28 @@ def admin_notifications():
             flash("Select at least one trainer or choose All Trainers.", "warning")
             return redirect(url_for("admin_notifications"))
 
-        success_count = 0
-        for recipient in recipients:
-            note = send_notification(
-                recipient,
-                subject,
-                raw_message,
-                notif_type=notif_type,
-                metadata={},
+        try:
+            JOB_QUEUE.enqueue(
+                "broadcast_notification",
+                {
+                    "recipients": recipients,
+                    "subject": subject,
+                    "message": raw_message,
+                    "notif_type": notif_type,
+                    "sent": 0,
+                },
+                created_by=_current_actor(),
             )
-            if note:
-                success_count += 1
-
-        if success_count == len(recipients):
-            if recipients == ["ALL"]:
-                flash("✅ Notification sent to all trainers.", "success")
-            else:
-                total = len(recipients)
-                flash(f"✅ Notification sent to {total} trainer{'s' if total != 1 else ''}.", "success")
-        elif success_count > 0:
-            failed = len(recipients) - success_count
-            flash(f"⚠️ Sent {success_count} notification(s), but {failed} failed.", "warning")
-        else:
+        except Exception as exc:
+            print("⚠️ Failed to queue notification:", exc)
             flash("❌ Failed to send notification.", "error")
+            return redirect(url_for("admin_notifications"))
+
+        if recipients == ["ALL"]:
+            flash("⏳ Notification to all trainers queued. Progress shows under Background jobs.", "success")
+        else:
+            total = len(recipients)
+            flash(f"⏳ Notification to {total} trainer{'s' if total != 1 else ''} queued. Progress shows under Background jobs.", "success")
         return redirect(url_for("admin_notifications"))
 
     notifications = []
@@ -6840,6 +7883,7 @@ def admin_notifications():
         account_types=account_types,
         notification_types=NOTIFICATION_TYPE_CHOICES,
         notification_categories=notification_categories,
+        background_jobs=JOB_QUEUE.recent(5, kind="broadcast_notification"),
     )
 
 @app.route("/admin/notifications/<notification_id>/update", methods=["POST"])
@@ -6880,6 +7924,7 @@ def admin_notifications_delete(notification_id):
 
     try:
         supabase.table("notifications").delete().eq("id", notification_id).execute()
+        INBOX_UNREAD.invalidate()
         return jsonify({"success": True, "notification_id": notification_id})
     except Exception as exc:
         print("⚠️ Failed to delete notification:", exc)
@@ -6912,7 +7957,7 @@ def _process_trainer_login(username: str, pin: str) -> dict:
             "locked": False,
         }
 
-    _, user = find_user(username)
+    _, user = find_user(username, fresh=True)
     if user and _pin_matches(user, pin):
         session["trainer"] = user.get("trainer_username")
         session["account_type"] = normalize_account_type(user.get("account_type"))
@@ -6922,6 +7967,7 @@ def _process_trainer_login(username: str, pin: str) -> dict:
                 .update({"last_login": datetime.utcnow().isoformat()}) \
                 .eq("trainer_username", user.get("trainer_username")) \
                 .execute()
+            invalidate_trainer_record(user.get("trainer_username"))
         except Exception as exc:
             print("⚠️ Supabase last_login update failed:", exc)
 
@@ -7147,6 +8193,7 @@ def api_meetup_check_in():
         }
         try:
             supabase.table("lugia_ledger").insert(payload).execute()
+            record_passport_ledger_entry(trainer_username, payload)
             return True, None
         except Exception as exc:
             # Retry without optional metadata if the table doesn't support it
@@ -7155,6 +8202,7 @@ def api_meetup_check_in():
                 fallback_payload.pop("metadata", None)
                 fallback_payload.pop("image_url", None)
                 supabase.table("lugia_ledger").insert(fallback_payload).execute()
+                record_passport_ledger_entry(trainer_username, fallback_payload)
                 return True, None
             except Exception as exc2:
                 return False, f"{exc}; fallback: {exc2}"
@@ -7174,6 +8222,7 @@ def api_meetup_check_in():
             return jsonify({"error": "Check-in recorded but stamp award failed"}), 500
         awarded_entries += 2
 
+    invalidate_trainer_record(trainer_username)
     return jsonify({"ok": True, "awarded": awarded_entries, "event_name": stamp_title})
 
 # ====== Sign Up ======
@@ -7200,6 +8249,16 @@ def _trainer_exists(trainer_name: str) -> bool:
         return False
 
 
+# Signup screenshots are read in memory by a bounded pool of tesseract
+# processes (see rdab/ocr.py); scripts/benchmark_ocr.py measures it.
+OCR_ENGINE = OcrEngine(
+    cmd=os.getenv("TESSERACT_CMD", "tesseract"),
+    max_concurrency=_env_int("OCR_MAX_CONCURRENCY", 2, minimum=1),
+    timeout=_env_int("OCR_TIMEOUT_SECONDS", 8, minimum=1),
+    queue_timeout=_env_int("OCR_QUEUE_TIMEOUT_SECONDS", 10),
+)
+
+
 @app.route("/signup", methods=["GET", "POST"])
 def signup():
     if request.method == "POST":
@@ -7211,10 +8270,7 @@ def signup():
             flash("All fields are required!", "warning")
             return redirect(url_for("signup"))
 
-        filepath = os.path.join(app.config["UPLOAD_FOLDER"], secure_filename(file.filename))
-        file.save(filepath)
-        trainer_name = extract_trainer_name(filepath)
-        os.remove(filepath)
+        trainer_name = extract_trainer_name(file.stream, OCR_ENGINE)
 
         if not trainer_name:
             flash("Could not detect trainer name from screenshot. Please try again.", "error")
@@ -7396,7 +8452,7 @@ def recover():
         memorable = request.form.get("memorable")
         new_pin = request.form.get("new_pin")
 
-        _, user = find_user(username)
+        _, user = find_user(username, fresh=True)
         if not user:
             flash("❌ No trainer found with that name.", "error")
             return redirect(url_for("recover"))
@@ -7417,6 +8473,7 @@ def recover():
                 "pin_hash": new_hash,
                 "last_login": datetime.utcnow().isoformat(),
             }).eq("trainer_username", trainer_username).execute()
+            invalidate_trainer_record(trainer_username)
         except Exception as exc:
             print("⚠️ Supabase PIN reset failed:", exc)
             flash("Unable to reset PIN right now. Please try again soon.", "error")
@@ -7617,10 +8674,83 @@ def calendar_public():
         title="Meetup Calendar",
     )
 
+def _ics_escape(value: str) -> str:
+    text = (value or "").replace("\r\n", "\n").replace("\r", "\n")
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_fold(line: str, limit: int = 75) -> str:
+    """RFC 5545 §3.1: split content lines longer than 75 octets, never inside a UTF-8 character."""
+    data = line.encode("utf-8")
+    if len(data) <= limit:
+        return line
+    parts, start, width = [], 0, limit
+    while start < len(data):
+        end = min(start + width, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1  # back off to a character boundary
+        parts.append(data[start:end].decode("utf-8"))
+        start, width = end, limit - 1  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _ics_format(ts: datetime) -> str:
+    return ts.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _ics_vevent_lines(uid: str, name: str, start_dt: datetime, end_dt: datetime,
+                      location: str, campfire_url: str, dtstamp: datetime) -> list[str]:
+    if end_dt <= start_dt:
+        end_dt = start_dt + timedelta(hours=2)
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@rdab.app",
+        f"DTSTAMP:{_ics_format(dtstamp)}",
+        f"DTSTART:{_ics_format(start_dt)}",
+        f"DTEND:{_ics_format(end_dt)}",
+        f"SUMMARY:{_ics_escape(name or 'RDAB Meetup')}",
+    ]
+    if location:
+        lines.append(f"LOCATION:{_ics_escape(location)}")
+    if campfire_url:
+        lines.append(f"DESCRIPTION:{_ics_escape('Campfire RSVP: ' + campfire_url)}")
+        lines.append(f"URL:{campfire_url}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def _ics_calendar(vevents: list[str], *, name: Optional[str] = None) -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//RDAB Community//Meetup Calendar//EN",
+        "CALSCALE:GREGORIAN",
+    ]
+    if name:
+        lines.extend([f"X-WR-CALNAME:{_ics_escape(name)}", "X-WR-TIMEZONE:Europe/London",
+                      "REFRESH-INTERVAL;VALUE=DURATION:PT6H"])
+    lines.extend(vevents)
+    lines.extend(["END:VCALENDAR", ""])
+    return "\r\n".join(_ics_fold(line) for line in lines)
+
+
 @app.route("/events/<event_id>.ics")
 def event_ics_file(event_id):
+    # Upcoming events are already cached; only past ones need a lookup.
     event_row = None
-    if USE_SUPABASE and supabase:
+    for ev in fetch_upcoming_events():
+        if event_id in (ev["event_id"], ev["record_id"]):
+            event_row = {
+                "event_id": ev["event_id"],
+                "name": ev["name"],
+                "start_time": ev["start"].isoformat(),
+                "end_time": ev["end"].isoformat(),
+                "location": ev["location"],
+                "url": ev["campfire_url"],
+            }
+            break
+
+    if not event_row and USE_SUPABASE and supabase:
         try:
             resp = (supabase.table("events")
                     .select("id,event_id,name,start_time,end_time,location,url")
@@ -7656,41 +8786,17 @@ def event_ics_file(event_id):
     if start_dt <= sentinel:
         abort(404)
     end_dt = parse_dt_safe(event_row.get("end_time"))
-    if end_dt <= sentinel or end_dt <= start_dt:
-        end_dt = start_dt + timedelta(hours=2)
-
-    dtstamp = datetime.utcnow().replace(tzinfo=timezone.utc)
-
-    def _ics_format(ts: datetime) -> str:
-        return ts.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
 
     uid = (event_row.get("event_id") or event_row.get("id") or event_id or f"evt-{uuid.uuid4().hex}")
-    lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//RDAB Community//Meetup Calendar//EN",
-        "CALSCALE:GREGORIAN",
-        "BEGIN:VEVENT",
-        f"UID:{uid}@rdab.app",
-        f"DTSTAMP:{_ics_format(dtstamp)}",
-        f"DTSTART:{_ics_format(start_dt)}",
-        f"DTEND:{_ics_format(end_dt)}",
-        f"SUMMARY:{(event_row.get('name') or 'RDAB Meetup').replace('\\n', ' ')}",
-    ]
-
-    location = event_row.get("location") or ""
-    if location:
-        lines.append(f"LOCATION:{location.replace('\\n', ' ')}")
-
-    description_bits = []
-    if event_row.get("url"):
-        description_bits.append(f"Campfire RSVP: {event_row['url']}")
-    description = "\\n".join(description_bits)
-    if description:
-        lines.append(f"DESCRIPTION:{description}")
-
-    lines.extend(["END:VEVENT", "END:VCALENDAR", ""])
-    ics_body = "\r\n".join(lines)
+    ics_body = _ics_calendar(_ics_vevent_lines(
+        uid,
+        event_row.get("name") or "RDAB Meetup",
+        start_dt,
+        end_dt,
+        event_row.get("location") or "",
+        event_row.get("url") or "",
+        datetime.now(timezone.utc),
+    ))
     filename = secure_filename(f"{event_row.get('name') or 'meetup'}.ics") or "meetup.ics"
 
     response = make_response(ics_body)
@@ -7698,6 +8804,73 @@ def event_ics_file(event_id):
     response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
 
+
+# Rendered feeds keyed by window start; each entry is replaced only when the
+# events in it change. The ETag is the events fingerprint, so every worker
+# and instance hands out the same validator for the same events. DTSTAMP and
+# Last-Modified are the time this worker first saw that fingerprint, which
+# only differs between workers, hence the weak ETag.
+MEETUPS_ICS_CACHE_SECONDS = _env_int("MEETUPS_ICS_CACHE_SECONDS", 300)
+_MEETUPS_ICS_FEEDS: dict[str, dict] = {}
+_MEETUPS_ICS_LOCK = threading.Lock()
+
+
+def _meetups_ics_feed(since: Optional[datetime]) -> dict:
+    events = fetch_upcoming_events()
+    if since is not None:
+        events = [ev for ev in events if ev["start"] >= since]
+    fingerprint = hashlib.sha1(json.dumps(
+        [(ev["event_id"], ev["name"], ev["start"].isoformat(), ev["end"].isoformat(),
+          ev["location"], ev["campfire_url"]) for ev in events],
+    ).encode("utf-8")).hexdigest()
+    window = since.isoformat() if since else ""
+
+    with _MEETUPS_ICS_LOCK:
+        feed = _MEETUPS_ICS_FEEDS.get(window)
+        if feed and feed["fingerprint"] == fingerprint:
+            return feed
+
+    changed_at = datetime.now(timezone.utc).replace(microsecond=0)
+    vevents: list[str] = []
+    for ev in events:
+        vevents.extend(_ics_vevent_lines(ev["event_id"], ev["name"], ev["start"], ev["end"],
+                                         ev["location"], ev["campfire_url"], changed_at))
+    body = _ics_calendar(vevents, name="RDAB Meetups").encode("utf-8")
+    feed = {
+        "fingerprint": fingerprint,
+        "body": body,
+        "etag": fingerprint,
+        "last_modified": changed_at,
+    }
+    with _MEETUPS_ICS_LOCK:
+        if len(_MEETUPS_ICS_FEEDS) >= 32 and window not in _MEETUPS_ICS_FEEDS:
+            _MEETUPS_ICS_FEEDS.clear()  # arbitrary ?since= values must not grow this forever
+        _MEETUPS_ICS_FEEDS[window] = feed
+    return feed
+
+
+@app.route("/meetups.ics")
+def meetups_ics():
+    """Subscribable feed of every upcoming meetup; ?since=YYYY-MM-DD[THH:MM] narrows the window."""
+    since = None
+    since_raw = (request.args.get("since") or "").strip()
+    if since_raw:
+        try:
+            since = parser.isoparse(since_raw)
+        except (ValueError, OverflowError):
+            return jsonify({"error": "since must be an ISO date or datetime"}), 400
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=LONDON_TZ)
+
+    feed = _meetups_ics_feed(since)
+    response = make_response(feed["body"])
+    response.headers["Content-Type"] = "text/calendar; charset=utf-8"
+    response.headers["Content-Disposition"] = 'inline; filename="rdab-meetups.ics"'
+    response.headers["Cache-Control"] = f"public, max-age={MEETUPS_ICS_CACHE_SECONDS}"
+    response.set_etag(feed["etag"], weak=True)
+    response.last_modified = feed["last_modified"]
+    return response.make_conditional(request)
+
 # ====== Inbox, Notifications, Receipts ======
 def _normalize_iso(dt_val):
     """Ensure datetime-like values always return UTC ISO string with tzinfo."""
@@ -7734,6 +8907,7 @@ def _ensure_metadata_dict(record: dict | None) -> dict:
 
 
 def _normalize_user_list(values) -> list:
+    """Deduplicated, lowercased names (see _inbox_trainer_key) from a read_by/hidden_for list."""
     normalized = []
     if not isinstance(values, list):
         return normalized
@@ -7748,27 +8922,21 @@ def _normalize_user_list(values) -> list:
         if lower in seen:
             continue
         seen.add(lower)
-        normalized.append(key)
+        normalized.append(lower)
     return normalized
 
 
 def _append_username(values: list, trainer: str) -> list:
     normalized = _normalize_user_list(values)
-    trainer_key = (trainer or "").strip()
-    if not trainer_key:
-        return normalized
-    lower = trainer_key.lower()
-    if all(entry.lower() != lower for entry in normalized):
+    trainer_key = _inbox_trainer_key(trainer)
+    if trainer_key and trainer_key not in normalized:
         normalized.append(trainer_key)
     return normalized
 
 
 def _remove_username(values: list, trainer: str) -> list:
-    normalized = _normalize_user_list(values)
-    trainer_key = (trainer or "").strip().lower()
-    if not trainer_key:
-        return normalized
-    return [entry for entry in normalized if entry.lower() != trainer_key]
+    trainer_key = _inbox_trainer_key(trainer)
+    return [entry for entry in _normalize_user_list(values) if entry != trainer_key]
 
 
 def _message_is_hidden(record: dict, trainer: str) -> bool:
@@ -7838,6 +9006,241 @@ def _build_receipt_message(trainer, rec):
         "metadata": metadata,
     }
 
+
+# ---- Unified inbox feed ----
+# Notifications and receipts are paged together on a (sent_at, source, id)
+# keyset: each page asks every source for per_page + 1 rows past the cursor
+# and merges them, so page N never loads the rows before it.
+INBOX_FEED_ORDERS = {
+    "newest": (("sent_at", True),),
+    "oldest": (("sent_at", False),),
+    "type": (("type", False), ("sent_at", True)),
+}
+INBOX_SOURCE_NOTIFICATIONS = 0
+INBOX_SOURCE_RECEIPTS = 1
+INBOX_RECEIPT_TYPE = "receipt"
+
+
+def _inbox_feed_order(sort_by: str, *, reverse: bool = False) -> tuple:
+    order = INBOX_FEED_ORDERS.get(sort_by, INBOX_FEED_ORDERS["newest"])
+    if reverse:
+        order = tuple((field, not desc) for field, desc in order)
+    return order
+
+
+def _inbox_feed_key(msg: dict, order: tuple) -> list:
+    values = [
+        msg.get("type") if field == "type" else parse_dt_safe(msg.get("sent_at"))
+        for field, _ in order
+    ]
+    return values + [msg["_feed_source"], msg["_feed_raw_id"]]
+
+
+def _inbox_feed_cursor(msg: dict, order: tuple) -> str:
+    values = [msg.get(field) for field, _ in order]
+    return encode_cursor(values + [msg["_feed_source"], msg["_feed_raw_id"]])
+
+
+def _inbox_source_keyset(source: int, cursor: list | None, order: tuple, time_column: str):
+    """
+    Keyset condition for one source, or None for "from the start".
+    Returns False when no row of this source can follow the cursor.
+    """
+    if cursor is None:
+        return None
+    if len(cursor) != len(order) + 2:
+        return None
+    *order_values, cursor_source, cursor_raw_id = cursor
+    keys: list[tuple[str, Any, bool]] = []
+    for (field, desc), value in zip(order, order_values):
+        if field == "type":
+            if source == INBOX_SOURCE_RECEIPTS:
+                # Receipts all share one type, so compare it here instead of in SQL.
+                position = compare_keys([INBOX_RECEIPT_TYPE], [value], [desc])
+                if position < 0:
+                    return False
+                if position > 0:
+                    return None
+                continue
+            keys.append(("type", value, desc))
+        else:
+            keys.append((time_column, value, desc))
+    sent_desc = order[-1][1]
+    if cursor_source == source:
+        keys.append(("id", cursor_raw_id, sent_desc))
+        return keyset_condition(keys)
+    # Same timestamp, other source: the source rank decides who comes first.
+    follows = compare_keys([source], [cursor_source], [sent_desc]) > 0
+    return keyset_condition(keys, inclusive=follows)
+
+
+def _inbox_apply_conditions(query, conditions: list[str]):
+    conditions = [c for c in conditions if c]
+    if conditions:
+        query = query.or_(f"and({','.join(conditions)})")
+    return query
+
+
+def _inbox_hidden_condition(trainer: str) -> str:
+    column = f"metadata->{INBOX_METADATA_HIDDEN_KEY}"
+    visible = [f"{column}.not.cs.{pg_quote(json.dumps([name]))}" for name in _inbox_trainer_spellings(trainer)]
+    not_hidden = visible[0] if len(visible) == 1 else f"and({','.join(visible)})"
+    return f"or({column}.is.null,{not_hidden})"
+
+
+def _inbox_notification_conditions(trainer: str, tab: str, sort_by: str) -> list[str]:
+    receipt_types = ",".join(sorted(RECEIPT_NOTIFICATION_TYPES))
+    system_types = ",".join(sorted(SYSTEM_NOTIFICATION_TYPES))
+    read_filter = {"unread": False, "read": True}.get(sort_by)
+    conditions = _notification_state_conditions(trainer, read=read_filter)
+    if tab == "system":
+        conditions.append(f"type.in.({system_types})")
+    elif tab == "announcements":
+        conditions.append(f"or(type.is.null,type.not.in.({system_types},{receipt_types}))")
+    else:
+        conditions.append(f"or(type.is.null,type.not.in.({receipt_types}))")
+    return conditions
+
+
+def _inbox_order_query(query, order: tuple, time_column: str, include_type: bool):
+    for field, desc in order:
+        if field == "type":
+            if include_type:
+                query = query.order("type", desc=desc, nullsfirst=not desc)
+        else:
+            query = query.order(time_column, desc=desc)
+    return query.order("id", desc=order[-1][1])
+
+
+def _inbox_fetch_notifications(trainer, tab, sort_by, order, cursor, limit) -> list[dict]:
+    keyset = _inbox_source_keyset(INBOX_SOURCE_NOTIFICATIONS, cursor, order, "sent_at")
+    if keyset is False:
+        return []
+    query = _notifications_for_trainer(trainer)
+    query = _inbox_apply_conditions(query, _inbox_notification_conditions(trainer, tab, sort_by) + [keyset])
+    rows = _inbox_order_query(query, order, "sent_at", True).limit(limit).execute().data or []
+    for row in rows:
+        _with_receipt_state(row, trainer)
+        row["_feed_source"] = INBOX_SOURCE_NOTIFICATIONS
+        row["_feed_raw_id"] = row.get("id")
+    return rows
+
+
+def _inbox_fetch_receipts(trainer, order, cursor, limit) -> list[dict]:
+    keyset = _inbox_source_keyset(INBOX_SOURCE_RECEIPTS, cursor, order, "created_at")
+    if keyset is False:
+        return []
+    query = supabase.table("redemptions").select("*").eq("trainer_username", trainer)
+    query = _inbox_apply_conditions(query, [_inbox_hidden_condition(trainer), keyset])
+    rows = _inbox_order_query(query, order, "created_at", False).limit(limit).execute().data or []
+    messages = []
+    for row in rows:
+        msg = _build_receipt_message(trainer, row)
+        # Keep the raw timestamp so the next cursor matches the column exactly.
+        msg["sent_at"] = row.get("created_at") or msg["sent_at"]
+        msg["_feed_source"] = INBOX_SOURCE_RECEIPTS
+        msg["_feed_raw_id"] = row.get("id")
+        messages.append(msg)
+    return messages
+
+
+def _inbox_count(trainer: str, tab: str, sort_by: str) -> int:
+    total = 0
+    if tab in ("all", "announcements", "system"):
+        try:
+            query = _notifications_for_trainer(trainer, "id", count="exact")
+            query = _inbox_apply_conditions(query, _inbox_notification_conditions(trainer, tab, sort_by))
+            total += getattr(query.limit(1).execute(), "count", None) or 0
+        except Exception as e:
+            print("⚠️ Supabase notifications count failed:", e)
+    if tab in ("all", "receipts"):
+        try:
+            query = supabase.table("redemptions").select("id", count="exact").eq("trainer_username", trainer)
+            query = _inbox_apply_conditions(query, [_inbox_hidden_condition(trainer)])
+            total += getattr(query.limit(1).execute(), "count", None) or 0
+        except Exception as e:
+            print("⚠️ Supabase receipts count failed:", e)
+    return total
+
+
+def _load_inbox_page(trainer: str, tab: str, sort_by: str, per_page: int, *,
+                     after: str | None = None, before: str | None = None, page: int = 1) -> dict:
+    """
+    One page of the merged notifications + receipts feed.
+    ``after``/``before`` are cursors from a previous page; without either,
+    ``page`` > 1 falls back to reading page * per_page rows per source.
+    """
+    result = {"messages": [], "total": 0, "next_cursor": None, "prev_cursor": None}
+    if not (USE_SUPABASE and supabase):
+        return result
+
+    backwards = bool(decode_cursor(before)) and not decode_cursor(after)
+    cursor = decode_cursor(before if backwards else after)
+    order = _inbox_feed_order(sort_by, reverse=backwards)
+    skip = 0 if cursor or page <= 1 else (page - 1) * per_page
+    limit = skip + per_page + 1
+
+    candidates: list[dict] = []
+    if tab in ("all", "announcements", "system"):
+        try:
+            candidates += _inbox_fetch_notifications(trainer, tab, sort_by, order, cursor, limit)
+        except Exception as e:
+            print("⚠️ Supabase notifications fetch failed:", e)
+    if tab in ("all", "receipts"):
+        try:
+            candidates += _inbox_fetch_receipts(trainer, order, cursor, limit)
+        except Exception as e:
+            print("⚠️ Supabase receipts fetch failed:", e)
+
+    descending = [desc for _, desc in order] + [order[-1][1]] * 2
+    merged = merge_sorted(candidates, lambda m: _inbox_feed_key(m, order), descending, limit)[skip:]
+    has_more = len(merged) > per_page
+    page_rows = merged[:per_page]
+    if backwards:
+        page_rows.reverse()
+        forward_order = _inbox_feed_order(sort_by)
+        has_next, has_prev = True, has_more
+    else:
+        forward_order = order
+        has_next, has_prev = has_more, bool(cursor) or skip > 0
+
+    if page_rows:
+        if has_next:
+            result["next_cursor"] = _inbox_feed_cursor(page_rows[-1], forward_order)
+        if has_prev:
+            result["prev_cursor"] = _inbox_feed_cursor(page_rows[0], forward_order)
+    for msg in page_rows:
+        msg.pop("_feed_source", None)
+        msg.pop("_feed_raw_id", None)
+        msg["is_digital_code"] = _looks_like_digital_code(msg)
+    result["messages"] = page_rows
+    result["total"] = _inbox_count(trainer, tab, sort_by)
+    return result
+
+
+@app.get("/api/inbox/feed")
+def api_inbox_feed():
+    if "trainer" not in session:
+        return jsonify({"success": False, "error": "Please log in."}), 401
+    tab = (request.args.get("tab") or "all").lower()
+    if tab not in {"all", "announcements", "system", "receipts"}:
+        tab = "all"
+    sort_by = request.args.get("sort", "newest")
+    try:
+        limit = min(100, max(1, int(request.args.get("limit", INBOX_PAGE_SIZE))))
+    except (TypeError, ValueError):
+        limit = INBOX_PAGE_SIZE
+    feed = _load_inbox_page(
+        session["trainer"],
+        tab,
+        sort_by,
+        limit,
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+    )
+    return jsonify({"success": True, **feed})
+
+
 @app.route("/inbox")
 def inbox():
     session["last_page"] = request.path
@@ -7846,7 +9249,7 @@ def inbox():
         return redirect(url_for("home"))
 
     trainer = session["trainer"]
-    trainer_key = trainer.lower()
+    trainer_key = _inbox_trainer_key(trainer)
     panel_mode = request.args.get("panel") == "1"
     tab = request.args.get("tab", "all").lower()           # all | announcements | system | receipts
     sort_by = request.args.get("sort", "newest")           # newest | oldest | unread | read | type
@@ -7860,93 +9263,20 @@ def inbox():
     if tab not in valid_tabs:
         tab = "all"
 
-    messages = []
-
-    def notification_category(record: dict) -> str:
-        if not isinstance(record, dict):
-            return "announcements"
-        type_key = (record.get("type") or "").strip().lower()
-        if type_key in RECEIPT_NOTIFICATION_TYPES:
-            return "receipts"
-        if type_key in SYSTEM_NOTIFICATION_TYPES:
-            return "system"
-        return "announcements"
-
-    # --- Pull notifications (audience = trainer or ALL) ---
-    notif_rows = []
-    if USE_SUPABASE and supabase and tab in ("all", "announcements", "system"):
-        try:
-            nq = (supabase.table("notifications")
-                  .select("*")
-                  .or_(f"audience.eq.{trainer},audience.eq.ALL"))
-
-            if sort_by == "unread":
-                nq = nq.not_.contains("read_by", [trainer])
-            elif sort_by == "read":
-                nq = nq.contains("read_by", [trainer])
-            elif sort_by == "type":
-                pass  # type sort handled after merge
-
-            nq = nq.order("sent_at", desc=(sort_by != "oldest"))
-            notif_rows = nq.execute().data or []
-
-            notif_rows = [n for n in notif_rows if notification_category(n) != "receipts"]
-            notif_rows = [n for n in notif_rows if not _message_is_hidden(n, trainer)]
-            if tab in ("announcements", "system"):
-                notif_rows = [n for n in notif_rows if notification_category(n) == tab]
-        except Exception as e:
-            print("⚠️ Supabase notifications fetch failed:", e)
-
-    # --- Pull receipts as message-like objects ---
-    receipt_rows = []
-    if USE_SUPABASE and supabase and tab in ("all", "receipts"):
-        try:
-            rq = (supabase.table("redemptions")
-                  .select("*")
-                  .eq("trainer_username", trainer)
-                  .order("created_at", desc=(sort_by != "oldest")))
-            raw = rq.execute().data or []
-            receipt_rows = [
-                msg for msg in (_build_receipt_message(trainer, r) for r in raw)
-                if not _message_is_hidden(msg, trainer)
-            ]
-        except Exception as e:
-            print("⚠️ Supabase receipts fetch failed:", e)
+    after = request.args.get("after")
+    before = request.args.get("before")
+    feed = _load_inbox_page(trainer, tab, sort_by, per_page, after=after, before=before, page=page)
+    messages = feed["messages"]
+    total_messages = feed["total"]
 
-    # --- Merge ---
-    if tab in ("announcements", "system"):
-        messages = notif_rows
-    elif tab == "receipts":
-        messages = receipt_rows
-    else:
-        messages = (notif_rows or []) + (receipt_rows or [])
-
-    # --- Sorting & filtering ---
-    if sort_by == "type":
-        messages.sort(
-            key=lambda m: (
-                (m.get("type") or "").lower(),
-                -parse_dt_safe(m.get("sent_at")).timestamp()
-            )
-        )
-    elif sort_by == "oldest":
-        messages.sort(key=lambda m: parse_dt_safe(m.get("sent_at")))
-    else:  # newest
-        messages.sort(key=lambda m: parse_dt_safe(m.get("sent_at")), reverse=True)
-
-    for msg in messages:
-        msg["is_digital_code"] = _looks_like_digital_code(msg)
-
-    total_messages = len(messages)
-
-    if not messages:
+    if not messages and total_messages == 0:
         messages = [{
             "id": f"placeholder-{uuid.uuid4().hex}",
             "subject": "📭 No messages yet",
             "message": "Your inbox is empty. You’ll see updates, receipts, and announcements here.",
             "sent_at": datetime.utcnow().replace(tzinfo=timezone.utc).isoformat(),
             "type": "info",
-            "read_by": [trainer],
+            "read_by": [trainer_key],
             "metadata": {"is_placeholder": True},
             "is_placeholder": True,
         }]
@@ -7956,16 +9286,15 @@ def inbox():
     page_count = max(1, math.ceil(total_messages / per_page))
     if page > page_count:
         page = page_count
-    start = (page - 1) * per_page
-    end = start + per_page
-    messages = messages[start:end]
 
-    def _pagination_url(target_page: int) -> str:
+    def _pagination_url(target_page: int, **cursor) -> str:
         params = {
             "tab": tab,
             "sort": sort_by,
             "page": target_page,
         }
+        if target_page > 1:
+            params.update({key: value for key, value in cursor.items() if value})
         if panel_mode:
             params["panel"] = 1
         return url_for("inbox", **params)
@@ -7975,8 +9304,8 @@ def inbox():
         "pages": page_count,
         "per_page": per_page,
         "total": total_messages,
-        "prev_url": _pagination_url(page - 1) if page > 1 else None,
-        "next_url": _pagination_url(page + 1) if page < page_count else None,
+        "prev_url": _pagination_url(page - 1, before=feed["prev_cursor"]) if page > 1 else None,
+        "next_url": _pagination_url(page + 1, after=feed["next_cursor"]) if feed["next_cursor"] else None,
     }
 
     bulletin_posts = get_community_bulletin_posts()
@@ -8026,9 +9355,8 @@ def inbox_message(message_id):
             msg = _build_receipt_message(trainer, rec)
             rec_metadata = _ensure_metadata_dict(rec.get("metadata"))
             read_by = _normalize_user_list(rec.get("read_by") or rec_metadata.get(INBOX_METADATA_READ_KEY))
-            lower_trainer = trainer.lower()
             updated = False
-            if all(entry.lower() != lower_trainer for entry in read_by):
+            if _inbox_trainer_key(trainer) not in read_by:
                 new_list = _append_username(read_by, trainer)
                 rec_metadata[INBOX_METADATA_READ_KEY] = new_list
                 try:
@@ -8057,11 +9385,19 @@ def inbox_message(message_id):
         msg = r.data[0]
 
         # Mark as read
-        read_by = msg.get("read_by") or []
-        if trainer not in read_by:
-            read_by.append(trainer)
-            supabase.table("notifications").update({"read_by": read_by}).eq("id", message_id).execute()
-        msg["read_by"] = read_by
+        if USE_NOTIFICATION_RECEIPTS:
+            receipt = _notification_receipts_for(trainer, [message_id]).get(str(message_id)) or {}
+            if not receipt.get("read_at"):
+                _set_notification_receipts([message_id], trainer, read=True)
+                INBOX_UNREAD.record_read(trainer)
+            msg["read_by"] = [trainer]
+        else:
+            read_by = _normalize_user_list(msg.get("read_by"))
+            if _inbox_trainer_key(trainer) not in read_by:
+                read_by = _append_username(read_by, trainer)
+                supabase.table("notifications").update({"read_by": read_by}).eq("id", message_id).execute()
+                INBOX_UNREAD.record_read(trainer)
+            msg["read_by"] = read_by
     except Exception as e:
         print("⚠️ inbox_message (notification) failed:", e)
         abort(500)
@@ -8070,9 +9406,98 @@ def inbox_message(message_id):
     return render_template(template, msg=msg, show_back=False, panel_mode=panel_mode)
 
 
+def _inbox_action_update(row: dict, trainer: str, action: str) -> Optional[dict]:
+    """
+    New read_by/metadata for one notification or redemption row, or None when
+    nothing changes. Lists are rewritten with normalized names, so entries
+    stored under another casing are healed on the next action.
+    """
+    metadata = _ensure_metadata_dict(row.get("metadata"))
+    raw_read = row.get("read_by") or metadata.get(INBOX_METADATA_READ_KEY) or []
+    if action in {"read", "unread"}:
+        read_by = _normalize_user_list(raw_read)
+        new_list = _append_username(read_by, trainer) if action == "read" else _remove_username(read_by, trainer)
+        if new_list == raw_read:
+            return None
+        metadata[INBOX_METADATA_READ_KEY] = new_list
+        return {"read_by": new_list, "metadata": metadata}
+    if action == "delete":
+        raw_hidden = metadata.get(INBOX_METADATA_HIDDEN_KEY) or []
+        new_list = _append_username(_normalize_user_list(raw_hidden), trainer)
+        if new_list == raw_hidden:
+            return None
+        metadata[INBOX_METADATA_HIDDEN_KEY] = new_list
+        return {"metadata": metadata}
+    return None
+
+
+def _inbox_read_change(row: dict, trainer: str, action: str) -> int:
+    """
+    1 when ``action`` moves the row into or out of the trainer's unread count
+    (badge bookkeeping). Hiding an unread message takes it out of the count
+    just like reading it.
+    """
+    metadata = _ensure_metadata_dict(row.get("metadata"))
+    read_by = _normalize_user_list(row.get("read_by") or metadata.get(INBOX_METADATA_READ_KEY))
+    is_read = _inbox_trainer_key(trainer) in read_by
+    if action == "delete":
+        return int(not is_read and not _message_is_hidden(row, trainer))
+    return int((action == "read" and not is_read) or (action == "unread" and is_read))
+
+
+def _record_unread_change(trainer: str, action: str, changed: int) -> None:
+    for _ in range(changed):
+        if action in {"read", "delete"}:
+            INBOX_UNREAD.record_read(trainer)
+        elif action == "unread":
+            INBOX_UNREAD.record_unread(trainer)
+
+
+def _receipt_action_changes(receipts: dict[str, dict], ids: list[str], action: str) -> list[str]:
+    """Ids whose notification_receipts row actually changes for this action."""
+    changed = []
+    for notification_id in ids:
+        receipt = receipts.get(str(notification_id)) or {}
+        if action == "read" and not receipt.get("read_at"):
+            changed.append(notification_id)
+        elif action == "unread" and receipt.get("read_at"):
+            changed.append(notification_id)
+        elif action == "delete" and not receipt.get("hidden_at"):
+            changed.append(notification_id)
+    return changed
+
+
+def _apply_receipt_action(ids: list[str], trainer: str, action: str) -> None:
+    """One receipts lookup plus one batched upsert for any number of notifications."""
+    receipts = _notification_receipts_for(trainer, ids)
+    changed = _receipt_action_changes(receipts, ids, action)
+    if not changed:
+        return
+    if action == "delete":
+        _set_notification_receipts(changed, trainer, hidden=True)
+        # Hidden messages drop out of the badge; only the unread ones were counted.
+        unread = [i for i in changed if not (receipts.get(str(i)) or {}).get("read_at")]
+        _record_unread_change(trainer, action, len(unread))
+    else:
+        _set_notification_receipts(changed, trainer, read=action == "read")
+        _record_unread_change(trainer, action, len(changed))
+
+
+def _handle_notification_receipt_action(message_id: str, trainer: str, action: str) -> bool:
+    """Receipt-table variant: one single-row upsert instead of rewriting arrays."""
+    try:
+        _apply_receipt_action([message_id], trainer, action)
+        return True
+    except Exception as exc:
+        print("⚠️ Notification receipt update failed:", exc)
+        return False
+
+
 def _handle_notification_bulk_action(message_id: str, trainer: str, action: str) -> bool:
     if not supabase:
         return False
+    if USE_NOTIFICATION_RECEIPTS:
+        return _handle_notification_receipt_action(message_id, trainer, action)
     try:
         resp = (
             supabase.table("notifications")
@@ -8087,35 +9512,12 @@ def _handle_notification_bulk_action(message_id: str, trainer: str, action: str)
     rows = resp.data or []
     if not rows:
         return False
-    row = rows[0]
-    metadata = _ensure_metadata_dict(row.get("metadata"))
-    read_by = _normalize_user_list(row.get("read_by") or metadata.get(INBOX_METADATA_READ_KEY))
-    hidden_for = _normalize_user_list(metadata.get(INBOX_METADATA_HIDDEN_KEY))
-
-    updates: dict[str, Any] = {}
-    changed = False
-    if action == "read":
-        new_list = _append_username(read_by, trainer)
-        if new_list != read_by:
-            updates["read_by"] = new_list
-            metadata[INBOX_METADATA_READ_KEY] = new_list
-            changed = True
-    elif action == "unread":
-        new_list = _remove_username(read_by, trainer)
-        if new_list != read_by:
-            updates["read_by"] = new_list
-            metadata[INBOX_METADATA_READ_KEY] = new_list
-            changed = True
-    elif action == "delete":
-        new_list = _append_username(hidden_for, trainer)
-        if new_list != hidden_for:
-            metadata[INBOX_METADATA_HIDDEN_KEY] = new_list
-            changed = True
-    if not changed:
+    updates = _inbox_action_update(rows[0], trainer, action)
+    if updates is None:
         return True
-    updates["metadata"] = metadata
     try:
         supabase.table("notifications").update(updates).eq("id", message_id).execute()
+        _record_unread_change(trainer, action, _inbox_read_change(rows[0], trainer, action))
         return True
     except Exception as exc:
         print("⚠️ Bulk notification update failed:", exc)
@@ -8141,37 +9543,108 @@ def _handle_receipt_bulk_action(message_id: str, trainer: str, action: str) -> b
     rows = resp.data or []
     if not rows:
         return False
-    row = rows[0]
-    metadata = _ensure_metadata_dict(row.get("metadata"))
-    read_by = _normalize_user_list(row.get("read_by") or metadata.get(INBOX_METADATA_READ_KEY))
-    hidden_for = _normalize_user_list(metadata.get(INBOX_METADATA_HIDDEN_KEY))
-
-    changed = False
-    if action == "read":
-        new_list = _append_username(read_by, trainer)
-        if new_list != read_by:
-            metadata[INBOX_METADATA_READ_KEY] = new_list
-            changed = True
-    elif action == "unread":
-        new_list = _remove_username(read_by, trainer)
-        if new_list != read_by:
-            metadata[INBOX_METADATA_READ_KEY] = new_list
-            changed = True
-    elif action == "delete":
-        new_list = _append_username(hidden_for, trainer)
-        if new_list != hidden_for:
-            metadata[INBOX_METADATA_HIDDEN_KEY] = new_list
-            changed = True
-    if not changed:
+    updates = _inbox_action_update(rows[0], trainer, action)
+    if updates is None:
         return True
     try:
-        supabase.table("redemptions").update({"metadata": metadata}).eq("id", rec_id).execute()
+        supabase.table("redemptions").update({"metadata": updates["metadata"]}).eq("id", rec_id).execute()
         return True
     except Exception as exc:
         print("⚠️ Bulk receipt update failed:", exc)
         return False
 
 
+INBOX_BULK_RPC = "inbox_apply_bulk_state"
+
+
+def _write_inbox_bulk_updates(notification_rows: list[dict], redemption_rows: list[dict]) -> set[str]:
+    """
+    Persist computed read/hidden state in one `inbox_apply_bulk_state` call.
+    Until that function exists, fall back to one UPDATE per changed row.
+    Returns the ids ("rec:"-prefixed for redemptions) whose write failed.
+    """
+    if not notification_rows and not redemption_rows:
+        return set()
+    try:
+        supabase.rpc(INBOX_BULK_RPC, {
+            "p_notifications": notification_rows,
+            "p_redemptions": redemption_rows,
+        }).execute()
+        return set()
+    except Exception as exc:
+        print("⚠️ Bulk inbox RPC failed, updating rows individually:", exc)
+    failed: set[str] = set()
+    for row in notification_rows:
+        try:
+            updates = {key: value for key, value in row.items() if key != "id"}
+            supabase.table("notifications").update(updates).eq("id", row["id"]).execute()
+        except Exception as exc:
+            print("⚠️ Bulk notification update failed:", exc)
+            failed.add(str(row["id"]))
+    for row in redemption_rows:
+        try:
+            supabase.table("redemptions").update({"metadata": row["metadata"]}).eq("id", row["id"]).execute()
+        except Exception as exc:
+            print("⚠️ Bulk receipt update failed:", exc)
+            failed.add(f"rec:{row['id']}")
+    return failed
+
+
+def _apply_inbox_bulk_action(message_ids: list[str], trainer: str, action: str) -> dict[str, bool]:
+    """
+    Apply one action to many inbox messages with a single `in_` fetch per
+    table and one batched write. Missing rows (or rows belonging to another
+    trainer) report False, exactly like the per-message handlers.
+    """
+    notification_ids = [mid for mid in message_ids if not mid.startswith("rec:")]
+    receipt_ids = {mid.split("rec:", 1)[1]: mid for mid in message_ids if mid.startswith("rec:")}
+    outcome: dict[str, bool] = {mid: False for mid in message_ids}
+
+    notification_updates: list[dict] = []
+    read_changes: dict[str, int] = {}
+    if notification_ids:
+        if USE_NOTIFICATION_RECEIPTS:
+            resp = supabase.table("notifications").select("id").in_("id", notification_ids).execute()
+            existing = [str(row.get("id")) for row in (resp.data or [])]
+            _apply_receipt_action(existing, trainer, action)
+            outcome.update({notification_id: True for notification_id in existing})
+        else:
+            resp = (supabase.table("notifications")
+                    .select("id, read_by, metadata")
+                    .in_("id", notification_ids)
+                    .execute())
+            for row in resp.data or []:
+                outcome[str(row.get("id"))] = True
+                updates = _inbox_action_update(row, trainer, action)
+                if updates is not None:
+                    notification_updates.append({"id": row.get("id"), **updates})
+                    read_changes[str(row.get("id"))] = _inbox_read_change(row, trainer, action)
+
+    redemption_updates: list[dict] = []
+    if receipt_ids:
+        resp = (supabase.table("redemptions")
+                .select("id, trainer_username, metadata, read_by")
+                .in_("id", list(receipt_ids))
+                .eq("trainer_username", trainer)
+                .execute())
+        for row in resp.data or []:
+            message_id = receipt_ids.get(str(row.get("id")))
+            if message_id is None:
+                continue
+            outcome[message_id] = True
+            updates = _inbox_action_update(row, trainer, action)
+            if updates is not None:
+                redemption_updates.append({"id": row.get("id"), "metadata": updates["metadata"]})
+
+    failed = _write_inbox_bulk_updates(notification_updates, redemption_updates)
+    for message_id in failed:
+        outcome[message_id] = False
+    _record_unread_change(
+        trainer, action, sum(change for row_id, change in read_changes.items() if row_id not in failed)
+    )
+    return outcome
+
+
 @app.post("/api/inbox/bulk")
 def api_inbox_bulk_actions():
     if "trainer" not in session:
@@ -8184,16 +9657,19 @@ def api_inbox_bulk_actions():
     if not isinstance(message_ids, list) or not message_ids:
         return jsonify({"success": False, "error": "No messages selected."}), 400
     trainer = session["trainer"]
-    results = []
-    for raw_id in message_ids:
-        message_id = str(raw_id or "").strip()
-        if not message_id:
-            continue
-        if message_id.startswith("rec:"):
-            ok = _handle_receipt_bulk_action(message_id, trainer, action)
-        else:
-            ok = _handle_notification_bulk_action(message_id, trainer, action)
-        results.append({"id": message_id, "success": ok})
+    message_ids = [mid for mid in (str(raw_id or "").strip() for raw_id in message_ids) if mid]
+    try:
+        outcome = _apply_inbox_bulk_action(message_ids, trainer, action) if supabase else {}
+    except Exception as exc:
+        # A malformed id can fail the whole in_() query; fall back to per-message handling.
+        print("⚠️ Bulk inbox action failed, retrying per message:", exc)
+        outcome = {}
+        for message_id in message_ids:
+            if message_id.startswith("rec:"):
+                outcome[message_id] = _handle_receipt_bulk_action(message_id, trainer, action)
+            else:
+                outcome[message_id] = _handle_notification_bulk_action(message_id, trainer, action)
+    results = [{"id": message_id, "success": outcome.get(message_id, False)} for message_id in message_ids]
     return jsonify({"success": True, "results": results})
 
 
@@ -8300,8 +9776,57 @@ def community_bulletin_post(slug):
     )
 
 
+BULLETIN_LIKE_RPC = "bulletin_toggle_like"
+
+
+def _toggle_bulletin_like_tables(post_id: str, trainer: str) -> tuple[bool, int]:
+    """
+    Same contract as the bulletin_toggle_like RPC, built from table calls.
+    Serves installs without the function (tests/supabase_stub.py reports an
+    unregistered RPC the same way); it is not atomic, so the RPC is preferred
+    whenever it exists.
+    """
+    removed = (supabase.table("bulletin_post_likes")
+               .delete()
+               .eq("post_id", post_id)
+               .eq("trainer_username", trainer)
+               .execute().data or [])
+    liked = not removed
+    if liked:
+        supabase.table("bulletin_post_likes").insert({
+            "post_id": post_id,
+            "trainer_username": trainer,
+        }).execute()
+    resp = (supabase.table("bulletin_post_likes")
+            .select("post_id", count="exact")
+            .eq("post_id", post_id)
+            .limit(1)
+            .execute())
+    like_count = int(resp.count or 0)
+    supabase.table("bulletin_posts").update({"like_count": like_count}).eq("id", post_id).execute()
+    return liked, like_count
+
+
+def toggle_bulletin_like(post_id: str, trainer: str) -> tuple[bool, int]:
+    """
+    Flip the trainer's like and return (liked, like_count) in one round trip.
+    Falls back to table calls only while the RPC is not deployed; any other
+    error re-raises, since the toggle may have committed before the response
+    was lost and a second flip would undo it.
+    """
+    try:
+        rows = supabase.rpc(BULLETIN_LIKE_RPC, {"p_post_id": post_id, "p_trainer": trainer}).execute().data
+    except Exception as exc:
+        if not _rpc_missing(exc):
+            raise
+        print("⚠️ Like toggle RPC not deployed, using table calls:", exc)
+        return _toggle_bulletin_like_tables(post_id, trainer)
+    row = (rows[0] if isinstance(rows, list) and rows else rows) or {}
+    return bool(row.get("liked")), int(row.get("like_count") or 0)
+
+
 def _bulletin_post_for_api(slug: str) -> tuple[Optional[dict], Optional[str]]:
-    post = fetch_bulletin_post_from_supabase(slug, include_sections=False)
+    post = BULLETIN_FEED.post(slug) or fetch_bulletin_post_from_supabase(slug, include_sections=False)
     if not post:
         return None, None
     return post, post.get("id")
@@ -8317,33 +9842,12 @@ def api_bulletin_like(slug):
     if not post_id:
         return jsonify({"error": "Post not found"}), 404
     trainer = session["trainer"]
-    liked = False
-    like_count = post.get("like_count") or 0
     try:
-        existing = (supabase.table("bulletin_post_likes")
-                    .select("trainer_username")
-                    .eq("post_id", post_id)
-                    .eq("trainer_username", trainer)
-                    .limit(1)
-                    .execute().data or [])
-        if existing:
-            supabase.table("bulletin_post_likes").delete().eq("post_id", post_id).eq("trainer_username", trainer).execute()
-            liked = False
-        else:
-            supabase.table("bulletin_post_likes").insert({
-                "post_id": post_id,
-                "trainer_username": trainer,
-            }).execute()
-            liked = True
-        like_rows = (supabase.table("bulletin_post_likes")
-                     .select("post_id")
-                     .eq("post_id", post_id)
-                     .execute().data or [])
-        like_count = len(like_rows)
-        supabase.table("bulletin_posts").update({"like_count": like_count}).eq("id", post_id).execute()
+        liked, like_count = toggle_bulletin_like(post_id, trainer)
     except Exception as exc:
         print("⚠️ Supabase like toggle failed:", exc)
         return jsonify({"error": "Unable to toggle like"}), 500
+    BULLETIN_FEED.patch(post_id, like_count=like_count)
     return jsonify({"liked": liked, "like_count": like_count})
 
 
@@ -8356,9 +9860,25 @@ def api_bulletin_comments(slug):
         return jsonify({"error": "Post not found"}), 404
 
     if request.method == "GET":
-        comments = fetch_bulletin_comments_from_supabase(post_id)
+        since_token = request.args.get("since")
+        if since_token:
+            since = decode_cursor(since_token)
+            if since is None or len(since) != 2:
+                return jsonify({"error": "Invalid cursor"}), 400
+            try:
+                rows = _fetch_bulletin_comment_rows(post_id, since)
+            except Exception as exc:
+                print("⚠️ Supabase bulletin comments delta fetch failed:", exc)
+                return jsonify({"error": "Unable to load comments"}), 500
+            new_comments = [_bulletin_comment_node(row) for row in rows]
+            _hydrate_comment_media_urls(new_comments)
+            return jsonify({
+                "new_comments": new_comments,
+                "cursor": _bulletin_comment_cursor(rows) or since_token,
+            })
+        comments, cursor = fetch_bulletin_comments_from_supabase(post_id, with_cursor=True)
         _hydrate_comment_media_urls(comments)
-        return jsonify({"comments": comments, "count": _count_comment_nodes(comments)})
+        return jsonify({"comments": comments, "count": _count_comment_nodes(comments), "cursor": cursor})
 
     if "trainer" not in session:
         return jsonify({"error": "Login required"}), 401
@@ -8391,15 +9911,10 @@ def api_bulletin_comments(slug):
         "trainer_avatar": trainer_avatar,
     }
     if parent_id:
-        parent_depth = _bulletin_comment_depth(post_id, parent_id)
-        if parent_depth is None:
-            return jsonify({"error": "Parent comment not found"}), 400
-        if parent_depth >= MAX_BULLETIN_COMMENT_DEPTH:
-            return jsonify({"error": "Replies can only nest two levels deep"}), 400
-        insert_payload["parent_comment_id"] = parent_id
+        # One lookup validates the parent; its stored depth/root_id bound the nesting.
         try:
             lookup = (supabase.table("bulletin_post_comments")
-                      .select("id, post_id, trainer_username, body, created_at")
+                      .select("*")
                       .eq("id", parent_id)
                       .limit(1)
                       .execute())
@@ -8411,6 +9926,17 @@ def api_bulletin_comments(slug):
             return jsonify({"error": "Parent comment not found"}), 400
         if str(parent_comment_row.get("post_id")) != str(post_id):
             return jsonify({"error": "Parent comment mismatch"}), 400
+        if "depth" in parent_comment_row:
+            parent_depth = int(parent_comment_row.get("depth") or 0)
+            insert_payload["depth"] = parent_depth + 1
+            insert_payload["root_id"] = parent_comment_row.get("root_id") or parent_comment_row.get("id")
+        else:
+            parent_depth = _bulletin_comment_depth(post_id, parent_id)
+            if parent_depth is None:
+                return jsonify({"error": "Parent comment not found"}), 400
+        if parent_depth >= MAX_BULLETIN_COMMENT_DEPTH:
+            return jsonify({"error": "Replies can only nest two levels deep"}), 400
+        insert_payload["parent_comment_id"] = parent_id
 
     inserted_comment = None
     try:
@@ -8419,22 +9945,24 @@ def api_bulletin_comments(slug):
     except Exception as exc:
         print("⚠️ Supabase comment insert failed:", exc)
         return jsonify({"error": "Unable to post comment"}), 500
-
-    if parent_comment_row:
-        reply_snapshot = inserted_comment or {
+    if not inserted_comment:
+        inserted_comment = {
+            **insert_payload,
             "id": None,
-            "body": clean_body,
-            "trainer_username": trainer,
             "created_at": datetime.utcnow().replace(tzinfo=timezone.utc).isoformat(),
         }
+
+    if parent_comment_row:
         try:
-            _send_comment_reply_notification(post, slug, parent_comment_row, reply_snapshot, trainer)
+            _send_comment_reply_notification(post, slug, parent_comment_row, inserted_comment, trainer)
         except Exception as exc:
             print("⚠️ Comment reply notification send failed:", exc)
 
-    comments = fetch_bulletin_comments_from_supabase(post_id)
-    _hydrate_comment_media_urls(comments)
-    return jsonify({"comments": comments, "count": _count_comment_nodes(comments)})
+    comment = _bulletin_comment_node(inserted_comment)
+    if parent_comment_row:
+        comment["depth"] = parent_depth + 1
+    _hydrate_comment_media_urls([comment])
+    return jsonify({"comment": comment}), 201
 
 
 @app.route("/api/trainers/<username>/profile", methods=["GET"])
@@ -8468,6 +9996,7 @@ def api_update_trainer_bio():
     username = session["trainer"]
     try:
         supabase.table("sheet1").update({"trainerbio": bio}).eq("trainer_username", username).execute()
+        invalidate_trainer_record(username)
     except Exception as exc:
         print("⚠️ Supabase trainer bio update failed:", exc)
         return jsonify({"error": "Unable to update trainer bio"}), 500
@@ -8509,6 +10038,7 @@ def api_update_profile_meta():
     username = session["trainer"]
     try:
         supabase.table("sheet1").update(updates).eq("trainer_username", username).execute()
+        invalidate_trainer_record(username)
     except Exception as exc:
         print("⚠️ Supabase trainer meta update failed:", exc)
         return jsonify({"error": "Unable to update profile"}), 500
@@ -8809,6 +10339,7 @@ def change_pin():
         supabase.table("sheet1").update({
             "pin_hash": new_hash,
         }).eq("trainer_username", trainer_username).execute()
+        invalidate_trainer_record(trainer_username)
     except Exception as exc:
         print("⚠️ Supabase change_pin failed:", exc)
         flash("Unable to update PIN right now. Please try again soon.", "error")
@@ -8845,6 +10376,7 @@ def change_memorable():
         supabase.table("sheet1").update({
             "memorable_password": new_memorable,
         }).eq("trainer_username", trainer_username).execute()
+        invalidate_trainer_record(trainer_username)
     except Exception as exc:
         print("⚠️ Supabase change_memorable failed:", exc)
         flash("Unable to update memorable password right now. Please try again soon.", "error")
@@ -8886,6 +10418,7 @@ def delete_account():
 
     try:
         supabase.table("sheet1").delete().eq("trainer_username", trainer_username).execute()
+        invalidate_trainer_record(trainer_username)
     except Exception as exc:
         print("⚠️ Supabase delete_account failed:", exc)
         flash("Unable to delete your account right now. Please try again soon.", "error")
@@ -8946,17 +10479,14 @@ def passport():
             lugia_summary["most_recent_event"] = r.get("most_recent_event", "")
             lugia_summary["most_recent_event_date"] = r.get("most_recent_event_date", "")
 
-            ev_rows = supabase.table("events").select("event_id, cover_photo_url").execute().data or []
-            ev_map = {str(e.get("event_id", "")).strip().lower(): e.get("cover_photo_url") for e in ev_rows}
-
             feid = (r.get("first_event_id") or "").strip().lower()
-            ficon = ev_map.get(feid) if feid else None
+            ficon = EVENT_CATALOG.cover_for_id(feid) if feid else None
             if not ficon:
                 ficon = cover_from_event_name(r.get("first_attended_event", ""))
             lugia_summary["first_event_icon"] = ficon or lugia_summary["first_event_icon"]
 
             meid = (r.get("most_recent_event_id") or "").strip().lower()
-            micon = ev_map.get(meid) if meid else None
+            micon = EVENT_CATALOG.cover_for_id(meid) if meid else None
             if not micon:
                 micon = cover_from_event_name(r.get("most_recent_event", ""))
             lugia_summary["most_recent_icon"] = micon or lugia_summary["most_recent_icon"]
@@ -9209,15 +10739,15 @@ def catalog():
     # Pull active catalog items
     items = []
     if supabase:
-        try:
-            resp = (supabase.table("catalog_items")
-                    .select("*")
-                    .eq("active", True)
-                    .order("created_at", desc=True)
-                    .execute())
-            items = resp.data or []
-        except Exception as e:
-            print("⚠️ catalog items fetch failed:", e)
+        items = cached_read(
+            ("catalog_items", "active"),
+            lambda: (supabase.table("catalog_items")
+                     .select("*")
+                     .eq("active", True)
+                     .order("created_at", desc=True)
+                     .execute().data or []),
+            fallback=[],
+        )
 
     # Normalize fields used by the template
     for it in items:
@@ -9426,8 +10956,8 @@ def catalog_redeem(item_id):
 
     trainer = session["trainer"]
 
-    # Load user + balance
-    _, user = find_user(trainer)
+    # Load user + balance (fresh: the cached profile can lag other workers' awards)
+    _, user = find_user(trainer, fresh=True)
     if not user:
         flash("User not found.", "error")
         return redirect(url_for("catalog"))
@@ -9461,21 +10991,18 @@ def catalog_redeem(item_id):
         return redirect(url_for("catalog_item", item_id=item_id))
 
     # Meetups (active + upcoming)
-    meetups = []
-    try:
-        today_iso = date.today().isoformat()
-        m = (
-            supabase.table("meetups")
-            .select("*")
-            .eq("active", True)
-            .gte("date", today_iso)
-            .order("date", desc=False)
-            .order("start_time", desc=False)
-            .execute()
-        )
-        meetups = m.data or []
-    except Exception as e:
-        print("⚠️ redeem: fetch meetups failed:", e)
+    today_iso = date.today().isoformat()
+    meetups = cached_read(
+        ("meetups", "upcoming", today_iso),
+        lambda: (supabase.table("meetups")
+                 .select("*")
+                 .eq("active", True)
+                 .gte("date", today_iso)
+                 .order("date", desc=False)
+                 .order("start_time", desc=False)
+                 .execute().data or []),
+        fallback=[],
+    )
 
     if request.method == "GET":
         return render_template(
@@ -9550,15 +11077,17 @@ def catalog_redeem(item_id):
     # Deduct stamps via Lugia (ledger)
     cost = item["cost_stamps"]
     reason = f"Catalog Redemption: {item.get('name')}"
-    ok, lugia_msg = adjust_stamps(trainer, cost, reason, "remove")
+    ok, lugia_msg, ledger_total = adjust_stamps_with_total(trainer, cost, reason, "remove")
     if not ok:
         flash("Could not deduct stamps. Try again in a moment.", "error")
         return redirect(url_for("catalog_redeem", item_id=item_id))
 
-    # Update balance mirror (best effort) now that stock is confirmed
+    # Update balance mirror (best effort) now that stock is confirmed. The
+    # ledger's own total includes awards made elsewhere since we read ours.
     try:
-        new_balance = max(0, balance - cost)
+        new_balance = max(0, int(ledger_total) if ledger_total is not None else balance - cost)
         supabase.table("sheet1").update({"stamps": new_balance}).eq("trainer_username", trainer).execute()
+        invalidate_trainer_record(trainer)
     except Exception as e:
         print("⚠️ redeem: mirror stamp update failed:", e)
 
@@ -9597,6 +11126,9 @@ def catalog_redeem(item_id):
         flash("Your order couldn't be created. Stamps were deducted, contact admin.", "error")
         return redirect(url_for("catalog"))
 
+    # Stock may have changed; the public catalog list rereads it.
+    invalidate_read_cache("catalog_items")
+
     # Send inbox message with receipt link (best effort)
     try:
         receipt_url = absolute_url(url_for("catalog_receipt", redemption_id=red_id))
@@ -9657,29 +11189,23 @@ def ocr_test():
             flash("Please upload a screenshot.", "error")
             return redirect(url_for("ocr_test"))
 
-        filepath = os.path.join(app.config["UPLOAD_FOLDER"], secure_filename(file.filename))
-        file.save(filepath)
         try:
-            img = Image.open(filepath)
-            w, h = img.size
-            top, bottom = int(h * 0.15), int(h * 0.25)
-            left, right = int(w * 0.05), int(w * 0.90)
-            cropped = img.crop((left, top, right, bottom))
-            text = pytesseract.image_to_string(cropped)
-
-            buf = io.BytesIO()
-            cropped.save(buf, format="PNG")
-            b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-
-            return f"""
-                <h2>OCR Test Result</h2>
-                <p><b>Detected Text:</b> {text}</p>
-                <h3>Cropped Region:</h3>
-                <img src="data:image/png;base64,{b64}" style="max-width:100%;border:1px solid #ccc;" />
-                <p><a href="/ocr_test">Try another</a></p>
-            """
-        finally:
-            os.remove(filepath)
+            result = OCR_ENGINE.read_trainer_name(file.stream)
+        except (OcrError, OSError) as exc:
+            flash(f"OCR failed: {exc}", "error")
+            return redirect(url_for("ocr_test"))
+
+        buf = io.BytesIO()
+        result.region.save(buf, format="PNG")
+        b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
+
+        return f"""
+            <h2>OCR Test Result</h2>
+            <p><b>Detected Text:</b> {escape(result.text or "")} <small>({result.ms:.0f} ms)</small></p>
+            <h3>Preprocessed Region:</h3>
+            <img src="data:image/png;base64,{b64}" style="max-width:100%;border:1px solid #ccc;" />
+            <p><a href="/ocr_test">Try another</a></p>
+        """
 
     return """
         <h2>OCR Test</h2>
@@ -9756,6 +11282,7 @@ def change_avatar():
                 }) \
                 .eq("trainer_username", session["trainer"]) \
                 .execute()
+            invalidate_trainer_record(session["trainer"])
         except Exception as e:
             print("⚠️ Failed updating Supabase avatar/background:", e)
             flash("Unable to update appearance right now. Please try again soon.", "error")
@@ -9787,7 +11314,7 @@ def change_avatar():
 @app.context_processor
 def inject_current_avatar():
     if "trainer" in session:
-        _, user = find_user(session["trainer"])
+        user = get_current_trainer_user()
         if user:
             return {"current_avatar": user.get("avatar_icon", "avatar1.png")}
     return {"current_avatar": "avatar1.png"}
@@ -9796,7 +11323,7 @@ def inject_current_avatar():
 @app.context_processor
 def inject_nav_data():
     if "trainer" in session:
-        _, user = find_user(session["trainer"])
+        user = get_current_trainer_user()
         if user:
             return {"current_stamps": user.get("stamps", 0)}
     return {"current_stamps": 0}
@@ -9817,7 +11344,7 @@ def inject_inbox_preview():
 @app.context_processor
 def inject_account_type():
     if "trainer" in session:
-        _, user = find_user(session["trainer"])
+        user = get_current_trainer_user()
         if user:
             return {"account_type": normalize_account_type(user.get("account_type"))}
     return {"account_type": "Guest"}
@@ -0,0 +1,273 @@
+"""
+Static image pipeline: content-hashed copies of the PNG/JPEG files under
+static/, WebP/AVIF variants and smaller responsive widths, all described by
+static/build/asset-manifest.json.
+
+`build_assets` runs at deploy time (scripts/build_assets.py); the app reads
+the manifest through `AssetManifest` to rewrite url_for("static", ...) to the
+hashed files, which can then be cached forever.
+
+URLs always name the hashed file in its original format, so they are the
+same for every client and safe to keep in shared caches. The WebP/AVIF
+variant is picked when that URL is served (`variant_for`), from the image
+request's own Accept header.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from PIL import Image, features
+
+from rdab.cache import MtimeMemo
+
+BUILD_DIR = "build"
+MANIFEST_NAME = "asset-manifest.json"
+IMAGE_SUFFIXES = frozenset({".png", ".jpg", ".jpeg"})
+DEFAULT_WIDTHS = (160, 320, 640, 1280)
+# Bump when encoder settings change so every output is regenerated.
+PIPELINE_VERSION = "1"
+FORMAT_MIME = {"avif": "image/avif", "webp": "image/webp"}
+# Preferred first when the client accepts several.
+VARIANT_FORMATS = ("avif", "webp")
+
+
+def available_formats() -> tuple[str, ...]:
+    """Variant formats this Pillow build can encode."""
+    return tuple(fmt for fmt in VARIANT_FORMATS if features.check(fmt))
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(PIPELINE_VERSION.encode() + data).hexdigest()[:12]
+
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "webp":
+        img.save(buf, "WEBP", quality=80, method=4)
+    elif fmt == "avif":
+        img.save(buf, "AVIF", quality=60, speed=8)
+    elif fmt == "png":
+        img.save(buf, "PNG", optimize=True)
+    else:
+        img.convert("RGB").save(buf, "JPEG", quality=82, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+def _normalized_mode(img: Image.Image) -> Image.Image:
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    target = "RGBA" if has_alpha else "RGB"
+    return img if img.mode == target else img.convert(target)
+
+
+class _Writer:
+    """Writes build outputs under ``static_dir`` and remembers what it kept."""
+
+    def __init__(self, static_dir: Path):
+        self.static_dir = static_dir
+        self.written = 0
+        self.kept: set[str] = set()
+
+    def exists(self, rel: str) -> bool:
+        return (self.static_dir / rel).exists()
+
+    def write(self, rel: str, data: bytes) -> str:
+        path = self.static_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self.written += 1
+        self.kept.add(rel)
+        return rel
+
+
+def _build_entry(source: Path, rel: str, data: bytes, writer: _Writer,
+                 widths: Iterable[int], formats: Iterable[str]) -> dict:
+    digest = _content_hash(data)
+    parent = Path(rel).parent.as_posix()
+    stem, suffix = Path(rel).stem, Path(rel).suffix.lower()
+    base = f"{BUILD_DIR}/{parent + '/' if parent != '.' else ''}{stem}.{digest}"
+    own_format = "png" if suffix == ".png" else "jpeg"
+
+    entry: dict = {"hash": digest, "file": f"{base}{suffix}", "formats": {}, "sizes": {}}
+    writer.write(entry["file"], data)
+
+    with Image.open(source) as opened:
+        entry["width"], entry["height"] = opened.size
+        if getattr(opened, "is_animated", False):
+            return entry  # hashed copy only; re-encoding would drop frames
+        img = _normalized_mode(opened)
+        img.load()
+
+    width, height = entry["width"], entry["height"]
+    for fmt in formats:
+        encoded = _encode(img, fmt)
+        if len(encoded) < len(data):
+            entry["formats"][fmt] = writer.write(f"{base}.{fmt}", encoded)
+
+    for target in sorted({int(w) for w in widths}):
+        if target >= width:
+            continue
+        resized = img.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+        size_entry = {own_format: writer.write(f"{base}.w{target}{suffix}", _encode(resized, own_format))}
+        for fmt in formats:
+            size_entry[fmt] = writer.write(f"{base}.w{target}.{fmt}", _encode(resized, fmt))
+        entry["sizes"][str(target)] = size_entry
+    return entry
+
+
+def _entry_files(entry: dict) -> set[str]:
+    files = {entry["file"], *entry.get("formats", {}).values()}
+    for size_entry in entry.get("sizes", {}).values():
+        files.update(size_entry.values())
+    return files
+
+
+def build_assets(
+    static_dir: Path,
+    *,
+    widths: Iterable[int] = DEFAULT_WIDTHS,
+    formats: Optional[Iterable[str]] = None,
+    prune: bool = False,
+    log: Callable[[str], None] = print,
+) -> dict:
+    """
+    Build (or incrementally refresh) static/build and its manifest. Sources
+    whose content hash matches the previous manifest are reused untouched,
+    so re-running after adding a few images only encodes those.
+    """
+    static_dir = Path(static_dir)
+    widths = tuple(widths)
+    formats = tuple(formats) if formats is not None else available_formats()
+    manifest_path = static_dir / BUILD_DIR / MANIFEST_NAME
+    try:
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        previous = {}
+    settings = {"version": PIPELINE_VERSION, "widths": list(widths), "formats": list(formats)}
+    reusable = previous.get("assets", {}) if previous.get("settings") == settings else {}
+
+    writer = _Writer(static_dir)
+    assets: dict[str, dict] = {}
+    built = reused = 0
+    for source in sorted(static_dir.rglob("*")):
+        if source.suffix.lower() not in IMAGE_SUFFIXES or not source.is_file():
+            continue
+        rel = source.relative_to(static_dir).as_posix()
+        if rel.startswith(f"{BUILD_DIR}/"):
+            continue
+        data = source.read_bytes()
+        old = reusable.get(rel)
+        if old and old.get("hash") == _content_hash(data) and all(writer.exists(f) for f in _entry_files(old)):
+            assets[rel] = old
+            writer.kept.update(_entry_files(old))
+            reused += 1
+            continue
+        try:
+            assets[rel] = _build_entry(source, rel, data, writer, widths, formats)
+            built += 1
+        except Exception as exc:
+            log(f"⚠️ Skipping {rel}: {exc}")
+
+    manifest = {"settings": settings, "assets": assets}
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, manifest_path)
+
+    pruned = 0
+    if prune:
+        for path in (static_dir / BUILD_DIR).rglob("*"):
+            rel = path.relative_to(static_dir).as_posix()
+            if path.is_file() and path != manifest_path and rel not in writer.kept:
+                path.unlink()
+                pruned += 1
+    return {"assets": len(assets), "built": built, "reused": reused, "files_written": writer.written,
+            "pruned": pruned, "formats": list(formats)}
+
+
+class AssetManifest:
+    """
+    Read side of the pipeline. Reloads the manifest when the file changes,
+    and resolves to the original filename for anything not in it (or when
+    no build has run), so a missing build only costs the optimization.
+    """
+
+    def __init__(self, static_dir: Path, *, enabled: bool = True):
+        self.enabled = enabled
+        self._memo = MtimeMemo(Path(static_dir) / BUILD_DIR / MANIFEST_NAME, self._load)
+
+    def _load(self) -> tuple[dict, str, dict]:
+        try:
+            raw = self._memo.path.read_bytes()
+            assets = json.loads(raw).get("assets", {})
+        except (OSError, ValueError):
+            return {}, "unbuilt", {}
+        # hashed original-format path -> {variant format: path}
+        variants: dict[str, dict] = {}
+        for entry in assets.values():
+            if entry.get("formats"):
+                variants[entry["file"]] = entry["formats"]
+            for size_entry in entry.get("sizes", {}).values():
+                own = _own_format_path(size_entry)
+                formats = {fmt: path for fmt, path in size_entry.items() if fmt in FORMAT_MIME}
+                if own and formats:
+                    variants[own] = formats
+        return assets, hashlib.sha256(raw).hexdigest()[:12], variants
+
+    @property
+    def version(self) -> str:
+        """Changes whenever a build changes the manifest ("unbuilt" without one)."""
+        return self._memo.get()[1] if self.enabled else "disabled"
+
+    def entry(self, filename: str) -> Optional[dict]:
+        if not self.enabled or not filename:
+            return None
+        return self._memo.get()[0].get(filename.lstrip("/"))
+
+    @staticmethod
+    def is_hashed(filename: str) -> bool:
+        return (filename or "").startswith(f"{BUILD_DIR}/")
+
+    def resolve(self, filename: str) -> str:
+        """Hashed path for ``filename`` (original format); unchanged when unknown."""
+        entry = self.entry(filename)
+        return filename if entry is None else entry["file"]
+
+    def srcset(self, filename: str) -> list[tuple[str, int]]:
+        """(hashed path, width) candidates for an ``srcset``; empty when unknown."""
+        entry = self.entry(filename)
+        if entry is None:
+            return []
+        candidates = []
+        for width, size_entry in sorted(entry["sizes"].items(), key=lambda item: int(item[0])):
+            candidates.append((_own_format_path(size_entry) or next(iter(size_entry.values())), int(width)))
+        candidates.append((entry["file"], int(entry["width"])))
+        return candidates
+
+    def has_variants(self, hashed_path: str) -> bool:
+        """True when the response for ``hashed_path`` depends on Accept."""
+        return self.enabled and hashed_path in self._memo.get()[2]
+
+    def variant_for(self, hashed_path: str, accepted: Iterable[str]) -> Optional[str]:
+        """Best WebP/AVIF file to serve for ``hashed_path`` given Accept, or None."""
+        if not self.enabled:
+            return None
+        formats = self._memo.get()[2].get(hashed_path)
+        if not formats:
+            return None
+        accepted = set(accepted)
+        for fmt in VARIANT_FORMATS:
+            if fmt in formats and FORMAT_MIME[fmt] in accepted:
+                return formats[fmt]
+        return None
+
+
+def _own_format_path(size_entry: dict) -> Optional[str]:
+    return next((path for fmt, path in size_entry.items() if fmt not in FORMAT_MIME), None)
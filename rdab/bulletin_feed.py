@@ -0,0 +1,110 @@
+"""
+In-memory view of the published community bulletin: newest-first list and
+per-slug detail (with sections), built once per content snapshot.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+VISIBLE_STATUSES = ("published", "scheduled")
+
+
+class BulletinFeed:
+    """
+    ``load`` returns the current list of published + scheduled posts (with
+    sections); it is expected to be cached upstream and to hand back the same
+    list object until the content changes, so indexes are rebuilt only then.
+
+    Scheduled posts are kept in the snapshot and become visible once their
+    ``scheduled_publish_at`` passes, so they go live on time without a refetch.
+    """
+
+    def __init__(self, load: Callable[[], list[dict]], parse_dt: Callable[[object], datetime]):
+        self._load = load
+        self._parse_dt = parse_dt
+        self._lock = threading.Lock()
+        self._snapshot: Optional[list[dict]] = None
+        self._live: list[tuple[datetime, dict]] = []
+        self._scheduled: list[tuple[datetime, dict]] = []
+        self._visible: list[dict] = []
+        self._by_slug: dict[str, dict] = {}
+        self._visible_until: Optional[datetime] = None
+
+    def _index(self, snapshot: list[dict]) -> None:
+        live: list[tuple[datetime, dict]] = []
+        scheduled: list[tuple[datetime, dict]] = []
+        for post in snapshot:
+            status = (post.get("status") or "").lower()
+            if status == "scheduled":
+                when = post.get("scheduled_publish_at") or post.get("published_at")
+                if when:  # scheduled without a time stays hidden until edited
+                    scheduled.append((self._parse_dt(when), post))
+            else:
+                live.append((self._parse_dt(post.get("published_at")), post))
+        scheduled.sort(key=lambda item: item[0])
+        self._snapshot = snapshot
+        self._live = live
+        self._scheduled = scheduled
+        self._visible_until = None  # force a rebuild of the visible list
+
+    def _go_live(self, go_live: datetime, post: dict) -> dict:
+        shown = dict(post)
+        shown["status"] = "published"
+        if not shown.get("published_at"):
+            shown["published_at"] = go_live.isoformat()
+        return shown
+
+    def _refresh(self, now: datetime) -> None:
+        snapshot = self._load()
+        with self._lock:
+            if snapshot is not self._snapshot:
+                self._index(snapshot)
+            if self._visible_until is not None and now < self._visible_until:
+                return
+            entries = list(self._live)
+            upcoming = None
+            for go_live, post in self._scheduled:
+                if go_live <= now:
+                    entries.append((go_live, self._go_live(go_live, post)))
+                else:
+                    upcoming = go_live
+                    break
+            entries.sort(key=lambda item: item[0], reverse=True)
+            self._visible = [post for _, post in entries]
+            self._by_slug = {(post.get("slug") or "").lower(): post for post in self._visible if post.get("slug")}
+            # Rebuild again when the next scheduled post is due.
+            self._visible_until = upcoming or datetime.max.replace(tzinfo=timezone.utc)
+
+    def patch(self, post_id, **fields) -> None:
+        """Update counters (e.g. like_count) in place without reloading the snapshot."""
+        with self._lock:
+            for post in list(self._snapshot or []) + self._visible:
+                if str(post.get("id")) == str(post_id):
+                    post.update(fields)
+
+    def posts(self, include_sections: bool = False, *, now: Optional[datetime] = None) -> list[dict]:
+        """Visible posts, newest first; each caller gets its own copies."""
+        self._refresh(now or datetime.now(timezone.utc))
+        with self._lock:
+            visible = list(self._visible)
+        if include_sections:
+            return copy.deepcopy(visible)
+        trimmed = []
+        for post in visible:
+            item = dict(post)
+            item["content_sections"] = []
+            trimmed.append(item)
+        return trimmed
+
+    def post(self, slug: str | None, *, now: Optional[datetime] = None) -> Optional[dict]:
+        """A visible post (with sections) by slug, or None."""
+        if not slug:
+            return None
+        self._refresh(now or datetime.now(timezone.utc))
+        with self._lock:
+            post = self._by_slug.get(slug.lower())
+        return copy.deepcopy(post) if post else None
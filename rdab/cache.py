@@ -0,0 +1,343 @@
+"""
+Small in-process caches shared by the RDAB Flask app.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+    Each gunicorn worker keeps its own copy, so writers should call
+    ``evict`` on the keys they touch and rely on the TTL for other workers.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = max(0.0, float(ttl))
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        lifetime = self.ttl if ttl is None else max(0.0, float(ttl))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + lifetime, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for sizing the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit open for {name}; retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Classic closed → open → half-open breaker. After ``failure_threshold``
+    consecutive failures calls are refused for ``reset_seconds``; then one
+    probe is let through and its outcome closes or re-opens the circuit.
+    A probe that reports no outcome within ``probe_timeout`` seconds is
+    treated as lost and another one is allowed, so the circuit can never
+    stay open for good.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        probe_timeout: float = 60.0,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = max(0.0, float(reset_seconds))
+        self.probe_timeout = max(0.0, float(probe_timeout))
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> None:
+        """Raise `CircuitOpenError` if the call should not be attempted."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            waited = now - self._opened_at
+            probe_lost = (
+                self._probe_started is not None and now - self._probe_started >= self.probe_timeout
+            )
+            if waited >= self.reset_seconds and (self._probe_started is None or probe_lost):
+                self._probe_started = now
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.name, max(0.0, self.reset_seconds - waited))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probe_started is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_started = None
+
+    def stats(self) -> dict:
+        state = self.state
+        with self._lock:
+            return {"state": state, "failures": self._failures, "rejected": self.rejected}
+
+
+class StaleWhileRevalidateCache:
+    """
+    Read-through cache for slow-changing datasets.
+
+    Fresh values (younger than ``ttl``) are returned as-is. Older values are
+    still returned immediately while one background thread reloads them.
+    If a reload fails the last good value keeps serving (up to
+    ``max_stale`` seconds), so an upstream outage degrades to stale data
+    instead of empty pages. Only a cold miss blocks on the loader.
+
+    Every key has a generation that ``invalidate`` bumps; a load that
+    started before the bump is discarded when it finishes, so a refresh
+    racing a write can never store pre-write data as fresh.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_stale: float = 86400.0,
+        *,
+        maxsize: int = 256,
+        context_factory: Optional[Any] = None,
+    ):
+        self.ttl = max(0.0, float(ttl))
+        self.max_stale = max(self.ttl, float(max_stale))
+        self.maxsize = max(1, int(maxsize))
+        self._context_factory = context_factory
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._refreshing: set = set()
+        self._retry_after: dict[Hashable, float] = {}
+        # invalidate() with no predicate bumps the epoch; with one, the
+        # matching keys' generations.
+        self._epoch = 0
+        self._generations: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_failures = 0
+
+    def get(self, key: Hashable, loader, *, ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value for ``key``, calling ``loader()`` on a cold
+        miss. ``loader`` signals failure by raising; a cold miss re-raises.
+        """
+        lifetime = self.ttl if ttl is None else max(0.0, float(ttl))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                loaded_at, value = entry
+                age = now - loaded_at
+                if age < lifetime:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if age < self.max_stale:
+                    self.stale_hits += 1
+                    start_refresh = (
+                        key not in self._refreshing and self._retry_after.get(key, 0.0) <= now
+                    )
+                    if start_refresh:
+                        self._refreshing.add(key)
+                else:
+                    entry = None
+            if entry is None:
+                self.misses += 1
+            token = self._token(key)
+        if entry is not None:
+            if start_refresh:
+                threading.Thread(
+                    target=self._refresh, args=(key, loader, token), name="rdab-swr-refresh", daemon=True
+                ).start()
+            return value
+        value = loader()
+        self._store(key, value, token)
+        return value
+
+    def _token(self, key: Hashable) -> tuple[int, int]:
+        # Caller holds the lock. setdefault makes in-flight cold loads
+        # visible to invalidate(predicate).
+        return (self._epoch, self._generations.setdefault(key, 0))
+
+    def _store(self, key: Hashable, value: Any, token: tuple[int, int]) -> bool:
+        """Store ``value`` unless ``key`` was invalidated after its load began."""
+        with self._lock:
+            if token != (self._epoch, self._generations.get(key, 0)):
+                return False
+            self._retry_after.pop(key, None)
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                if evicted not in self._refreshing:
+                    self._generations.pop(evicted, None)
+            return True
+
+    def _refresh(self, key: Hashable, loader, token: tuple[int, int]) -> None:
+        try:
+            context = self._context_factory() if self._context_factory else None
+            if context is not None:
+                with context:
+                    value = loader()
+            else:
+                value = loader()
+            if not self._store(key, value, token):
+                print(f"⚠️ Discarded background refresh for {key!r}: invalidated while loading")
+        except Exception as exc:
+            with self._lock:
+                self.refresh_failures += 1
+                # Back off so an outage costs one reload attempt per TTL, not per request.
+                self._retry_after[key] = time.monotonic() + max(1.0, self.ttl)
+            print(f"⚠️ Background refresh for {key!r} failed, serving stale data:", exc)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, predicate=None) -> None:
+        """
+        Drop entries so the next read reloads. With ``predicate`` only keys
+        for which it returns True are dropped.
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                self._retry_after.clear()
+                self._generations.clear()
+                self._epoch += 1
+                return
+            for key in [k for k in {*self._entries, *self._generations} if predicate(k)]:
+                self._entries.pop(key, None)
+                self._retry_after.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "ttl_seconds": self.ttl,
+                "max_stale_seconds": self.max_stale,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refresh_failures": self.refresh_failures,
+                "refreshing": len(self._refreshing),
+            }
+
+
+class MtimeMemo:
+    """
+    Value derived from a file, rebuilt only when its mtime or size changes.
+    A missing file is a valid state (``build`` decides what that means).
+    """
+
+    def __init__(self, path: Path, build: Callable[[], object]):
+        self.path = Path(path)
+        self._build = build
+        self._lock = threading.Lock()
+        self._key: Optional[tuple] = None
+        self._value: object = None
+        self._built = False
+
+    def _stat_key(self) -> Optional[tuple]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self):
+        key = self._stat_key()
+        with self._lock:
+            if not self._built or key != self._key:
+                self._value = self._build()
+                self._key = key
+                self._built = True
+            return self._value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._built = False
@@ -0,0 +1,153 @@
+"""
+Shared, periodically refreshed snapshot of the Supabase `events` table.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_event_name(value: str | None) -> str:
+    """Casefold and collapse whitespace so name lookups ignore formatting noise."""
+    return _WHITESPACE_RE.sub(" ", (value or "").strip()).casefold()
+
+
+def normalize_event_id(value) -> str:
+    return str(value or "").strip().lower()
+
+
+class EventCatalog:
+    """
+    Holds every event row in memory with two lookups:
+      - by normalized event_id (cover photos for passport stamps)
+      - by normalized name (exact, then substring for legacy ledger titles)
+
+    The snapshot is reloaded through ``loader`` once it is older than
+    ``ttl`` seconds; if a reload fails (``loader`` returns None or raises)
+    the previous snapshot keeps serving and no reload is attempted for
+    ``retry_seconds``, so an outage costs one attempt per window instead of
+    one per caller. With ``background=True`` a stale snapshot is returned
+    immediately while a daemon thread reloads it, so only the very first
+    load blocks.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Optional[list[dict]]],
+        ttl: float = 300.0,
+        *,
+        background: bool = False,
+        retry_seconds: float = 30.0,
+    ):
+        self._loader = loader
+        self.ttl = max(0.0, float(ttl))
+        self.background = background
+        self.retry_seconds = max(1.0, float(retry_seconds))
+        self._rows: list[dict] = []
+        self._by_id: dict[str, dict] = {}
+        self._by_name: dict[str, dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._expired = False
+        self._retry_after = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and not self._expired
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() < self._retry_after
+
+    def refresh(self, force: bool = False) -> None:
+        if not force and (self._is_fresh() or self._backing_off()):
+            return
+        if self.background and not force and self._loaded_at is not None:
+            if not self._refresh_lock.locked():
+                threading.Thread(target=self._reload, name="rdab-event-catalog", daemon=True).start()
+            return
+        self._reload(force)
+
+    def _reload(self, force: bool = False) -> None:
+        # Only one thread reloads; the rest keep reading the current snapshot
+        # (or, before the first load, wait for it).
+        if not self._refresh_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if not force and (self._is_fresh() or self._backing_off()):
+                return
+            try:
+                rows = self._loader()
+            except Exception as exc:
+                print("⚠️ Event catalog reload failed:", exc)
+                rows = None
+            if rows is None:
+                with self._lock:
+                    self._retry_after = time.monotonic() + self.retry_seconds
+                return
+            by_id: dict[str, dict] = {}
+            by_name: dict[str, dict] = {}
+            # Newest events win name collisions, matching how trainers refer to them.
+            for row in sorted(rows, key=lambda r: str(r.get("start_time") or ""), reverse=True):
+                event_key = normalize_event_id(row.get("event_id"))
+                if event_key:
+                    by_id.setdefault(event_key, row)
+                name_key = normalize_event_name(row.get("name"))
+                if name_key:
+                    by_name.setdefault(name_key, row)
+            with self._lock:
+                self._rows = list(rows)
+                self._by_id = by_id
+                self._by_name = by_name
+                self._loaded_at = time.monotonic()
+                self._expired = False
+                self._retry_after = 0.0
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self) -> None:
+        """Reload on the next read; the current snapshot serves until that succeeds."""
+        with self._lock:
+            self._expired = True
+            self._retry_after = 0.0
+
+    def rows(self) -> list[dict]:
+        self.refresh()
+        with self._lock:
+            return list(self._rows)
+
+    def get(self, event_id) -> Optional[dict]:
+        self.refresh()
+        with self._lock:
+            return self._by_id.get(normalize_event_id(event_id))
+
+    def cover_for_id(self, event_id) -> str:
+        row = self.get(event_id)
+        return (row or {}).get("cover_photo_url") or ""
+
+    def find_by_name(self, name: str | None) -> Optional[dict]:
+        """Exact (case-insensitive) name match, then the newest event containing it."""
+        needle = normalize_event_name(name)
+        if not needle:
+            return None
+        self.refresh()
+        with self._lock:
+            exact = self._by_name.get(needle)
+            if exact:
+                return exact
+            for key, row in self._by_name.items():
+                if needle in key:
+                    return row
+        return None
+
+    def cover_for_name(self, name: str | None) -> str:
+        row = self.find_by_name(name)
+        return (row or {}).get("cover_photo_url") or ""
@@ -0,0 +1,296 @@
+"""
+Shared outbound HTTP transport: pooled keep-alive connections, per-call-site
+timeouts, bounded jittered retries and per-site call statistics.
+
+`HttpTransport` wraps a `requests.Session` for ad-hoc calls (REST fallbacks,
+Apps Script hooks); `HttpTransport.httpx_client()` builds the pooled client
+handed to supabase-py so PostgREST/RPC traffic shares the same policy.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx  # type: ignore
+except ImportError:  # pragma: no cover - supabase-py pulls httpx in
+    httpx = None
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """Timeout and retry budget for one call site."""
+
+    connect_timeout: float = 3.05
+    read_timeout: float = 10.0
+    retries: int = 2
+    retry_non_idempotent: bool = False
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+
+@dataclass(frozen=True)
+class CallRecord:
+    """One attempt, as handed to observers registered with `add_observer`."""
+
+    site: str
+    method: str
+    url: str
+    ms: float
+    status: Optional[int] = None
+    error: Optional[str] = None
+    request_headers: Mapping[str, str] = field(default_factory=dict)
+    response_headers: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class SiteStats:
+    calls: int = 0
+    retries: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_status: Optional[int] = None
+    last_error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+        }
+
+
+def request_not_sent(exc: BaseException) -> bool:
+    """
+    True for errors raised before the request reached the server (no
+    connection, or no pooled connection freed up), so a non-idempotent call
+    is known not to have run. Read timeouts and dropped responses are False.
+    """
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if httpx is not None and isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    return False
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class HttpTransport:
+    """
+    One process-wide pool for outbound HTTP.
+
+    Call sites pass a ``site`` name; its `CallPolicy` decides timeouts and
+    how many times connection errors and 429/502/503/504 responses are
+    retried. Non-idempotent requests (POST/PATCH) are only retried when
+    the policy opts in, e.g. inserts guarded by a unique key.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 20,
+        keepalive_seconds: float = 60.0,
+        backoff_base: float = 0.25,
+        backoff_cap: float = 4.0,
+        default_policy: Optional[CallPolicy] = None,
+        policies: Optional[dict[str, CallPolicy]] = None,
+    ):
+        self.pool_connections = max(1, int(pool_connections))
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self.keepalive_seconds = max(1.0, float(keepalive_seconds))
+        self.backoff_base = max(0.0, float(backoff_base))
+        self.backoff_cap = max(self.backoff_base, float(backoff_cap))
+        self.default_policy = default_policy or CallPolicy()
+        self.policies: dict[str, CallPolicy] = dict(policies or {})
+        self._stats: dict[str, SiteStats] = {}
+        self._observers: list[Callable[[CallRecord], None]] = []
+        self._guards: list[Callable[[str, str, str], None]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ---- configuration -------------------------------------------------
+    def policy(self, site: str) -> CallPolicy:
+        return self.policies.get(site, self.default_policy)
+
+    def set_policy(self, site: str, policy: CallPolicy) -> None:
+        self.policies[site] = policy
+
+    def add_observer(self, observer: Callable[[CallRecord], None]) -> None:
+        """Call ``observer`` after every attempt (e.g. per-request query logs)."""
+        self._observers.append(observer)
+
+    def add_guard(self, guard: Callable[[str, str, str], None]) -> None:
+        """
+        Call ``guard(site, method, url)`` before every attempt; it may raise
+        (e.g. an open circuit breaker) to refuse the call without sending it.
+        """
+        self._guards.append(guard)
+
+    def _check_guards(self, site: str, method: str, url: str) -> None:
+        for guard in self._guards:
+            guard(site, method, url)
+
+    # ---- requests session ----------------------------------------------
+    @property
+    def session(self) -> requests.Session:
+        """Per-thread session (requests.Session is not guaranteed thread-safe)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._local.session = session
+        return session
+
+    def request(self, method: str, url: str, *, site: str, **kwargs: Any) -> requests.Response:
+        """
+        Send one request under ``site``'s policy. Returns the final response
+        (which may still be an error status) or raises the last exception.
+        """
+        policy = self.policy(site)
+        method = method.upper()
+        kwargs.setdefault("timeout", policy.timeout)
+        retryable = method in IDEMPOTENT_METHODS or policy.retry_non_idempotent
+        attempts = 1 + (policy.retries if retryable else 0)
+        for attempt in range(1, attempts + 1):
+            self._check_guards(site, method, url)
+            started = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                self._record(site, started, method, url, error=str(exc), retry=attempt < attempts)
+                if attempt >= attempts:
+                    raise
+            except BaseException as exc:
+                # Every attempt reports an outcome, or a half-open breaker
+                # would wait on its probe forever.
+                self._record(site, started, method, url, error=str(exc) or type(exc).__name__)
+                raise
+            else:
+                retry = resp.status_code in RETRY_STATUSES and attempt < attempts
+                self._record(site, started, method, resp.url, status=resp.status_code, retry=retry,
+                             request_headers=resp.request.headers, response_headers=resp.headers)
+                if not retry:
+                    return resp
+                resp.close()
+            time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap))
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    def get(self, url: str, *, site: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, site=site, **kwargs)
+
+    def post(self, url: str, *, site: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, site=site, **kwargs)
+
+    # ---- httpx client for supabase-py ----------------------------------
+    def httpx_client(self, *, site: str = "supabase"):
+        """Pooled httpx client using ``site``'s timeouts and retry budget."""
+        if httpx is None:
+            return None
+        policy = self.policy(site)
+        transport = _RetryingHttpxTransport(
+            self,
+            site,
+            limits=httpx.Limits(
+                max_connections=self.pool_maxsize,
+                max_keepalive_connections=self.pool_connections,
+                keepalive_expiry=self.keepalive_seconds,
+            ),
+        )
+        return httpx.Client(
+            transport=transport,
+            timeout=httpx.Timeout(policy.read_timeout, connect=policy.connect_timeout),
+        )
+
+    # ---- stats -----------------------------------------------------------
+    def _record(self, site: str, started: float, method: str, url: str, *, status: Optional[int] = None,
+                error: Optional[str] = None, retry: bool = False,
+                request_headers: Optional[Mapping[str, str]] = None,
+                response_headers: Optional[Mapping[str, str]] = None) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._stats.setdefault(site, SiteStats())
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            if retry:
+                stats.retries += 1
+            if error is not None or (status is not None and status >= 400):
+                stats.errors += 1
+                stats.last_error = error or f"HTTP {status}"
+            if status is not None:
+                stats.last_status = status
+        if self._observers:
+            record = CallRecord(site, method, url, elapsed_ms, status, error,
+                                request_headers or {}, response_headers or {})
+            for observer in self._observers:
+                try:
+                    observer(record)
+                except Exception as exc:
+                    print("⚠️ HTTP observer failed:", exc)
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {site: stats.as_dict() for site, stats in sorted(self._stats.items())}
+
+
+if httpx is not None:
+
+    class _RetryingHttpxTransport(httpx.HTTPTransport):
+        """httpx transport that applies the owning HttpTransport's retry policy."""
+
+        def __init__(self, owner: HttpTransport, site: str, **kwargs: Any):
+            super().__init__(**kwargs)
+            self._owner = owner
+            self._site = site
+
+        def handle_request(self, request):
+            policy = self._owner.policy(self._site)
+            retryable = request.method in IDEMPOTENT_METHODS or policy.retry_non_idempotent
+            attempts = 1 + (policy.retries if retryable else 0)
+            for attempt in range(1, attempts + 1):
+                self._owner._check_guards(self._site, request.method, str(request.url))
+                started = time.perf_counter()
+                try:
+                    response = super().handle_request(request)
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError) as exc:
+                    self._owner._record(self._site, started, request.method, str(request.url),
+                                        error=str(exc), retry=attempt < attempts)
+                    if attempt >= attempts:
+                        raise
+                except BaseException as exc:
+                    self._owner._record(self._site, started, request.method, str(request.url),
+                                        error=str(exc) or type(exc).__name__)
+                    raise
+                else:
+                    retry = response.status_code in RETRY_STATUSES and attempt < attempts
+                    self._owner._record(self._site, started, request.method, str(request.url),
+                                        status=response.status_code, retry=retry,
+                                        request_headers=request.headers, response_headers=response.headers)
+                    if not retry:
+                        return response
+                    response.close()
+                time.sleep(backoff_delay(attempt, self._owner.backoff_base, self._owner.backoff_cap))
+            raise RuntimeError("unreachable")  # pragma: no cover
@@ -0,0 +1,80 @@
+"""
+Keyset pagination helpers for the unified inbox feed (notifications + receipts).
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from functools import cmp_to_key
+from typing import Any, Callable, Optional, Sequence
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None) -> Optional[list]:
+    """Return the cursor values, or None for a missing/garbled token."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def pg_quote(value: Any) -> str:
+    """Double-quote a value for a PostgREST logic tree (or=/and=)."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_condition(keys: Sequence[tuple[str, Any, bool]], *, inclusive: bool = False) -> str:
+    """
+    PostgREST logic fragment matching rows strictly after ``keys`` in
+    ``ORDER BY col1 [DESC], col2 [DESC], ...`` order. With ``inclusive=True``
+    rows equal on every key also match. Nullable columns must be ordered
+    NULLS FIRST ascending / NULLS LAST descending (e.g. notification type);
+    only the leading keys may be None.
+    """
+    column, value, desc = keys[0]
+    rest = keyset_condition(keys[1:], inclusive=inclusive) if len(keys) > 1 else None
+    if value is None:
+        after = None if desc else f"{column}.not.is.null"
+        same = f"{column}.is.null"
+    else:
+        after = f"{column}.{'lt' if desc else 'gt'}.{pg_quote(value)}"
+        if desc:
+            after = f"or({after},{column}.is.null)"
+        same = f"{column}.eq.{pg_quote(value)}"
+    if rest is None:
+        return f"or({after},{same})" if inclusive else after
+    tail = f"and({same},{rest})"
+    return f"or({after},{tail})" if after else tail
+
+
+def compare_keys(a: Sequence[Any], b: Sequence[Any], descending: Sequence[bool]) -> int:
+    for left, right, desc in zip(a, b, descending):
+        if left == right:
+            continue
+        if left is None or right is None:
+            result = -1 if left is None else 1
+        else:
+            result = -1 if left < right else 1
+        return -result if desc else result
+    return 0
+
+
+def merge_sorted(
+    rows: Sequence[dict],
+    key: Callable[[dict], Sequence[Any]],
+    descending: Sequence[bool],
+    limit: int,
+) -> list[dict]:
+    """Order rows drawn from several sources by a shared key and keep ``limit``."""
+    ordered = sorted(rows, key=cmp_to_key(lambda a, b: compare_keys(key(a), key(b), descending)))
+    return ordered[:limit]
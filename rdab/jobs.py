@@ -0,0 +1,356 @@
+"""
+Persistent background job queue for slow admin operations.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Optional
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 1,
+    created_by TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    run_after REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready_idx ON jobs(status, run_after);
+CREATE INDEX IF NOT EXISTS jobs_created_idx ON jobs(created_at);
+"""
+
+
+class RetryJob(Exception):
+    """Raise from a handler to retry later, optionally with a narrowed payload."""
+
+    def __init__(self, message: str, payload: Optional[dict] = None):
+        super().__init__(message)
+        self.payload = payload
+
+
+class JobFailed(Exception):
+    """Raise from a handler to fail the job immediately without retrying."""
+
+    def __init__(self, message: str, result: Any = None):
+        super().__init__(message)
+        self.result = result
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue drained by a small pool of daemon threads.
+
+    Every gunicorn worker runs its own pool against the same database file;
+    ``BEGIN IMMEDIATE`` makes claiming a job atomic across processes. A
+    running job holds a lease that a heartbeat thread renews while the
+    handler runs; if its process dies the renewals stop, the lease expires
+    and another worker picks it up (counting as an attempt). Updates are
+    fenced on the attempt number, so a worker that lost its lease cannot
+    overwrite the outcome of the run that replaced it.
+
+    Handlers take the job payload and return a JSON-serialisable result.
+    Any other exception is retried with exponential backoff until
+    ``max_attempts`` is reached, so only register idempotent handlers with
+    more than one attempt.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        workers: int = 2,
+        poll_seconds: float = 2.0,
+        lease_seconds: float = 600.0,
+        backoff_seconds: float = 5.0,
+        retention_days: int = 7,
+        context_factory: Optional[Callable[[], ContextManager]] = None,
+    ):
+        self.path = Path(path)
+        self.workers = max(0, int(workers))
+        self.poll_seconds = max(0.1, float(poll_seconds))
+        self.lease_seconds = max(1.0, float(lease_seconds))
+        self.backoff_seconds = max(0.0, float(backoff_seconds))
+        self.retention_seconds = max(0, int(retention_days)) * 86400
+        self._context_factory = context_factory or nullcontext
+        self._handlers: dict[str, tuple[Callable[[dict], Any], int]] = {}
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._started_pid: Optional[int] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---- registration & enqueue ----------------------------------------
+    def register(self, kind: str, handler: Callable[[dict], Any], *, max_attempts: int = 1) -> None:
+        self._handlers[kind] = (handler, max(1, int(max_attempts)))
+
+    def enqueue(self, kind: str, payload: dict, *, created_by: Optional[str] = None, unique: bool = False) -> str:
+        """
+        Queue a job and return its id. With ``unique=True`` an already queued
+        job of the same kind is reused instead of adding a duplicate.
+        """
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind {kind!r}")
+        _, max_attempts = self._handlers[kind]
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if unique:
+                    row = conn.execute(
+                        "SELECT id FROM jobs WHERE kind = ? AND status = 'queued' LIMIT 1", (kind,)
+                    ).fetchone()
+                    if row:
+                        conn.execute("COMMIT")
+                        return row["id"]
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, status, payload, max_attempts, created_by,"
+                    " created_at, updated_at, run_after) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(payload, default=str), max_attempts, created_by, now, now, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self.ensure_started()
+        self._wake.set()
+        return job_id
+
+    # ---- status ----------------------------------------------------------
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "payload": json.loads(row["payload"] or "null"),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "max_attempts": row["max_attempts"],
+            "created_by": row["created_by"],
+            "created_at": _iso(row["created_at"]),
+            "updated_at": _iso(row["updated_at"]),
+            "started_at": _iso(row["started_at"]),
+            "finished_at": _iso(row["finished_at"]),
+            "finished": row["status"] in {"done", "failed"},
+        }
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def recent(self, limit: int = 25, kind: Optional[str] = None) -> list[dict]:
+        query = "SELECT * FROM jobs"
+        params: list[Any] = []
+        if kind:
+            query += " WHERE kind = ?"
+            params.append(kind)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(max(1, int(limit)))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def counts(self) -> dict:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        totals = {status: 0 for status in JOB_STATUSES}
+        totals.update({row["status"]: row["n"] for row in rows})
+        return totals
+
+    # ---- workers ---------------------------------------------------------
+    def ensure_started(self) -> None:
+        """Start the pool in this process (threads do not survive a gunicorn fork)."""
+        pid = os.getpid()
+        if self._started_pid == pid or not self.workers:
+            return
+        with self._start_lock:
+            if self._started_pid == pid:
+                return
+            self._prune()
+            self._threads = []
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"rdab-jobs-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            self._started_pid = pid
+
+    def _prune(self) -> None:
+        if not self.retention_seconds:
+            return
+        cutoff = time.time() - self.retention_seconds
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,)
+                )
+        except sqlite3.Error as exc:
+            print("⚠️ Job queue prune failed:", exc)
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = conn.execute(
+                        "SELECT * FROM jobs WHERE (status = 'queued' AND run_after <= ?)"
+                        " OR (status = 'running' AND lease_until < ?)"
+                        " ORDER BY run_after LIMIT 1",
+                        (now, now),
+                    ).fetchone()
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+                    if row["status"] == "running" and row["attempts"] >= row["max_attempts"]:
+                        conn.execute(
+                            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, updated_at = ?"
+                            " WHERE id = ?",
+                            ("Worker stopped before the job finished.", now, now, row["id"]),
+                        )
+                        continue
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?,"
+                        " updated_at = ?, lease_until = ? WHERE id = ?",
+                        (now, now, now + self.lease_seconds, row["id"]),
+                    )
+                    conn.execute("COMMIT")
+                    return conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _finish(self, job_id: str, attempt: Optional[int] = None, **fields) -> bool:
+        """Update a job; with ``attempt`` only while that run still owns it."""
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        query = f"UPDATE jobs SET {columns} WHERE id = ?"
+        params: list[Any] = [*fields.values(), job_id]
+        if attempt is not None:
+            query += " AND status = 'running' AND attempts = ?"
+            params.append(attempt)
+        with closing(self._connect()) as conn:
+            return conn.execute(query, params).rowcount > 0
+
+    def _renew(self, row: sqlite3.Row) -> bool:
+        return self._finish(row["id"], row["attempts"], lease_until=time.time() + self.lease_seconds)
+
+    def _keep_leased(self, row: sqlite3.Row, stop: threading.Event) -> None:
+        """Heartbeat: renew the lease every third of its length until ``stop``."""
+        while not stop.wait(self.lease_seconds / 3):
+            try:
+                if not self._renew(row):
+                    print(f"⚠️ Job {row['kind']} {row['id']} lost its lease to another worker")
+                    return
+            except sqlite3.Error as exc:
+                print("⚠️ Job lease renewal failed:", exc)
+
+    def _worker_loop(self) -> None:
+        while True:
+            try:
+                row = self._claim()
+            except sqlite3.Error as exc:
+                print("⚠️ Job queue claim failed:", exc)
+                row = None
+            if row is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            self._run(row)
+
+    def _call(self, row: sqlite3.Row, handler: Callable[[dict], Any], payload: dict) -> Any:
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._keep_leased, args=(row, stop), name=f"rdab-jobs-lease-{row['id'][:8]}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            with self._context_factory():
+                return handler(payload)
+        finally:
+            stop.set()
+
+    def _run(self, row: sqlite3.Row) -> None:
+        job_id = row["id"]
+        handler_entry = self._handlers.get(row["kind"])
+        if handler_entry is None:
+            self._finish(job_id, row["attempts"], status="failed", error=f"Unknown job kind {row['kind']!r}",
+                         finished_at=time.time())
+            return
+        handler, _ = handler_entry
+        payload = json.loads(row["payload"] or "{}")
+        attempt = row["attempts"]
+        try:
+            result = self._call(row, handler, payload)
+        except JobFailed as exc:
+            self._finish(
+                job_id,
+                attempt,
+                status="failed",
+                error=str(exc),
+                result=json.dumps(exc.result, default=str) if exc.result is not None else None,
+                finished_at=time.time(),
+            )
+        except Exception as exc:
+            next_payload = exc.payload if isinstance(exc, RetryJob) and exc.payload is not None else payload
+            if row["attempts"] < row["max_attempts"]:
+                delay = self.backoff_seconds * (2 ** (row["attempts"] - 1))
+                self._finish(
+                    job_id,
+                    attempt,
+                    status="queued",
+                    error=str(exc),
+                    payload=json.dumps(next_payload, default=str),
+                    run_after=time.time() + delay,
+                    lease_until=None,
+                )
+                print(f"⚠️ Job {row['kind']} {job_id} failed (attempt {row['attempts']}), retrying:", exc)
+            else:
+                self._finish(job_id, attempt, status="failed", error=str(exc), finished_at=time.time())
+                print(f"⚠️ Job {row['kind']} {job_id} failed permanently:", exc)
+        else:
+            self._finish(
+                job_id,
+                attempt,
+                status="done",
+                error=None,
+                result=json.dumps(result, default=str),
+                finished_at=time.time(),
+                lease_until=None,
+            )
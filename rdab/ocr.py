@@ -0,0 +1,219 @@
+"""
+Trainer-name OCR for signup screenshots.
+
+The screenshot never touches disk: it is decoded from the upload stream,
+cropped to the name band, downscaled, converted to grayscale and thresholded,
+then piped as PNG to ``tesseract stdin stdout`` with a single-line page
+segmentation mode. At most ``max_concurrency`` tesseract processes run at
+once per worker; callers wait up to ``queue_timeout`` for a slot and each
+run is killed after ``timeout`` seconds.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Union
+
+from PIL import Image, ImageOps
+
+# (left, top, right, bottom) as fractions of the screenshot: the block under
+# the ME/FRIENDS tabs holding the trainer name and buddy line.
+TRAINER_NAME_REGION = (0.05, 0.15, 0.90, 0.25)
+# Tesseract is most accurate with text ~30-40px tall; the name band of a
+# phone screenshot is well above that, so scale it down to save time.
+MAX_LINE_HEIGHT = 64
+MAX_REGION_WIDTH = 1000
+
+ImageSource = Union[bytes, BinaryIO, Image.Image, str, os.PathLike]
+
+
+class OcrError(RuntimeError):
+    """Tesseract failed, timed out, or no slot freed up in time."""
+
+
+@dataclass(frozen=True)
+class OcrResult:
+    text: Optional[str]
+    ms: float
+    region: Image.Image
+
+
+def _open(source: ImageSource) -> Image.Image:
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    img = Image.open(source)
+    img.load()
+    return img
+
+
+def _otsu_threshold(gray: Image.Image) -> int:
+    histogram = gray.histogram()
+    total = sum(histogram)
+    weighted_total = sum(i * count for i, count in enumerate(histogram))
+    best, best_variance = 127, -1.0
+    background = weighted_background = 0
+    for level, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted_background += level * count
+        mean_b = weighted_background / background
+        mean_f = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_b - mean_f) ** 2
+        if variance > best_variance:
+            best, best_variance = level, variance
+    return best
+
+
+def _first_text_band(binary: Image.Image, min_height: int = 6) -> Optional[tuple[int, int]]:
+    """Rows (top, bottom) of the first run of rows containing dark pixels."""
+    width, height = binary.size
+    data = binary.tobytes()
+    min_ink = max(2, width // 200)
+    top = None
+    for y in range(height):
+        ink = data[y * width:(y + 1) * width].count(0)
+        if ink >= min_ink:
+            if top is None:
+                top = y
+        elif top is not None:
+            if y - top >= min_height:
+                return top, y
+            top = None
+    if top is not None and height - top >= min_height:
+        return top, height
+    return None
+
+
+def preprocess_trainer_name(source: ImageSource, region: tuple[float, float, float, float] = TRAINER_NAME_REGION) -> Image.Image:
+    """
+    Crop, grayscale and binarize the name block, then keep only its first
+    text line (the name; the buddy line sits below it) so a single-line
+    segmentation mode applies.
+    """
+    img = ImageOps.exif_transpose(_open(source))
+    w, h = img.size
+    left, top, right, bottom = region
+    cropped = img.crop((int(w * left), int(h * top), int(w * right), int(h * bottom)))
+    if cropped.width > MAX_REGION_WIDTH:
+        cropped = cropped.resize((MAX_REGION_WIDTH, max(1, round(cropped.height * MAX_REGION_WIDTH / cropped.width))),
+                                 Image.LANCZOS)
+
+    gray = ImageOps.autocontrast(ImageOps.grayscale(cropped))
+    threshold = _otsu_threshold(gray)
+    binary = gray.point(lambda value: 255 if value > threshold else 0, mode="L")
+    # Text should be dark on light; flip when most of the block is dark.
+    if binary.histogram()[0] > (binary.width * binary.height) // 2:
+        binary = ImageOps.invert(binary)
+
+    band = _first_text_band(binary)
+    if band is not None:
+        pad = max(4, (band[1] - band[0]) // 4)
+        binary = binary.crop((0, max(0, band[0] - pad), binary.width, min(binary.height, band[1] + pad)))
+        if binary.height > MAX_LINE_HEIGHT * 1.5:
+            scale = MAX_LINE_HEIGHT * 1.5 / binary.height
+            binary = binary.resize((max(1, round(binary.width * scale)), max(1, round(binary.height * scale))),
+                                   Image.LANCZOS).point(lambda value: 255 if value > 127 else 0)
+    return binary
+
+
+class OcrEngine:
+    """Bounded tesseract runner; one instance per process."""
+
+    def __init__(
+        self,
+        *,
+        cmd: str = "tesseract",
+        lang: str = "eng",
+        psm: int = 7,
+        max_concurrency: int = 2,
+        timeout: float = 8.0,
+        queue_timeout: float = 10.0,
+    ):
+        self.cmd = cmd
+        self.lang = lang
+        self.psm = psm
+        self.timeout = max(0.5, float(timeout))
+        self.queue_timeout = max(0.0, float(queue_timeout))
+        self._slots = threading.BoundedSemaphore(max(1, int(max_concurrency)))
+        self._lock = threading.Lock()
+        self._calls = self._failures = 0
+        self._total_ms = 0.0
+
+    def image_to_text(self, image: Image.Image) -> str:
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise OcrError("OCR is busy, try again shortly")
+        try:
+            proc = subprocess.run(
+                [self.cmd, "stdin", "stdout", "-l", self.lang, "--psm", str(self.psm)],
+                input=buf.getvalue(),
+                capture_output=True,
+                timeout=self.timeout,
+                check=False,
+            )
+        except subprocess.TimeoutExpired as exc:
+            raise OcrError(f"tesseract timed out after {self.timeout:.0f}s") from exc
+        except OSError as exc:
+            raise OcrError(f"tesseract could not start: {exc}") from exc
+        finally:
+            self._slots.release()
+        if proc.returncode != 0:
+            raise OcrError(proc.stderr.decode("utf-8", "replace").strip() or f"tesseract exited {proc.returncode}")
+        return proc.stdout.decode("utf-8", "replace")
+
+    def read_trainer_name(self, source: ImageSource) -> OcrResult:
+        started = time.perf_counter()
+        region = preprocess_trainer_name(source)
+        text = None
+        try:
+            lines = [ln.strip() for ln in self.image_to_text(region).splitlines() if ln.strip()]
+            text = lines[0] if lines else None
+        except OcrError:
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._calls += 1
+                self._total_ms += elapsed
+        return OcrResult(text, elapsed, region)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "failures": self._failures,
+                "avg_ms": round(self._total_ms / self._calls, 1) if self._calls else 0.0,
+            }
+
+
+def extract_trainer_name(source: ImageSource, engine: Optional[OcrEngine] = None) -> Optional[str]:
+    """First text line of the name block, or None when nothing could be read."""
+    try:
+        return (engine or _default_engine()).read_trainer_name(source).text
+    except Exception as exc:
+        print("❌ OCR failed:", exc)
+        return None
+
+
+_DEFAULT_ENGINE: Optional[OcrEngine] = None
+
+
+def _default_engine() -> OcrEngine:
+    global _DEFAULT_ENGINE
+    if _DEFAULT_ENGINE is None:
+        _DEFAULT_ENGINE = OcrEngine()
+    return _DEFAULT_ENGINE
@@ -0,0 +1,118 @@
+"""
+Per-request accounting of Supabase round trips (table, operation, rows, latency).
+
+Calls are observed at the HTTP transport, so everything that goes through
+supabase-py's `.execute()` (tables, RPCs, blueprints using the shared client)
+is counted without touching the call sites.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+_REST_PATH = re.compile(r"/rest/v1/(?:(rpc)/)?([^/?]+)")
+_CONTENT_RANGE = re.compile(r"(?:(\d+)-(\d+)|\*)/(\d+|\*)")
+_TOKEN_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    table: str
+    operation: str
+    rows: Optional[int]
+    ms: float
+    status: Optional[int]
+    signature: str
+
+
+def describe_postgrest_call(
+    method: str,
+    url: str,
+    request_headers: Mapping[str, str] | None = None,
+    response_headers: Mapping[str, str] | None = None,
+) -> Optional[tuple[str, str, Optional[int], str]]:
+    """
+    Map a PostgREST request to (table, operation, rows, signature); None for
+    non-REST traffic (auth, storage). ``signature`` is the table, operation and
+    filter columns without values, so repeats of the same query shape stand out.
+    """
+    parts = urlsplit(url)
+    match = _REST_PATH.search(parts.path)
+    if not match:
+        return None
+    is_rpc, name = match.group(1), match.group(2)
+    method = method.upper()
+    prefer = ((request_headers or {}).get("prefer") or (request_headers or {}).get("Prefer") or "").lower()
+    if is_rpc:
+        operation = "rpc"
+    elif method == "GET":
+        operation = "select"
+    elif method == "HEAD":
+        operation = "count"
+    elif method == "POST":
+        operation = "upsert" if "resolution=" in prefer else "insert"
+    elif method == "PATCH":
+        operation = "update"
+    elif method == "DELETE":
+        operation = "delete"
+    else:
+        operation = method.lower()
+
+    rows = None
+    content_range = (response_headers or {}).get("content-range") or ""
+    range_match = _CONTENT_RANGE.search(content_range)
+    if range_match:
+        start, end, _total = range_match.groups()
+        rows = int(end) - int(start) + 1 if start is not None else 0
+
+    filters = sorted({key for key, _ in parse_qsl(parts.query) if key not in {"select", "limit", "offset"}})
+    signature = f"{operation} {name}" + (f" [{','.join(filters)}]" if filters else "")
+    return name, operation, rows, signature
+
+
+@dataclass
+class QueryLog:
+    """Collected on `g` for one request; cheap enough to keep always on."""
+
+    records: list[QueryRecord] = field(default_factory=list)
+
+    def record(self, table: str, operation: str, rows: Optional[int], ms: float,
+               status: Optional[int], signature: str) -> None:
+        self.records.append(QueryRecord(table, operation, rows, ms, status, signature))
+
+    @property
+    def count(self) -> int:
+        return len(self.records)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(record.ms for record in self.records)
+
+    def by_table(self) -> list[tuple[str, int, float]]:
+        """(table, calls, ms) ordered by time spent."""
+        totals: dict[str, list] = {}
+        for record in self.records:
+            entry = totals.setdefault(record.table, [0, 0.0])
+            entry[0] += 1
+            entry[1] += record.ms
+        return sorted(((t, n, ms) for t, (n, ms) in totals.items()), key=lambda item: -item[2])
+
+    def repeated(self, threshold: int = 3) -> list[tuple[str, int]]:
+        """Query shapes issued at least ``threshold`` times: likely N+1 loops."""
+        counts = Counter(record.signature for record in self.records)
+        return [(sig, n) for sig, n in counts.most_common() if n >= threshold]
+
+    def server_timing(self, max_tables: int = 5) -> str:
+        entries = [f'db;dur={self.total_ms:.1f};desc="{self.count} queries"']
+        for table, calls, ms in self.by_table()[:max_tables]:
+            entries.append(f'db-{_TOKEN_UNSAFE.sub("_", table)};dur={ms:.1f};desc="{calls}x"')
+        return ", ".join(entries)
+
+    def summary_line(self) -> str:
+        tables = ", ".join(f"{table}×{calls}" for table, calls, _ in self.by_table())
+        line = f"supabase={self.count} {self.total_ms:.1f}ms"
+        return f"{line} ({tables})" if tables else line
@@ -0,0 +1,119 @@
+"""
+Declarative passport stamp icon rules (edit rdab/config/stamp_icons.json to add stamp types).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "config" / "stamp_icons.json"
+RULE_MATCH_TYPES = {"exact", "contains"}
+
+
+class StampIconResolver:
+    """
+    Compiles the ordered rule list into one exact-match dict plus a single
+    regex of lookahead alternatives. Alternatives keep rule order, so the
+    lowest group index seen anywhere in the reason is the rule an if/elif
+    chain of ``needle in reason`` checks would have picked.
+    """
+
+    def __init__(self, rules: list[dict], url_builder: Callable[[str], str]):
+        self._url_builder = url_builder
+        self._urls: dict[str, str] = {}
+        self._exact: dict[str, str] = {}
+        self._contains_icons: list[str] = []
+        needles: list[str] = []
+        for rule in rules:
+            match_type = (rule.get("match") or "contains").strip().lower()
+            value = (rule.get("value") or "").strip().lower()
+            icon = (rule.get("icon") or "").strip()
+            if match_type not in RULE_MATCH_TYPES or not value or not icon:
+                continue
+            if match_type == "exact":
+                self._exact.setdefault(value, icon)
+            else:
+                needles.append(value)
+                self._contains_icons.append(icon)
+        self._pattern = (
+            re.compile("(?=" + "|".join(f"({re.escape(needle)})" for needle in needles) + ")")
+            if needles
+            else None
+        )
+        self._match_reason = lru_cache(maxsize=2048)(self._match_reason_uncached)
+
+    def _match_reason_uncached(self, reason_lower: str) -> Optional[str]:
+        icon = self._exact.get(reason_lower)
+        if icon:
+            return icon
+        if not self._pattern:
+            return None
+        best: Optional[int] = None
+        for match in self._pattern.finditer(reason_lower):
+            index = match.lastindex
+            if index is not None and (best is None or index < best):
+                best = index
+                if best == 1:
+                    break
+        return self._contains_icons[best - 1] if best else None
+
+    def icon_url(self, icon: str) -> str:
+        """Resolve a static path once; absolute URLs pass through."""
+        if icon.startswith(("http://", "https://", "/")):
+            return icon
+        url = self._urls.get(icon)
+        if url is None:
+            url = self._url_builder(icon)
+            self._urls[icon] = url
+        return url
+
+    def resolve(self, reason: str | None) -> Optional[str]:
+        """Return the icon URL for a ledger reason, or None when no rule matches."""
+        icon = self._match_reason((reason or "").strip().lower())
+        return self.icon_url(icon) if icon else None
+
+
+class StampIconRegistry:
+    """Reloads the resolver when the rules file changes on disk."""
+
+    def __init__(self, url_builder: Callable[[str], str], path: Optional[Path] = None):
+        self._url_builder = url_builder
+        self._path = path
+        self._mtime: Optional[float] = None
+        self._resolver: Optional[StampIconResolver] = None
+        self._lock = threading.Lock()
+
+    def _rules_path(self) -> Path:
+        if self._path:
+            return self._path
+        env_override = os.environ.get("STAMP_ICON_RULES_PATH")
+        return Path(env_override).expanduser() if env_override else DEFAULT_RULES_PATH
+
+    def resolver(self) -> StampIconResolver:
+        path = self._rules_path()
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            mtime = None
+        with self._lock:
+            if self._resolver is not None and mtime == self._mtime:
+                return self._resolver
+            rules: list[dict] = []
+            if mtime is not None:
+                try:
+                    with path.open("r", encoding="utf-8") as handle:
+                        payload = json.load(handle)
+                    rules = [rule for rule in payload if isinstance(rule, dict)]
+                except (OSError, ValueError) as exc:
+                    print("⚠️ Could not load stamp icon rules:", exc)
+                    if self._resolver is not None:
+                        return self._resolver
+            self._resolver = StampIconResolver(rules, self._url_builder)
+            self._mtime = mtime
+            return self._resolver
@@ -0,0 +1,407 @@
+"""
+Pre-aggregated meetup statistics for the admin stats dashboard.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+
+from dateutil import parser
+
+STAMP_BINS = ("0–4", "5–9", "10–19", "20+")
+SAMPLE_ROWS = 3
+
+
+def parse_event_dt(value: str | None):
+    if not value:
+        return None
+    raw = value.replace("Z", "+00:00")
+    try:
+        dt = datetime.fromisoformat(raw)
+    except Exception:
+        try:
+            dt = parser.isoparse(value)
+        except Exception:
+            return None
+    if not dt.tzinfo:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def group_bucket(dt: datetime, group_key: str):
+    if not dt:
+        return ((0,), "Unknown")
+    group_key = group_key.lower()
+    if group_key == "year":
+        return ((dt.year,), str(dt.year))
+    if group_key == "quarter":
+        quarter = ((dt.month - 1) // 3) + 1
+        return ((dt.year, quarter), f"Q{quarter} {dt.year}")
+    # default: month
+    return ((dt.year, dt.month), dt.strftime("%b %Y"))
+
+
+def normalize_status(value: str | None) -> str:
+    return (value or "").upper().replace("-", "_").strip()
+
+
+def normalize_user(row: dict) -> str:
+    return (row.get("campfire_username") or row.get("display_name") or "").strip().lower()
+
+
+def display_name(row: dict) -> str:
+    return row.get("display_name") or row.get("campfire_username") or "Unknown Trainer"
+
+
+def stamp_bin(stamps) -> str:
+    try:
+        value = int(stamps or 0)
+    except Exception:
+        value = 0
+    if value <= 4:
+        return STAMP_BINS[0]
+    if value <= 9:
+        return STAMP_BINS[1]
+    if value <= 19:
+        return STAMP_BINS[2]
+    return STAMP_BINS[3]
+
+
+class StatsEngine:
+    """
+    Keeps per-event rosters, per-trainer check-in sets and per-period
+    rollups in memory so /admin/stats answers range and group selectors
+    without re-downloading the attendance table.
+
+    Attendance for events inside the ``hot_window_days`` window (recent and
+    upcoming meetups, where RSVPs and check-ins still change) is re-pulled
+    every ``delta_seconds``; everything else is rebuilt from scratch every
+    ``rebuild_seconds`` to pick up rare edits to old meetups.
+    """
+
+    GROUP_KEYS = ("month", "quarter", "year")
+
+    def __init__(
+        self,
+        load_events: Callable[[], Optional[list[dict]]],
+        load_attendance: Callable[[Optional[list[str]]], Optional[list[dict]]],
+        load_accounts: Callable[[], Optional[list[dict]]],
+        *,
+        hot_window_days: int = 14,
+        delta_seconds: float = 120.0,
+        rebuild_seconds: float = 6 * 3600.0,
+    ):
+        self._load_events = load_events
+        self._load_attendance = load_attendance
+        self._load_accounts = load_accounts
+        self.hot_window = timedelta(days=max(0, hot_window_days))
+        self.delta_seconds = max(0.0, float(delta_seconds))
+        self.rebuild_seconds = max(self.delta_seconds, float(rebuild_seconds))
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.events: dict[str, dict] = {}
+        self._event_order: list[tuple[datetime, str]] = []
+        self._rosters: dict[str, dict[str, dict]] = defaultdict(dict)
+        self._checkins: Counter = Counter()
+        self._trainer_events: dict[str, set[str]] = defaultdict(set)
+        self._trainer_names: dict[str, str] = {}
+        self._periods: dict[str, dict[tuple, dict]] = {key: {} for key in self.GROUP_KEYS}
+        self._accounts: dict[str, dict] = {}
+        self._event_rows = 0
+        self._attendance_rows = 0
+        self._samples: dict[str, list[dict]] = {"events": [], "attendance": []}
+        self._built_at: Optional[float] = None
+        self._delta_at: Optional[float] = None
+        self.generated_at: Optional[datetime] = None
+
+    # ---- refresh -------------------------------------------------------
+    def ensure_fresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if force or self._built_at is None or now - self._built_at >= self.rebuild_seconds:
+                self._rebuild()
+            elif self._delta_at is None or now - self._delta_at >= self.delta_seconds:
+                self._refresh_hot_events()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._built_at = None
+
+    def mark_stale(self) -> None:
+        """Pull hot-window attendance on the next read (e.g. after a Campfire sync)."""
+        with self._lock:
+            self._delta_at = None
+
+    def _rebuild(self) -> None:
+        events = self._load_events()
+        attendance = self._load_attendance(None)
+        accounts = self._load_accounts()
+        if events is None or attendance is None:
+            if self._built_at is None:
+                return
+            # Keep serving the previous rollups if Supabase is struggling.
+            self._built_at = self._delta_at = time.monotonic()
+            return
+        previous_accounts = self._accounts
+        self._reset()
+        self._index_events(events)
+        # Events without a parseable start_time stay out of every rollup but
+        # still count as rows, like the raw export.
+        self._event_rows = len(events)
+        self._attendance_rows = len(attendance)
+        self._samples = {
+            "events": [dict(row) for row in events[:SAMPLE_ROWS]],
+            "attendance": [dict(row) for row in attendance[:SAMPLE_ROWS]],
+        }
+        self._apply_attendance(attendance)
+        for group_key in self.GROUP_KEYS:
+            for eid in self.events:
+                self._bump_period(group_key, eid, events=1, attendance=self._checkins[eid])
+        if accounts is None:
+            self._accounts = previous_accounts
+        else:
+            self._index_accounts(accounts)
+        self._built_at = self._delta_at = time.monotonic()
+        self.generated_at = datetime.now(timezone.utc)
+
+    def _refresh_hot_events(self) -> None:
+        events = self._load_events()
+        if events is not None:
+            self._event_rows = len(events)
+            self._merge_events(events)
+        cutoff = datetime.now(timezone.utc) - self.hot_window
+        hot_ids = [eid for dt, eid in self._event_order if dt >= cutoff]
+        self._delta_at = time.monotonic()
+        if not hot_ids:
+            return
+        raw_ids = [self.events[eid]["raw_id"] for eid in hot_ids]
+        rows = self._load_attendance(raw_ids)
+        if rows is None:
+            return
+        grouped: dict[str, list[dict]] = defaultdict(list)
+        for row in rows:
+            eid = str(row.get("event_id") or "").strip().lower()
+            if eid:
+                grouped[eid].append(row)
+        for eid in hot_ids:
+            self.replace_event_attendance(eid, grouped.get(eid, []))
+        self.generated_at = datetime.now(timezone.utc)
+
+    # ---- incremental updates --------------------------------------------
+    def _index_events(self, events: Iterable[dict]) -> None:
+        for row in events:
+            self._add_event(row)
+        self._event_order = sorted((meta["dt"], eid) for eid, meta in self.events.items())
+
+    def _add_event(self, row: dict) -> Optional[str]:
+        eid = str(row.get("event_id") or "").strip().lower()
+        dt = parse_event_dt(row.get("start_time"))
+        if not eid or not dt:
+            return None
+        self.events[eid] = {
+            "id": eid,
+            "raw_id": row.get("event_id"),
+            "name": row.get("name") or "Unnamed meetup",
+            "dt": dt,
+            "date_iso": dt.isoformat(),
+            "date_display": dt.strftime("%d %b %Y • %H:%M") if dt else "",
+            "cover": row.get("cover_photo_url") or "",
+            "location": row.get("location") or "",
+        }
+        return eid
+
+    def _merge_events(self, events: Iterable[dict]) -> None:
+        added = False
+        for row in events:
+            eid = str(row.get("event_id") or "").strip().lower()
+            if not eid or eid in self.events:
+                continue
+            if self._add_event(row):
+                added = True
+                for group_key in self.GROUP_KEYS:
+                    self._bump_period(group_key, eid, events=1)
+        if added:
+            self._event_order = sorted((meta["dt"], eid) for eid, meta in self.events.items())
+
+    def _bump_period(self, group_key: str, eid: str, *, events: int = 0, attendance: int = 0) -> None:
+        meta = self.events.get(eid)
+        if not meta:
+            return
+        key, label = group_bucket(meta["dt"], group_key)
+        bucket = self._periods[group_key].setdefault(key, {"label": label, "events": 0, "attendance": 0})
+        bucket["events"] += events
+        bucket["attendance"] += attendance
+
+    def _apply_attendance(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            eid = str(row.get("event_id") or "").strip().lower()
+            if not eid or eid not in self.events:
+                continue
+            user_key = normalize_user(row)
+            if not user_key:
+                continue
+            status = normalize_status(row.get("rsvp_status"))
+            entry = self._rosters[eid].setdefault(user_key, {
+                "id": user_key,
+                "display_name": display_name(row),
+                "campfire": (row.get("campfire_username") or "").strip(),
+                "checked_in": False,
+                "checked_in_at": None,
+                "rsvp_status": None,
+            })
+            if status and status != "CHECKED_IN":
+                entry["rsvp_status"] = status
+            if status == "CHECKED_IN":
+                entry["checked_in_at"] = row.get("checked_in_at")
+                if not entry["checked_in"]:
+                    entry["checked_in"] = True
+                    self._checkins[eid] += 1
+                    self._trainer_events[user_key].add(eid)
+                    self._trainer_names.setdefault(user_key, entry["display_name"])
+
+    def replace_event_attendance(self, eid: str, rows: list[dict]) -> None:
+        """Swap one event's roster for freshly fetched rows, adjusting every rollup."""
+        with self._lock:
+            previous = self._checkins.get(eid, 0)
+            for user_key, entry in self._rosters.pop(eid, {}).items():
+                if entry["checked_in"]:
+                    events = self._trainer_events.get(user_key)
+                    if events:
+                        events.discard(eid)
+                        if not events:
+                            self._trainer_events.pop(user_key, None)
+                            self._trainer_names.pop(user_key, None)
+            self._checkins.pop(eid, None)
+            self._apply_attendance(rows)
+            delta = self._checkins.get(eid, 0) - previous
+            if delta:
+                for group_key in self.GROUP_KEYS:
+                    self._bump_period(group_key, eid, attendance=delta)
+
+    def _index_accounts(self, accounts: Iterable[dict]) -> None:
+        for acct in accounts:
+            key = (acct.get("trainer_username") or "").strip().lower()
+            if key:
+                self._accounts[key] = {"account_type": acct.get("account_type"), "stamps": acct.get("stamps")}
+
+    def record_account(self, trainer_username: str, **fields) -> None:
+        """Apply a trainer write (new stamp total, account type) to the histograms."""
+        key = (trainer_username or "").strip().lower()
+        if not key:
+            return
+        with self._lock:
+            if self._built_at is None:
+                return
+            entry = self._accounts.setdefault(key, {"account_type": None, "stamps": 0})
+            entry.update({name: value for name, value in fields.items() if name in {"account_type", "stamps"}})
+
+    # ---- queries ---------------------------------------------------------
+    def summarize(
+        self,
+        start_dt: Optional[datetime],
+        end_dt: datetime,
+        group_key: str,
+        normalize_account_type: Callable[[Optional[str]], str],
+    ) -> dict:
+        self.ensure_fresh()
+        with self._lock:
+            lo = 0 if start_dt is None else bisect.bisect_left(self._event_order, (start_dt, ""))
+            hi = bisect.bisect_right(self._event_order, (end_dt, "\uffff"))
+            in_range = [eid for _, eid in self._event_order[lo:hi]]
+            filtered_event_ids = list(reversed(in_range))
+            whole_history = lo == 0 and hi == len(self._event_order)
+
+            counts_by_event = Counter({eid: self._checkins[eid] for eid in filtered_event_ids if self._checkins[eid]})
+            if whole_history:
+                counts_by_trainer = Counter({user: len(eids) for user, eids in self._trainer_events.items()})
+            else:
+                counts_by_trainer = Counter()
+                for eid in filtered_event_ids:
+                    for user_key, entry in self._rosters.get(eid, {}).items():
+                        if entry["checked_in"]:
+                            counts_by_trainer[user_key] += 1
+            rsvp_totals = Counter({eid: len(self._rosters.get(eid, {})) for eid in filtered_event_ids})
+
+            if whole_history and group_key in self._periods:
+                grouped = self._periods[group_key]
+            else:
+                grouped = {}
+                for eid in filtered_event_ids:
+                    key, label = group_bucket(self.events[eid]["dt"], group_key)
+                    bucket = grouped.setdefault(key, {"label": label, "events": 0, "attendance": 0})
+                    bucket["events"] += 1
+                    bucket["attendance"] += counts_by_event[eid]
+            growth = [grouped[key] for key in sorted(grouped.keys())]
+
+            bins = Counter({label: 0 for label in STAMP_BINS})
+            account_types = Counter()
+            for acct in self._accounts.values():
+                bins[stamp_bin(acct.get("stamps"))] += 1
+                account_types[normalize_account_type(acct.get("account_type"))] += 1
+
+            meetup_browser = []
+            for eid in filtered_event_ids:
+                meta = self.events[eid]
+                roster_sorted = sorted(
+                    (dict(entry) for entry in self._rosters.get(eid, {}).values()),
+                    key=lambda a: a["display_name"].lower(),
+                )
+                checked = [p for p in roster_sorted if p["checked_in"]]
+                rsvps_only = [p for p in roster_sorted if not p["checked_in"]]
+                meetup_browser.append({
+                    "id": eid,
+                    "name": meta["name"],
+                    "date": meta["date_display"],
+                    "date_iso": meta["date_iso"],
+                    "cover": meta["cover"],
+                    "location": meta["location"],
+                    "rsvp_count": len(roster_sorted),
+                    "checkin_count": len(checked),
+                    "attendees": roster_sorted,
+                    "checked_in": checked,
+                    "rsvps": rsvps_only,
+                })
+
+            top_meetups = [
+                {
+                    "event_id": eid,
+                    "name": self.events[eid]["name"],
+                    "date": self.events[eid]["date_iso"],
+                    "count": counts_by_event[eid],
+                    "rsvp": rsvp_totals.get(eid, 0),
+                }
+                for eid in sorted(filtered_event_ids, key=lambda e: counts_by_event[e], reverse=True)[:10]
+            ]
+            top_trainers = [
+                {"trainer": self._trainer_names.get(user_key, user_key), "count": count}
+                for user_key, count in counts_by_trainer.most_common(10)
+            ]
+
+            return {
+                "filtered_event_ids": filtered_event_ids,
+                "counts_by_event": counts_by_event,
+                "counts_by_trainer": counts_by_trainer,
+                "rsvp_totals": rsvp_totals,
+                "top_meetups": top_meetups,
+                "top_trainers": top_trainers,
+                "growth_labels": [bucket["label"] for bucket in growth],
+                "growth_events": [bucket["events"] for bucket in growth],
+                "growth_attend": [bucket["attendance"] for bucket in growth],
+                "stamp_labels": list(STAMP_BINS),
+                "stamp_counts": [bins[label] for label in STAMP_BINS],
+                "account_labels": list(account_types.keys()),
+                "account_counts": list(account_types.values()),
+                "meetup_browser": meetup_browser,
+                "events_count": self._event_rows,
+                "attendance_count": self._attendance_rows,
+                "events_sample": list(self._samples["events"]),
+                "attendance_sample": list(self._samples["attendance"]),
+                "generated_at": self.generated_at,
+            }
@@ -0,0 +1,156 @@
+"""
+In-process unread counters for the trainer inbox badge.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+BROADCAST_AUDIENCE = "ALL"
+
+
+class UnreadCounter:
+    """
+    Keeps one unread total per trainer so the header badge is a dict lookup.
+
+    Writers nudge the counts (`record_sent`, `record_read`, `record_unread`).
+    A daemon thread wakes every half ``reconcile_seconds`` and recounts
+    entries through ``recount`` once they are that old, so drift from other
+    workers or direct table edits heals on its own; a read that finds an
+    entry older than ``reconcile_seconds`` (timer behind or disabled)
+    recounts inline. Trainers whose badge has not been read for
+    ``idle_seconds`` are dropped, and at most ``maxsize`` are kept (least
+    recently read first out).
+    """
+
+    def __init__(
+        self,
+        recount: Callable[[str], Optional[int]],
+        reconcile_seconds: float = 300.0,
+        *,
+        idle_seconds: float = 1800.0,
+        maxsize: int = 4096,
+        timer: bool = True,
+        context_factory: Optional[Any] = None,
+    ):
+        self._recount = recount
+        self.reconcile_seconds = max(0.0, float(reconcile_seconds))
+        self.idle_seconds = max(self.reconcile_seconds, float(idle_seconds))
+        self.maxsize = max(1, int(maxsize))
+        self.timer = timer
+        self._context_factory = context_factory
+        # key -> [count, reconciled_at, last_read_at, trainer as first seen]
+        self._counts: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._timer_pid: Optional[int] = None
+
+    @staticmethod
+    def _key(trainer: str | None) -> str:
+        return (trainer or "").strip().lower()
+
+    def get(self, trainer: str) -> int:
+        key = self._key(trainer)
+        if not key:
+            return 0
+        self._ensure_timer()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None:
+                entry[2] = now
+                self._counts.move_to_end(key)
+                if now - entry[1] < self.reconcile_seconds:
+                    return entry[0]
+        return self.reconcile(trainer)
+
+    def reconcile(self, trainer: str) -> int:
+        """Recount a trainer's unread total from the source of truth."""
+        key = self._key(trainer)
+        fresh = self._recount(trainer)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._counts.get(key)
+            if fresh is None:
+                # Recount failed; keep serving the last known value if we have one.
+                return entry[0] if entry else 0
+            count = max(0, int(fresh))
+            self._counts[key] = [count, now, entry[2] if entry else now, trainer]
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+        return count
+
+    def reconcile_due(self) -> int:
+        """Drop idle trainers and recount the rest that are due; returns recounts done."""
+        now = time.monotonic()
+        due_after = self.reconcile_seconds / 2
+        with self._lock:
+            for key in [k for k, entry in self._counts.items() if now - entry[2] >= self.idle_seconds]:
+                del self._counts[key]
+            due = [entry[3] for entry in self._counts.values() if now - entry[1] >= due_after]
+        for trainer in due:
+            self.reconcile(trainer)
+        return len(due)
+
+    def _ensure_timer(self) -> None:
+        # Per process: a thread started before a gunicorn fork would be lost.
+        pid = os.getpid()
+        if not self.timer or not self.reconcile_seconds or self._timer_pid == pid:
+            return
+        with self._lock:
+            if self._timer_pid == pid:
+                return
+            self._timer_pid = pid
+        threading.Thread(target=self._timer_loop, name="rdab-unread-reconcile", daemon=True).start()
+
+    def _timer_loop(self) -> None:
+        while True:
+            time.sleep(self.reconcile_seconds / 2)
+            try:
+                if self._context_factory:
+                    with self._context_factory():
+                        self.reconcile_due()
+                else:
+                    self.reconcile_due()
+            except Exception as exc:
+                print("⚠️ Unread count reconciliation failed:", exc)
+
+    def record_sent(self, audience: str | None) -> None:
+        if (audience or "").strip().upper() == BROADCAST_AUDIENCE:
+            with self._lock:
+                for entry in self._counts.values():
+                    entry[0] += 1
+            return
+        self._adjust(audience, 1)
+
+    def record_read(self, trainer: str) -> None:
+        self._adjust(trainer, -1)
+
+    def record_unread(self, trainer: str) -> None:
+        self._adjust(trainer, 1)
+
+    def invalidate(self, trainer: str | None = None) -> None:
+        """Force a recount for one trainer, or for everyone when trainer is None."""
+        with self._lock:
+            if trainer is None:
+                self._counts.clear()
+            else:
+                self._counts.pop(self._key(trainer), None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._counts)
+
+    def _adjust(self, trainer: str | None, delta: int) -> None:
+        key = self._key(trainer)
+        if not key:
+            return
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None:
+                return
+            entry[0] = max(0, entry[0] + delta)
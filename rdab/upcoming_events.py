@@ -0,0 +1,36 @@
+"""
+Upcoming meetup events for the dashboard widget, /calendar and /meetups:
+Supabase rows already filtered to the future, merged with locally managed
+events from data/custom_events.json.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+
+class UpcomingEvents:
+    """
+    ``remote`` and ``local`` return normalized events (dicts with aware
+    ``start``/``end`` datetimes); both are expected to be cached upstream,
+    so each call only re-applies the time cut-off, sorts and slices.
+    Callers get shallow copies and may add keys freely.
+    """
+
+    def __init__(self, remote: Callable[[], list[dict]], local: Callable[[], list[dict]]):
+        self._remote = remote
+        self._local = local
+
+    def events(self, limit: Optional[int] = None, *, now: Optional[datetime] = None) -> list[dict]:
+        now = now or datetime.now(timezone.utc)
+        upcoming = [
+            dict(event)
+            for source in (self._remote, self._local)
+            for event in (source() or [])
+            if event["start"] >= now and event["end"] > now
+        ]
+        upcoming.sort(key=lambda event: event["start"])
+        if limit is not None:
+            upcoming = upcoming[:limit]
+        return upcoming
@@ -0,0 +1,167 @@
+"""
+Image upload pipeline: uploads are spooled to disk during the request and
+turned into web-ready files by a background job.
+
+The object key (and so the public URL) is fixed at spool time and the raw
+bytes are stored under it before the request returns, so callers can save
+the URL straight away; the job later overwrites it with the processed file.
+Images Pillow can decode are EXIF-oriented, stripped of metadata, bounded
+to ``max_dimension`` and stored as WebP next to a ``thumbs/`` thumbnail.
+Anything else (PDFs, or HEIC if pillow-heif is missing) is stored byte-for-byte.
+"""
+
+from __future__ import annotations
+
+import io
+import mimetypes
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps
+from werkzeug.utils import secure_filename
+
+try:  # HEIC/HEIF phone photos (pillow-heif is in requirements.txt)
+    from pillow_heif import register_heif_opener  # type: ignore
+except ImportError:  # pragma: no cover - local setups without the wheel
+    print("⚠️ pillow-heif not installed: HEIC uploads will be stored unprocessed")
+    register_heif_opener = None
+else:
+    register_heif_opener()
+
+OUTPUT_SUFFIX = ".webp"
+OUTPUT_CONTENT_TYPE = "image/webp"
+THUMBS_DIR = "thumbs"
+# {root}_{timestamp}_{token}.webp - only keys in this shape have thumbnails.
+_PIPELINE_NAME = re.compile(r"_\d{14}_[0-9a-f]{8}\.webp$")
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    data: bytes
+    content_type: str
+    thumbnail: Optional[bytes] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+def can_transcode(filename: str) -> bool:
+    """True when Pillow has a decoder registered for this file extension."""
+    suffix = os.path.splitext(filename or "")[1].lower()
+    # registered_extensions() also lists save-only formats such as PDF.
+    return Image.registered_extensions().get(suffix) in Image.OPEN
+
+
+def upload_object_key(filename: str, folder: str, *, now: Optional[datetime] = None) -> str:
+    """Unique storage key; ``.webp`` when the pipeline will transcode the file."""
+    safe = secure_filename(filename or "") or "upload"
+    root, ext = os.path.splitext(safe)
+    stamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%d%H%M%S")
+    suffix = OUTPUT_SUFFIX if can_transcode(safe) else ext.lower()
+    name = f"{root or 'upload'}_{stamp}_{uuid.uuid4().hex[:8]}{suffix}"
+    return f"{folder}/{name}" if folder else name
+
+
+def thumbnail_key(object_key: str) -> str:
+    folder, _, name = object_key.rpartition("/")
+    return f"{folder}/{THUMBS_DIR}/{name}" if folder else f"{THUMBS_DIR}/{name}"
+
+
+def thumbnail_url(url: Optional[str]) -> Optional[str]:
+    """Thumbnail URL for a pipeline upload; other URLs are returned unchanged."""
+    if not url:
+        return url
+    path, sep, query = url.partition("?")
+    if not _PIPELINE_NAME.search(path):
+        return url
+    return thumbnail_key(path) + sep + query
+
+
+def spool_upload(file_storage, spool_dir: Path) -> Path:
+    """Stream the upload to ``spool_dir`` without holding it in memory."""
+    spool_dir = Path(spool_dir)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    path = spool_dir / f"{uuid.uuid4().hex}.upload"
+    file_storage.stream.seek(0)
+    file_storage.save(str(path))
+    return path
+
+
+def sweep_spool(spool_dir: Path, max_age_seconds: float, *, now: Optional[float] = None) -> int:
+    """
+    Delete spooled uploads older than ``max_age_seconds``: files whose job
+    ran out of attempts or was lost with its worker. Returns files removed.
+    """
+    cutoff = (time.time() if now is None else now) - max_age_seconds
+    removed = 0
+    try:
+        entries = list(os.scandir(spool_dir))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not entry.name.endswith(".upload"):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # finished (or swept) by another worker meanwhile
+    return removed
+
+
+def _web_mode(img: Image.Image) -> Image.Image:
+    has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+    target = "RGBA" if has_alpha else "RGB"
+    return img if img.mode == target else img.convert(target)
+
+
+def _encode_webp(img: Image.Image, quality: int, **extra) -> bytes:
+    buf = io.BytesIO()
+    # exif/xmp are passed explicitly empty so nothing from the source survives.
+    img.save(buf, "WEBP", quality=quality, method=4, exif=b"", xmp=b"", **extra)
+    return buf.getvalue()
+
+
+def process_image(
+    source: Path,
+    *,
+    object_key: str,
+    content_type: Optional[str] = None,
+    max_dimension: int = 2048,
+    thumb_dimension: int = 400,
+    quality: int = 82,
+) -> ProcessedImage:
+    """Build what should be stored under ``object_key`` from a spooled upload."""
+    raw_type = content_type or mimetypes.guess_type(object_key)[0] or "application/octet-stream"
+    if not object_key.endswith(OUTPUT_SUFFIX):
+        return ProcessedImage(Path(source).read_bytes(), raw_type)
+
+    try:
+        opened = Image.open(source)
+        opened.load()
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        print("⚠️ Upload could not be decoded, storing as uploaded:", exc)
+        return ProcessedImage(Path(source).read_bytes(), raw_type)
+
+    with opened:
+        if getattr(opened, "is_animated", False):
+            # Keep the animation; frames are not resized.
+            frames = _encode_webp(opened, quality, save_all=True)
+            first = _web_mode(opened.copy())
+        else:
+            first = _web_mode(ImageOps.exif_transpose(opened))
+            first.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            frames = None
+        first.info.clear()
+        data = frames if frames is not None else _encode_webp(first, quality)
+        width, height = first.size
+        thumb = first.copy()
+        thumb.thumbnail((thumb_dimension, thumb_dimension), Image.LANCZOS)
+        thumbnail = _encode_webp(thumb, quality)
+    return ProcessedImage(data, OUTPUT_CONTENT_TYPE, thumbnail, width, height)
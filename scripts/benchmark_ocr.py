@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Measure trainer-name OCR accuracy and latency over a corpus of screenshots.
+
+Usage:
+    python scripts/benchmark_ocr.py [--corpus benchmarks/ocr/corpus.json] [--repeat 3] [--concurrency 2]
+
+Each sample is read ``--repeat`` times through the same OcrEngine the app
+uses. The report lists per-sample results, exact and case-insensitive
+accuracy, and p50/p95 latency (preprocessing + tesseract).
+
+Samples may carry a ``derive`` block to re-render a source screenshot the
+way another device or theme would present it (see `derive_screenshot`), so
+one capture can also cover other resolutions, status bar heights, JPEG
+re-compression and team colour schemes without storing more binaries.
+
+Requires the tesseract binary (TESSERACT_CMD overrides its path).
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import statistics
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rdab.ocr import OcrEngine, OcrError  # noqa: E402
+
+
+def _arg_value(args: list[str], name: str, default: str) -> str:
+    if name in args:
+        index = args.index(name)
+        if index + 1 < len(args):
+            return args[index + 1]
+    return default
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _shift_hue(img: Image.Image, degrees: float) -> Image.Image:
+    hue, sat, val = img.convert("HSV").split()
+    offset = round(degrees / 360 * 256)
+    hue = hue.point(lambda value: (value + offset) % 256)
+    return Image.merge("HSV", (hue, sat, val)).convert("RGB")
+
+
+def derive_screenshot(data: bytes, derive: dict) -> bytes:
+    """
+    Re-render a screenshot per ``derive``: ``width`` (device resolution),
+    ``pad_top`` (extra status bar, fraction of height, filled with the top
+    row's colour), ``hue_shift`` (degrees, for other team themes) and
+    ``jpeg_quality`` (screenshots shared through chat apps).
+    """
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert("RGB")
+    if derive.get("hue_shift"):
+        img = _shift_hue(img, float(derive["hue_shift"]))
+    if derive.get("width"):
+        width = int(derive["width"])
+        img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    if derive.get("pad_top"):
+        pad = round(img.height * float(derive["pad_top"]))
+        padded = Image.new("RGB", (img.width, img.height + pad), img.getpixel((img.width // 2, 0)))
+        padded.paste(img, (0, pad))
+        img = padded
+    buf = io.BytesIO()
+    if derive.get("jpeg_quality"):
+        img.save(buf, "JPEG", quality=int(derive["jpeg_quality"]))
+    else:
+        img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def load_sample(sample: dict) -> bytes:
+    data = (ROOT / sample["path"]).read_bytes()
+    return derive_screenshot(data, sample["derive"]) if sample.get("derive") else data
+
+
+def _label(sample: dict) -> str:
+    return sample.get("id") or sample["path"]
+
+
+def main(args: list[str]) -> None:
+    corpus_path = ROOT / _arg_value(args, "--corpus", "benchmarks/ocr/corpus.json")
+    repeat = max(1, int(_arg_value(args, "--repeat", "3")))
+    concurrency = max(1, int(_arg_value(args, "--concurrency", "2")))
+    samples = json.loads(corpus_path.read_text(encoding="utf-8")).get("samples", [])
+    if not samples:
+        raise SystemExit(f"No samples in {corpus_path}")
+
+    engine = OcrEngine(cmd=os.getenv("TESSERACT_CMD", "tesseract"), max_concurrency=concurrency)
+    loaded = [(sample, load_sample(sample)) for sample in samples]
+    jobs = [job for job in loaded for _ in range(repeat)]
+
+    def _run(job):
+        sample, data = job
+        try:
+            result = engine.read_trainer_name(data)
+            return sample, result.text, result.ms, None
+        except OcrError as exc:
+            return sample, None, 0.0, str(exc)
+
+    print(f"🔍 {len(samples)} sample(s) × {repeat} run(s), concurrency {concurrency}\n")
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(_run, jobs))
+
+    latencies = [ms for _, _, ms, error in results if error is None]
+    exact = sum(1 for sample, text, _, _ in results if text == sample["expected"])
+    folded = sum(1 for sample, text, _, _ in results if (text or "").casefold() == sample["expected"].casefold())
+    errors = sum(1 for *_, error in results if error)
+
+    seen = set()
+    for sample, text, ms, error in results:
+        if _label(sample) in seen:
+            continue
+        seen.add(_label(sample))
+        mark = "✅" if text == sample["expected"] else "❌"
+        print(f"  {mark} {_label(sample)}: expected {sample['expected']!r}, got {text!r} ({error or f'{ms:.0f} ms'})")
+
+    total = len(results)
+    print(f"\nAccuracy: {exact}/{total} exact ({exact / total:.0%}), {folded}/{total} ignoring case")
+    if latencies:
+        print(f"Latency: p50 {statistics.median(latencies):.0f} ms, p95 {_percentile(latencies, 95):.0f} ms, "
+              f"max {max(latencies):.0f} ms")
+    if errors:
+        print(f"⚠️ {errors} run(s) failed")
+
+
+if __name__ == "__main__":
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        sys.exit("\n⚠️ Benchmark cancelled by user.")
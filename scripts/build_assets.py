@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Build content-hashed, compressed copies of the images under static/.
+
+Usage:
+    python scripts/build_assets.py [--prune] [--no-avif] [--widths 160,320,640,1280]
+
+    --prune     Delete files in static/build that the new manifest no longer uses.
+    --no-avif   Only generate WebP variants (AVIF encoding is much slower).
+    --widths    Responsive widths to generate (never upscaled).
+
+Writes static/build/asset-manifest.json; the app picks it up on the next
+request and serves the hashed files with immutable caching. Re-running only
+encodes images whose content changed.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rdab.assets import DEFAULT_WIDTHS, available_formats, build_assets  # noqa: E402
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+
+
+def _arg_value(args: list[str], name: str) -> str | None:
+    if name in args:
+        index = args.index(name)
+        if index + 1 < len(args):
+            return args[index + 1]
+    return None
+
+
+def main(args: list[str]) -> None:
+    widths = DEFAULT_WIDTHS
+    raw_widths = _arg_value(args, "--widths")
+    if raw_widths:
+        try:
+            widths = tuple(int(w) for w in raw_widths.split(",") if w.strip())
+        except ValueError:
+            raise SystemExit("--widths must be a comma-separated list of integers")
+    formats = tuple(f for f in available_formats() if not (f == "avif" and "--no-avif" in args))
+
+    print(f"🖼️  Building static assets ({', '.join(formats) or 'no variant formats'}; widths {widths})...")
+    started = time.monotonic()
+    result = build_assets(STATIC_DIR, widths=widths, formats=formats, prune="--prune" in args)
+    print(f"\n✅ Asset build complete in {time.monotonic() - started:.1f}s.")
+    print(f"    Images in manifest: {result['assets']}")
+    print(f"    Encoded: {result['built']}  Reused: {result['reused']}")
+    print(f"    Files written: {result['files_written']}  Pruned: {result['pruned']}")
+
+
+if __name__ == "__main__":
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        sys.exit("\n⚠️ Asset build cancelled by user.")
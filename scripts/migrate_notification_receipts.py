@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Backfill notification_receipts from the legacy read_by / metadata.hidden_for arrays.
+
+Usage:
+    python scripts/migrate_notification_receipts.py [--dry-run] [--clear-arrays]
+
+    --dry-run       Count the receipts that would be written without touching Supabase.
+    --clear-arrays  After a successful backfill, reset read_by and metadata.read_by /
+                    metadata.hidden_for on every migrated notification.
+
+Run it once after creating the table (see README), then deploy with
+USE_NOTIFICATION_RECEIPTS=1. Re-running is safe: receipts are upserted.
+
+Environment variables required:
+    SUPABASE_URL
+    SUPABASE_KEY
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List
+
+try:
+    from supabase import create_client  # type: ignore
+except ImportError as exc:  # pragma: no cover
+    raise SystemExit("supabase-py is required. Run `pip install -r requirements.txt`.") from exc
+
+from app import (  # reuse existing helpers
+    INBOX_METADATA_HIDDEN_KEY,
+    INBOX_METADATA_READ_KEY,
+    NOTIFICATION_RECEIPTS_TABLE,
+    _ensure_metadata_dict,
+    _normalize_user_list,
+)
+
+PAGE_SIZE = 1000
+UPSERT_BATCH = 500
+
+
+def _receipts_for(row: dict, migrated_at: str) -> List[dict]:
+    """One receipt per trainer that has read or hidden this notification."""
+    metadata = _ensure_metadata_dict(row.get("metadata"))
+    read_by = _normalize_user_list(row.get("read_by") or metadata.get(INBOX_METADATA_READ_KEY))
+    hidden_for = _normalize_user_list(metadata.get(INBOX_METADATA_HIDDEN_KEY))
+
+    receipts: Dict[str, dict] = {}
+    for trainer, column in [(t, "read_at") for t in read_by] + [(t, "hidden_at") for t in hidden_for]:
+        key = trainer.strip().lower()
+        if not key:
+            continue
+        receipt = receipts.setdefault(key, {
+            "notification_id": row["id"],
+            "trainer": key,
+            "read_at": None,
+            "hidden_at": None,
+            "updated_at": migrated_at,
+        })
+        receipt[column] = migrated_at
+    return list(receipts.values())
+
+
+def _fetch_page(client, offset: int) -> List[dict]:
+    resp = (
+        client.table("notifications")
+        .select("id,read_by,metadata")
+        .order("id")
+        .range(offset, offset + PAGE_SIZE - 1)
+        .execute()
+    )
+    return resp.data or []
+
+
+def _flush(client, batch: List[dict]) -> None:
+    client.table(NOTIFICATION_RECEIPTS_TABLE).upsert(batch, on_conflict="notification_id,trainer").execute()
+
+
+def _clear_arrays(client, row: dict) -> None:
+    metadata = _ensure_metadata_dict(row.get("metadata"))
+    metadata.pop(INBOX_METADATA_READ_KEY, None)
+    metadata.pop(INBOX_METADATA_HIDDEN_KEY, None)
+    client.table("notifications").update({"read_by": [], "metadata": metadata}).eq("id", row["id"]).execute()
+
+
+def migrate_all(dry_run: bool = False, clear_arrays: bool = False):
+    supabase_url = os.environ.get("SUPABASE_URL")
+    supabase_key = os.environ.get("SUPABASE_KEY")
+    if not (supabase_url and supabase_key):
+        raise SystemExit("Missing SUPABASE_URL or SUPABASE_KEY environment variables.")
+
+    client = create_client(supabase_url, supabase_key)
+    migrated_at = datetime.now(timezone.utc).isoformat()
+
+    print("🔍 Scanning notifications...")
+    scanned = 0
+    written = 0
+    touched: List[dict] = []
+    batch: List[dict] = []
+    offset = 0
+    while True:
+        rows = _fetch_page(client, offset)
+        if not rows:
+            break
+        offset += len(rows)
+        scanned += len(rows)
+        for row in rows:
+            receipts = _receipts_for(row, migrated_at)
+            if not receipts:
+                continue
+            touched.append(row)
+            batch.extend(receipts)
+            if len(batch) >= UPSERT_BATCH:
+                if not dry_run:
+                    _flush(client, batch)
+                written += len(batch)
+                batch = []
+        print(f"  • Scanned {scanned} notifications, {written + len(batch)} receipts so far")
+        if len(rows) < PAGE_SIZE:
+            break
+    if batch:
+        if not dry_run:
+            _flush(client, batch)
+        written += len(batch)
+
+    if clear_arrays and not dry_run:
+        print("🧹 Clearing legacy arrays...")
+        for row in touched:
+            _clear_arrays(client, row)
+
+    print("\n✅ Migration complete." if not dry_run else "\n✅ Dry run complete.")
+    print(f"    Notifications scanned: {scanned}")
+    print(f"    With read/hidden state: {len(touched)}")
+    print(f"    Receipts {'written' if not dry_run else 'to write'}: {written}")
+
+
+if __name__ == "__main__":
+    try:
+        migrate_all(dry_run="--dry-run" in sys.argv[1:], clear_arrays="--clear-arrays" in sys.argv[1:])
+    except KeyboardInterrupt:
+        sys.exit("\n⚠️ Migration cancelled by user.")
@@ -1,21 +1,175 @@
-// RDAB TEMPORARY NEUTRAL SERVICE WORKER
-// Purpose: disable caching while keeping PWA installed
+// RDAB service worker
+// Served by the /service-worker.js route, which prepends
+// self.RDAB_SW_CONFIG = {version, shell, offlineUrl, networkFirstPages,
+// logoutPaths, loginPaths}.
+// The version changes with the asset manifest, so every deploy installs a
+// fresh worker and drops the previous caches.
+//
+//   - app shell (CSS, nav icons, offline page) is precached on install
+//   - /static/build/* (content-hashed) is cache-first and kept across versions
+//   - other /static/* is stale-while-revalidate
+//   - dashboard/passport HTML: network with a short timeout, then the last
+//     copy seen, then the offline page. Those copies belong to one trainer,
+//     so they are dropped on login, logout, and whenever the server answers
+//     a page with a login redirect or 401/403 (expired session).
+//   - everything else goes to the network untouched
 
-self.addEventListener('install', event => {
-  self.skipWaiting();
+const CONFIG = self.RDAB_SW_CONFIG || { version: "dev", shell: [], networkFirstPages: [], logoutPaths: [], loginPaths: [] };
+const PREFIX = "rdab-";
+const SHELL_CACHE = `${PREFIX}shell-${CONFIG.version}`;
+const STATIC_CACHE = `${PREFIX}static-${CONFIG.version}`;
+const PAGES_CACHE = `${PREFIX}pages`;
+// Hashed files never change, so this one survives version bumps.
+const BUILD_CACHE = `${PREFIX}build`;
+const PAGE_TIMEOUT_MS = CONFIG.pageTimeoutMs || 3000;
+const STATIC_CACHE_MAX_ENTRIES = 300;
+const BUILD_CACHE_MAX_ENTRIES = 500;
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    (async () => {
+      const cache = await caches.open(SHELL_CACHE);
+      // One missing file must not keep the whole worker from installing.
+      await Promise.all(CONFIG.shell.map((url) => cache.add(new Request(url, { cache: "reload" })).catch(() => {})));
+      await self.skipWaiting();
+    })()
+  );
 });
 
-self.addEventListener('activate', event => {
+self.addEventListener("activate", (event) => {
   event.waitUntil(
     (async () => {
+      const keep = new Set([SHELL_CACHE, STATIC_CACHE, PAGES_CACHE, BUILD_CACHE]);
       const keys = await caches.keys();
-      await Promise.all(keys.map(k => caches.delete(k)));
+      // Also clears caches left behind by older, differently named workers.
+      await Promise.all(keys.filter((key) => !keep.has(key)).map((key) => caches.delete(key)));
       await self.clients.claim();
     })()
   );
 });
 
-// Network-only: never cache or intercept
-self.addEventListener('fetch', event => {
-  event.respondWith(fetch(event.request));
+async function trimCache(name, maxEntries) {
+  const cache = await caches.open(name);
+  const keys = await cache.keys();
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map((key) => cache.delete(key)));
+}
+
+async function fromShell(request) {
+  const cache = await caches.open(SHELL_CACHE);
+  return cache.match(request, { ignoreVary: true });
+}
+
+async function cacheFirst(request) {
+  const cached = await caches.match(request, { ignoreVary: true });
+  if (cached) return cached;
+  const response = await fetch(request);
+  if (response.ok) {
+    const cache = await caches.open(BUILD_CACHE);
+    await cache.put(request, response.clone());
+    await trimCache(BUILD_CACHE, BUILD_CACHE_MAX_ENTRIES);
+  }
+  return response;
+}
+
+async function staleWhileRevalidate(event) {
+  const request = event.request;
+  const cache = await caches.open(STATIC_CACHE);
+  const cached = (await cache.match(request)) || (await fromShell(request));
+  const refresh = fetch(request)
+    .then(async (response) => {
+      if (response.ok) {
+        await cache.put(request, response.clone());
+        await trimCache(STATIC_CACHE, STATIC_CACHE_MAX_ENTRIES);
+      }
+      return response;
+    });
+  if (cached) {
+    event.waitUntil(refresh.catch(() => {}));
+    return cached;
+  }
+  return refresh;
+}
+
+function withTimeout(promise, ms) {
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => reject(new Error("timeout")), ms);
+    promise.then(
+      (value) => { clearTimeout(timer); resolve(value); },
+      (error) => { clearTimeout(timer); reject(error); }
+    );
+  });
+}
+
+async function offlineFallback() {
+  return (CONFIG.offlineUrl && (await fromShell(CONFIG.offlineUrl))) || Response.error();
+}
+
+function forgetPages() {
+  return caches.delete(PAGES_CACHE);
+}
+
+async function networkFirstPage(event) {
+  const request = event.request;
+  const cache = await caches.open(PAGES_CACHE);
+  const network = fetch(request).then(async (response) => {
+    if (response.redirected || response.status === 401 || response.status === 403) {
+      // Signed out (or expired): nobody should see the cached pages now.
+      await forgetPages();
+    } else if (response.ok) {
+      await cache.put(request, response.clone());
+    }
+    return response;
+  });
+  try {
+    return await withTimeout(network, PAGE_TIMEOUT_MS);
+  } catch (error) {
+    const cached = await cache.match(request);
+    if (cached) {
+      // Let the slow response finish so the next visit is fresh.
+      event.waitUntil(network.catch(() => {}));
+      return cached;
+    }
+    try {
+      return await network;
+    } catch (networkError) {
+      return offlineFallback();
+    }
+  }
+}
+
+async function networkWithOfflineFallback(request) {
+  try {
+    return await fetch(request);
+  } catch (error) {
+    return offlineFallback();
+  }
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+
+  if (CONFIG.logoutPaths.includes(url.pathname) || (CONFIG.loginPaths || []).includes(url.pathname)) {
+    // Cached pages belong to whoever was signed in before this request.
+    event.waitUntil(forgetPages());
+    return;
+  }
+  if (request.method !== "GET") return;
+
+  if (url.pathname.startsWith("/static/build/")) {
+    event.respondWith(cacheFirst(request));
+    return;
+  }
+  if (url.pathname.startsWith("/static/")) {
+    event.respondWith(staleWhileRevalidate(event));
+    return;
+  }
+  if (request.mode === "navigate") {
+    if (CONFIG.networkFirstPages.includes(url.pathname)) {
+      event.respondWith(networkFirstPage(event));
+    } else {
+      event.respondWith(networkWithOfflineFallback(request));
+    }
+  }
 });
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+# Tests that import app run it without a Supabase client; they swap in
+# tests/supabase_stub.py where a client is needed.
+os.environ.setdefault("USE_SUPABASE", "0")
+
+
+@pytest.fixture
+def client():
+    """Flask test client; app is imported lazily so the env above applies first."""
+    import app
+
+    return app.app.test_client()
+
+
+@pytest.fixture
+def trainer_client(client):
+    """Test client with trainer "Ash" logged in."""
+    with client.session_transaction() as session:
+        session["trainer"] = "Ash"
+    return client
@@ -0,0 +1,114 @@
+"""
+Tiny evaluator for the PostgREST logic trees the app builds (``or(...)`` /
+``and(...)`` over ``column[.not].op.value``), so filters can be checked
+against in-memory rows.
+"""
+
+import json
+import re
+
+
+def parse(text):
+    pos = 0
+
+    def value():
+        nonlocal pos
+        if text[pos] != '"':
+            end = pos
+            depth = 0
+            while end < len(text) and (depth or text[end] not in ",)"):
+                if text[end] in "({":
+                    depth += 1
+                elif text[end] in ")}":
+                    depth -= 1
+                end += 1
+            token, pos = text[pos:end], end
+            return None if token == "null" else token
+        pos += 1
+        out = []
+        while text[pos] != '"':
+            if text[pos] == "\\":
+                pos += 1
+            out.append(text[pos])
+            pos += 1
+        pos += 1
+        return "".join(out)
+
+    def node():
+        nonlocal pos
+        for op in ("or(", "and("):
+            if text.startswith(op, pos):
+                pos += len(op)
+                children = [node()]
+                while text[pos] == ",":
+                    pos += 1
+                    children.append(node())
+                assert text[pos] == ")"
+                pos += 1
+                return (op[:-1], children)
+        column, _, rest = text[pos:].partition(".")
+        pos += len(column) + 1
+        negate = rest.startswith("not.")
+        if negate:
+            pos += 4
+        op = text[pos:].partition(".")[0]
+        pos += len(op) + 1
+        return ("cmp", (column, negate, op, value()))
+
+    tree = node()
+    assert pos == len(text), text[pos:]
+    return tree
+
+
+def _column(row, column):
+    name, _, key = column.partition("->")
+    value = row.get(name)
+    if key:
+        value = (value or {}).get(key) if isinstance(value, dict) else None
+    return value
+
+
+def _array(literal):
+    """Postgres array literal ({a,b}) or JSON array."""
+    if literal.startswith("["):
+        return json.loads(literal)
+    return [item for item in literal.strip("{}").split(",") if item]
+
+
+def _in_list(literal):
+    return [item.strip('"') for item in literal.strip("()").split(",")]
+
+
+def _like(actual, pattern, flags=0):
+    regex = "".join(".*" if ch in "%*" else "." if ch == "_" else re.escape(ch) for ch in pattern)
+    return re.fullmatch(regex, str(actual), flags) is not None
+
+
+def matches(tree, row):
+    kind, body = tree
+    if kind == "or":
+        return any(matches(child, row) for child in body)
+    if kind == "and":
+        return all(matches(child, row) for child in body)
+    column, negate, op, literal = body
+    actual = _column(row, column)
+    if op == "is":
+        result = actual is None
+    elif actual is None:
+        result = False  # SQL: comparisons with NULL are never true
+    elif op == "cs":
+        result = all(item in actual for item in _array(literal))
+    elif op == "ov":
+        result = any(item in actual for item in _array(literal))
+    elif op == "in":
+        result = actual in _in_list(literal)
+    elif op in ("like", "ilike"):
+        result = _like(actual, literal, re.IGNORECASE if op == "ilike" else 0)
+    else:
+        result = {"eq": actual == literal, "lt": actual < literal, "gt": actual > literal}[op]
+    return not result if negate else result
+
+
+def select(condition, rows):
+    tree = parse(condition)
+    return [row for row in rows if matches(tree, row)]
@@ -0,0 +1,243 @@
+"""
+In-memory stand-in for the supabase-py client, covering the query-builder
+calls app.py makes. Tables are lists of dicts; RPCs are Python functions
+registered by name (an unregistered RPC fails like an undeployed one, with
+PostgREST's PGRST202). Every executed query is appended to ``calls`` so
+tests can assert how many round trips a code path makes.
+"""
+
+import copy
+import itertools
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from postgrest.exceptions import APIError
+
+from tests.logic_tree import matches, parse
+
+
+@dataclass
+class Response:
+    data: Any
+    count: Optional[int] = None
+
+
+def _same(actual, expected) -> bool:
+    return actual == expected or (actual is not None and str(actual) == str(expected))
+
+
+def _ilike(actual, pattern) -> bool:
+    if actual is None:
+        return False
+    regex = "".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in str(pattern))
+    return re.fullmatch(regex, str(actual), re.IGNORECASE) is not None
+
+
+def _sort_key(value):
+    # Compare numbers as numbers and everything else as text.
+    return (0, value, "") if isinstance(value, (int, float)) and not isinstance(value, bool) else (1, 0, str(value))
+
+
+class Query:
+    def __init__(self, client: "StubSupabase", table: str, rows: Optional[list] = None):
+        self.client = client
+        self.table = table
+        self._rows = rows  # RPC result sets are queried like a table
+        self.operation = "select"
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.count: Optional[str] = None
+        self.filters: list[tuple[str, Callable[[dict], bool]]] = []
+        self.orders: list[tuple[str, bool, Optional[bool]]] = []
+        self.offset = 0
+        self.limit_rows: Optional[int] = None
+
+    # ---- verbs -------------------------------------------------------
+    def select(self, columns: str = "*", *, count: Optional[str] = None):
+        self.count = count
+        return self
+
+    def insert(self, payload):
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, *, on_conflict: str = "id", **_):
+        self.operation, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, values: dict):
+        self.operation, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    # ---- filters -----------------------------------------------------
+    def _filter(self, label: str, predicate: Callable[[dict], bool]):
+        self.filters.append((label, predicate))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(f"{column}=eq.{value}", lambda row: _same(row.get(column), value))
+
+    def neq(self, column, value):
+        return self._filter(f"{column}=neq.{value}", lambda row: not _same(row.get(column), value))
+
+    def ilike(self, column, pattern):
+        return self._filter(f"{column}=ilike.{pattern}", lambda row: _ilike(row.get(column), pattern))
+
+    def in_(self, column, values):
+        values = list(values)
+        return self._filter(f"{column}=in.{values}", lambda row: any(_same(row.get(column), v) for v in values))
+
+    def _compare(self, op, column, value):
+        def predicate(row):
+            actual = row.get(column)
+            if actual is None:
+                return False
+            left, right = _sort_key(actual), _sort_key(value)
+            return {"gt": left > right, "gte": left >= right, "lt": left < right, "lte": left <= right}[op]
+        return self._filter(f"{column}={op}.{value}", predicate)
+
+    def gt(self, column, value):
+        return self._compare("gt", column, value)
+
+    def gte(self, column, value):
+        return self._compare("gte", column, value)
+
+    def lt(self, column, value):
+        return self._compare("lt", column, value)
+
+    def lte(self, column, value):
+        return self._compare("lte", column, value)
+
+    def or_(self, expression: str):
+        tree = parse(f"or({expression})")
+        return self._filter(f"or=({expression})", lambda row: matches(tree, row))
+
+    def order(self, column, *, desc: bool = False, nullsfirst: Optional[bool] = None):
+        self.orders.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int):
+        self.limit_rows = int(size)
+        return self
+
+    def range(self, start: int, end: int):
+        self.offset, self.limit_rows = int(start), int(end) - int(start) + 1
+        return self
+
+    # ---- execution ---------------------------------------------------
+    def _matching(self, rows: list) -> list:
+        return [row for row in rows if all(predicate(row) for _, predicate in self.filters)]
+
+    def _ordered(self, rows: list) -> list:
+        for column, desc, nullsfirst in reversed(self.orders):
+            nulls_first = desc if nullsfirst is None else nullsfirst  # Postgres defaults
+            present = sorted((r for r in rows if r.get(column) is not None),
+                             key=lambda r: _sort_key(r.get(column)), reverse=desc)
+            missing = [r for r in rows if r.get(column) is None]
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def execute(self) -> Response:
+        self.client.calls.append((self.table, self.operation, [label for label, _ in self.filters]))
+        if self.table in self.client.failures:
+            raise self.client.failures[self.table]
+        rows = self._rows if self._rows is not None else self.client.tables.setdefault(self.table, [])
+        if self.operation == "select":
+            found = self._ordered(self._matching(rows))
+            total = len(found)
+            end = None if self.limit_rows is None else self.offset + self.limit_rows
+            page = [copy.deepcopy(row) for row in found[self.offset:end]]
+            return Response(page, total if self.count else None)
+        if self.operation == "insert":
+            new = [dict(row) for row in (self.payload if isinstance(self.payload, list) else [self.payload])]
+            for row in new:
+                row.setdefault("id", self.client.next_id())
+            rows.extend(new)
+            return Response(copy.deepcopy(new))
+        if self.operation == "upsert":
+            keys = [key.strip() for key in self.on_conflict.split(",")]
+            written = []
+            for item in self.payload if isinstance(self.payload, list) else [self.payload]:
+                existing = next((row for row in rows if all(_same(row.get(k), item.get(k)) for k in keys)), None)
+                if existing is None:
+                    existing = dict(item)
+                    rows.append(existing)
+                else:
+                    existing.update(item)
+                written.append(copy.deepcopy(existing))
+            return Response(written)
+        if self.operation == "update":
+            changed = self._matching(rows)
+            for row in changed:
+                row.update(copy.deepcopy(self.payload))
+            return Response(copy.deepcopy(changed))
+        if self.operation == "delete":
+            removed = self._matching(rows)
+            rows[:] = [row for row in rows if row not in removed]
+            return Response(removed)
+        raise AssertionError(self.operation)
+
+
+class RpcCall:
+    def __init__(self, client: "StubSupabase", name: str, params: dict, count: Optional[str]):
+        self.client, self.name, self.params, self.count = client, name, params, count
+
+    def _run(self):
+        handler = self.client.rpcs.get(self.name)
+        if handler is None:
+            raise APIError({
+                "code": "PGRST202",
+                "message": f"Could not find the function public.{self.name} in the schema cache",
+            })
+        return handler(self.client, **self.params)
+
+    def select(self, columns: str = "*"):
+        # Set-returning functions can be filtered like a table.
+        query = Query(self.client, f"rpc:{self.name}", rows=self._run())
+        return query.select(columns, count=self.count)
+
+    def execute(self) -> Response:
+        self.client.calls.append((f"rpc:{self.name}", "rpc", []))
+        return Response(self._run())
+
+
+class StubSupabase:
+    def __init__(self, tables: Optional[dict] = None, rpcs: Optional[dict] = None):
+        self.tables: dict[str, list] = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.rpcs: dict[str, Callable] = dict(rpcs or {})
+        self.failures: dict[str, Exception] = {}
+        self.calls: list[tuple[str, str, list]] = []
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> str:
+        return f"stub-{next(self._ids)}"
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def rpc(self, name: str, params: Optional[dict] = None, *, count: Optional[str] = None) -> RpcCall:
+        return RpcCall(self, name, params or {}, count)
+
+    def calls_to(self, table: str, operation: Optional[str] = None) -> list:
+        return [call for call in self.calls if call[0] == table and (operation is None or call[1] == operation)]
+
+
+def bulletin_toggle_like(client: StubSupabase, p_post_id, p_trainer):
+    """Python twin of the bulletin_toggle_like SQL function in README."""
+    likes = client.tables.setdefault("bulletin_post_likes", [])
+    mine = [row for row in likes if _same(row.get("post_id"), p_post_id) and row.get("trainer_username") == p_trainer]
+    if mine:
+        likes[:] = [row for row in likes if row not in mine]
+    else:
+        likes.append({"post_id": p_post_id, "trainer_username": p_trainer})
+    like_count = None
+    for post in client.tables.setdefault("bulletin_posts", []):
+        if _same(post.get("id"), p_post_id):
+            post["like_count"] = max((post.get("like_count") or 0) + (-1 if mine else 1), 0)
+            like_count = post["like_count"]
+    return [{"liked": not mine, "like_count": like_count}]
@@ -0,0 +1,47 @@
+from PIL import Image
+
+from rdab.assets import AssetManifest, build_assets
+
+CHROME_ACCEPT = {"image/avif", "image/webp", "image/apng"}
+
+
+def _static_dir(tmp_path):
+    static = tmp_path / "static"
+    (static / "icons").mkdir(parents=True)
+    # Noise compresses badly as PNG, so the WebP variant is kept.
+    Image.effect_noise((400, 300), 64).convert("RGB").save(static / "icons" / "stamp.png")
+    build_assets(static, widths=(160,), formats=("webp",), log=lambda _msg: None)
+    return static
+
+
+def test_urls_do_not_depend_on_the_client(tmp_path):
+    manifest = AssetManifest(_static_dir(tmp_path))
+    hashed = manifest.resolve("icons/stamp.png")
+    assert hashed.startswith("build/icons/stamp.") and hashed.endswith(".png")
+    assert manifest.resolve("icons/missing.png") == "icons/missing.png"
+    assert all(path.endswith(".png") for path, _width in manifest.srcset("icons/stamp.png"))
+
+
+def test_variant_is_negotiated_when_serving(tmp_path):
+    manifest = AssetManifest(_static_dir(tmp_path))
+    hashed = manifest.resolve("icons/stamp.png")
+    assert manifest.has_variants(hashed)
+    assert manifest.variant_for(hashed, CHROME_ACCEPT).endswith(".webp")
+    assert manifest.variant_for(hashed, {"image/avif"}) is None
+    assert manifest.variant_for(hashed, ()) is None
+
+    small, width = manifest.srcset("icons/stamp.png")[0]
+    assert width == 160
+    assert manifest.variant_for(small, CHROME_ACCEPT).endswith(".w160.webp")
+
+
+def test_disabled_manifest_serves_originals(tmp_path):
+    manifest = AssetManifest(_static_dir(tmp_path), enabled=False)
+    assert manifest.resolve("icons/stamp.png") == "icons/stamp.png"
+    assert manifest.variant_for("build/icons/anything.png", CHROME_ACCEPT) is None
+
+
+def test_rebuild_reuses_unchanged_sources(tmp_path):
+    static = _static_dir(tmp_path)
+    result = build_assets(static, widths=(160,), formats=("webp",), log=lambda _msg: None)
+    assert result["built"] == 0 and result["reused"] == 1
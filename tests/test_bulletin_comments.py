@@ -0,0 +1,91 @@
+import pytest
+
+import app
+from rdab.inbox_feed import decode_cursor, encode_cursor
+from tests.supabase_stub import StubSupabase
+
+URL = "/api/bulletin/hello/comments"
+
+
+def _comment(comment_id, created_at, parent=None, **fields):
+    return {"id": comment_id, "post_id": "p1", "trainer_username": "Misty", "body": comment_id,
+            "created_at": created_at, "parent_comment_id": parent, **fields}
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    client = StubSupabase({"bulletin_post_comments": [
+        _comment("c1", "2025-01-01T10:00:00+00:00", depth=0, root_id=None),
+        _comment("c2", "2025-01-01T10:05:00+00:00", "c1", depth=1, root_id="c1"),
+        _comment("c3", "2025-01-01T10:05:00+00:00", "c2", depth=2, root_id="c1"),
+        _comment("x1", "2025-01-01T09:00:00+00:00", post_id="other"),
+    ]})
+    monkeypatch.setattr(app, "supabase", client)
+    monkeypatch.setattr(app, "USE_SUPABASE", True)
+    monkeypatch.setattr(app, "_bulletin_post_for_api", lambda slug: ({"id": "p1", "slug": slug}, "p1"))
+    monkeypatch.setattr(app, "_send_comment_reply_notification", lambda *args: None)
+    return client
+
+
+def test_full_tree_then_only_newer_comments_since_the_cursor(client, stub):
+    body = client.get(URL).get_json()
+    assert body["count"] == 3
+    [root] = body["comments"]
+    assert (root["id"], root["depth"]) == ("c1", 0)
+    assert root["replies"][0]["replies"][0]["depth"] == 2
+    assert decode_cursor(body["cursor"]) == ["2025-01-01T10:05:00+00:00", "c3"]
+
+    rows = stub.tables["bulletin_post_comments"]
+    # Same timestamp as the cursor but a later id, then strictly newer rows.
+    rows.append(_comment("c4", "2025-01-01T10:05:00+00:00", "c1", depth=1, root_id="c1"))
+    rows.append(_comment("c5", "2025-01-01T11:00:00+00:00", depth=0))
+    delta = client.get(URL, query_string={"since": body["cursor"]}).get_json()
+    assert [(c["id"], c["parent_id"], c["depth"], c["replies"]) for c in delta["new_comments"]] == [
+        ("c4", "c1", 1, []), ("c5", None, 0, []),
+    ]
+
+    idle = client.get(URL, query_string={"since": delta["cursor"]}).get_json()
+    assert idle == {"new_comments": [], "cursor": delta["cursor"]}
+
+
+@pytest.mark.parametrize("since", ["!!!", encode_cursor(["2025-01-01"]), encode_cursor({"a": 1})])
+def test_bad_since_cursor_is_rejected(client, stub, since):
+    assert client.get(URL, query_string={"since": since}).status_code == 400
+
+
+def test_reply_copies_depth_and_root_from_one_parent_lookup(trainer_client, stub):
+    resp = trainer_client.post(URL, json={"body": "Nice!", "parent_id": "c2"})
+    assert resp.status_code == 201
+    comment = resp.get_json()["comment"]
+    assert (comment["parent_id"], comment["depth"], comment["author"]) == ("c2", 2, "Ash")
+
+    stored = stub.tables["bulletin_post_comments"][-1]
+    assert (stored["depth"], stored["root_id"], stored["parent_comment_id"]) == (2, "c1", "c2")
+    assert len(stub.calls_to("bulletin_post_comments", "select")) == 1
+
+
+def test_root_reply_uses_the_parent_as_root(trainer_client, stub):
+    trainer_client.post(URL, json={"body": "Hi", "parent_id": "c1"})
+    stored = stub.tables["bulletin_post_comments"][-1]
+    assert (stored["depth"], stored["root_id"]) == (1, "c1")
+
+
+def test_replies_stop_at_the_maximum_depth(trainer_client, stub):
+    resp = trainer_client.post(URL, json={"body": "Too deep", "parent_id": "c3"})
+    assert resp.status_code == 400
+    assert not stub.calls_to("bulletin_post_comments", "insert")
+
+
+def test_parent_from_another_post_is_rejected(trainer_client, stub):
+    assert trainer_client.post(URL, json={"body": "Hi", "parent_id": "x1"}).status_code == 400
+
+
+def test_rows_without_stored_depth_fall_back_to_walking_the_chain(trainer_client, stub):
+    rows = stub.tables["bulletin_post_comments"]
+    rows[:] = [_comment("l1", "2025-01-01T10:00:00+00:00"), _comment("l2", "2025-01-01T10:01:00+00:00", "l1")]
+    resp = trainer_client.post(URL, json={"body": "Legacy", "parent_id": "l2"})
+    assert resp.status_code == 201
+    assert resp.get_json()["comment"]["depth"] == 2
+    assert "depth" not in rows[-1]  # the legacy table has no column to fill
+    # The walked depth still caps nesting.
+    assert trainer_client.post(URL, json={"body": "Deeper", "parent_id": rows[-1]["id"]}).status_code == 400
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+from dateutil import parser
+
+from rdab.bulletin_feed import BulletinFeed
+
+T0 = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+MIN = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _parse(value):
+    return parser.isoparse(value) if value else MIN
+
+
+def _at(minutes):
+    return (T0 + timedelta(minutes=minutes)).isoformat()
+
+
+def _post(post_id, status, **fields):
+    return {"id": post_id, "slug": f"Post-{post_id}", "status": status,
+            "content_sections": [{"body": post_id}], **fields}
+
+
+class Snapshot:
+    def __init__(self, posts):
+        self.posts = posts
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.posts
+
+
+def _ids(posts):
+    return [post["id"] for post in posts]
+
+
+def test_scheduled_posts_go_live_at_their_publish_time():
+    feed = BulletinFeed(Snapshot([
+        _post("live", "published", published_at=_at(-60)),
+        _post("soon", "scheduled", scheduled_publish_at=_at(10)),
+        _post("later", "scheduled", scheduled_publish_at=_at(30), published_at=_at(-5)),
+        _post("undated", "scheduled"),
+    ]), _parse)
+
+    assert _ids(feed.posts(now=T0)) == ["live"]
+    assert feed.post("post-soon", now=T0) is None
+
+    due = feed.posts(now=T0 + timedelta(minutes=10))
+    assert _ids(due) == ["soon", "live"]
+    assert due[0]["status"] == "published"
+    assert due[0]["published_at"] == _at(10)
+
+    everything = feed.posts(now=T0 + timedelta(days=1))
+    assert _ids(everything) == ["later", "soon", "live"]
+    # An explicit published_at is kept; the go-live time only fills a gap.
+    assert everything[0]["published_at"] == _at(-5)
+    assert feed.post("POST-LATER", now=T0 + timedelta(days=1))["id"] == "later"
+
+
+def test_snapshot_is_reindexed_only_when_it_changes():
+    snapshot = Snapshot([_post("a", "published", published_at=_at(0))])
+    feed = BulletinFeed(snapshot, _parse)
+    first = feed.posts(now=T0)
+    assert _ids(feed.posts(now=T0)) == _ids(first)
+    assert snapshot.calls == 2
+
+    snapshot.posts = snapshot.posts + [_post("b", "published", published_at=_at(5))]
+    assert _ids(feed.posts(now=T0)) == ["b", "a"]
+
+
+def test_callers_get_copies_and_sections_only_on_request():
+    feed = BulletinFeed(Snapshot([_post("a", "published", published_at=_at(0))]), _parse)
+    listed = feed.posts(now=T0)
+    assert listed[0]["content_sections"] == []
+    listed[0]["title"] = "changed"
+
+    detailed = feed.posts(include_sections=True, now=T0)
+    assert detailed[0]["content_sections"] == [{"body": "a"}]
+    assert "title" not in detailed[0]
+    detailed[0]["content_sections"].append("x")
+    assert feed.post("post-a", now=T0)["content_sections"] == [{"body": "a"}]
+
+
+def test_patch_updates_counters_in_place():
+    feed = BulletinFeed(Snapshot([_post("a", "published", published_at=_at(0), like_count=1)]), _parse)
+    feed.posts(now=T0)
+    feed.patch("a", like_count=2)
+    assert feed.posts(now=T0)[0]["like_count"] == 2
+    assert feed.post(None) is None
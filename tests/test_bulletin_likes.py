@@ -0,0 +1,56 @@
+import pytest
+from postgrest.exceptions import APIError
+
+import app
+from tests.supabase_stub import StubSupabase, bulletin_toggle_like
+
+
+@pytest.fixture
+def client(monkeypatch):
+    stub = StubSupabase(
+        {"bulletin_posts": [{"id": "p1", "like_count": 4}], "bulletin_post_likes": [
+            {"post_id": "p1", "trainer_username": "misty"},
+        ]},
+        {app.BULLETIN_LIKE_RPC: bulletin_toggle_like},
+    )
+    monkeypatch.setattr(app, "supabase", stub)
+    return stub
+
+
+def test_like_then_unlike_through_the_rpc(client):
+    assert app.toggle_bulletin_like("p1", "ash") == (True, 5)
+    assert app.toggle_bulletin_like("p1", "ash") == (False, 4)
+    assert client.tables["bulletin_post_likes"] == [{"post_id": "p1", "trainer_username": "misty"}]
+    # One round trip per toggle, no table calls.
+    assert [call[0] for call in client.calls] == [f"rpc:{app.BULLETIN_LIKE_RPC}"] * 2
+
+
+@pytest.mark.parametrize("code", ["PGRST202", "42883"])
+def test_missing_rpc_falls_back_to_table_calls(client, code):
+    def missing(*_args, **_kwargs):
+        raise APIError({"code": code, "message": "function does not exist"})
+
+    client.rpcs[app.BULLETIN_LIKE_RPC] = missing
+    assert app.toggle_bulletin_like("p1", "ash") == (True, 2)
+    assert app.toggle_bulletin_like("p1", "ash") == (False, 1)
+    assert client.tables["bulletin_posts"][0]["like_count"] == 1
+    assert client.calls_to("bulletin_post_likes", "insert")
+
+
+def test_unregistered_rpc_is_reported_as_missing(client):
+    del client.rpcs[app.BULLETIN_LIKE_RPC]
+    assert app.toggle_bulletin_like("p1", "ash") == (True, 2)
+
+
+@pytest.mark.parametrize("error", [
+    APIError({"code": "57014", "message": "canceling statement due to statement timeout"}),
+    TimeoutError("read timed out"),
+])
+def test_other_rpc_errors_are_raised_without_touching_the_tables(client, error):
+    def broken(*_args, **_kwargs):
+        raise error
+
+    client.rpcs[app.BULLETIN_LIKE_RPC] = broken
+    with pytest.raises(type(error)):
+        app.toggle_bulletin_like("p1", "ash")
+    assert not [call for call in client.calls if call[0] == "bulletin_post_likes"]
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from rdab.cache import CircuitBreaker, CircuitOpenError, StaleWhileRevalidateCache, TTLCache
+
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.allow()
+        breaker.record_failure()
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is None
+
+
+def test_breaker_opens_then_probe_success_closes():
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_seconds=0)
+    _open(breaker)
+    breaker.allow()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.allow()
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_seconds=0.05)
+    _open(breaker)
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_breaker_lost_probe_times_out():
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=0, probe_timeout=0.05)
+    _open(breaker)
+    breaker.allow()  # probe that never reports back
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    time.sleep(0.06)
+    breaker.allow()  # a fresh probe is let through
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_swr_serves_stale_and_refreshes_in_background():
+    cache = StaleWhileRevalidateCache(ttl=0.05)
+    assert cache.get("k", lambda: 1) == 1
+    time.sleep(0.06)
+    done = threading.Event()
+
+    def loader():
+        done.set()
+        return 2
+
+    assert cache.get("k", loader) == 1
+    assert done.wait(1)
+    _wait_for(lambda: cache.get("k", lambda: 3) == 2)
+
+
+def test_swr_failed_refresh_keeps_stale_value_and_backs_off():
+    cache = StaleWhileRevalidateCache(ttl=0.05)
+    cache.get("k", lambda: "good")
+    time.sleep(0.06)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError("down")
+
+    assert cache.get("k", failing) == "good"
+    _wait_for(lambda: cache.stats()["refreshing"] == 0)
+    assert cache.get("k", failing) == "good"
+    assert cache.stats()["refreshing"] == 0
+    assert len(calls) == 1
+    assert cache.stats()["refresh_failures"] == 1
+
+
+def test_swr_cold_miss_failure_raises():
+    cache = StaleWhileRevalidateCache(ttl=60)
+    with pytest.raises(RuntimeError):
+        cache.get("k", lambda: (_ for _ in ()).throw(RuntimeError("down")))
+
+
+@pytest.mark.parametrize("predicate", [None, lambda key: key[0] == "events"])
+def test_swr_refresh_started_before_invalidate_is_discarded(predicate):
+    cache = StaleWhileRevalidateCache(ttl=0.05)
+    key = ("events", "upcoming")
+    cache.get(key, lambda: "v1")
+    time.sleep(0.06)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(1)
+        return "pre-write"
+
+    assert cache.get(key, slow_loader) == "v1"
+    assert started.wait(1)
+    cache.invalidate(predicate)  # a write lands while the refresh is in flight
+    release.set()
+    _wait_for(lambda: cache.stats()["refreshing"] == 0)
+    assert cache.get(key, lambda: "post-write") == "post-write"
+
+
+def test_swr_cold_load_started_before_invalidate_is_not_stored():
+    cache = StaleWhileRevalidateCache(ttl=60)
+    key = ("meetups",)
+
+    def loader():
+        cache.invalidate(lambda k: k == key)
+        return "pre-write"
+
+    assert cache.get(key, loader) == "pre-write"
+    assert cache.get(key, lambda: "post-write") == "post-write"
+
+
+def _wait_for(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return
+        time.sleep(0.005)
+    raise AssertionError("condition not met")
@@ -0,0 +1,95 @@
+import threading
+import time
+
+from rdab.event_catalog import EventCatalog, normalize_event_name
+
+
+class Loader:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+ROWS = [
+    {"event_id": "A1", "name": "Community Day", "start_time": "2024-01-01", "cover_photo_url": "old.png"},
+    {"event_id": "B2", "name": "Community  Day", "start_time": "2024-06-01", "cover_photo_url": "new.png"},
+]
+
+
+def test_lookups_prefer_newest_event_by_name():
+    catalog = EventCatalog(Loader(ROWS))
+    assert catalog.cover_for_id(" a1 ") == "old.png"
+    assert catalog.cover_for_name("community day") == "new.png"
+    assert catalog.find_by_name("Community")["event_id"] == "B2"
+    assert normalize_event_name("  Big   Event ") == "big event"
+
+
+def test_failed_reload_keeps_snapshot_and_backs_off():
+    loader = Loader(ROWS, None)
+    catalog = EventCatalog(loader, ttl=0, retry_seconds=60)
+    assert len(catalog.rows()) == 2
+
+    assert len(catalog.rows()) == 2
+    assert len(catalog.rows()) == 2
+    assert loader.calls == 2
+
+
+def test_invalidate_serves_last_good_catalog_while_loader_fails():
+    loader = Loader(ROWS, RuntimeError("supabase down"))
+    catalog = EventCatalog(loader, ttl=300, retry_seconds=60)
+    catalog.rows()
+
+    catalog.invalidate()
+    for _ in range(5):
+        assert catalog.cover_for_id("a1") == "old.png"
+    assert loader.calls == 2
+
+
+def test_invalidate_reloads_once_the_loader_recovers():
+    loader = Loader(ROWS, [{"event_id": "C3", "name": "Raid Hour"}])
+    catalog = EventCatalog(loader, ttl=300)
+    catalog.rows()
+
+    catalog.invalidate()
+    assert [row["event_id"] for row in catalog.rows()] == ["C3"]
+    assert catalog.get("a1") is None
+
+
+def test_cold_start_failure_backs_off_instead_of_retrying_every_call():
+    loader = Loader(None)
+    catalog = EventCatalog(loader, retry_seconds=60)
+    for _ in range(3):
+        assert catalog.rows() == []
+    assert loader.calls == 1
+
+
+def test_background_refresh_serves_stale_snapshot_without_blocking():
+    release = threading.Event()
+    first = [True]
+
+    def loader():
+        if first[0]:
+            first[0] = False
+            return ROWS
+        release.wait(5)
+        return ROWS[:1]
+
+    catalog = EventCatalog(loader, ttl=300, background=True)
+    catalog.rows()
+    catalog.invalidate()
+
+    started = time.monotonic()
+    assert len(catalog.rows()) == 2
+    assert time.monotonic() - started < 1
+    release.set()
+    deadline = time.monotonic() + 5
+    while len(catalog.rows()) != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(catalog.rows()) == 1
@@ -0,0 +1,85 @@
+import httpx
+import pytest
+import requests
+
+from rdab.cache import CircuitBreaker
+from rdab.http_transport import CallPolicy, HttpTransport, request_not_sent
+
+
+def test_connection_failures_before_sending_are_not_sent():
+    assert request_not_sent(requests.ConnectTimeout("connect timed out"))
+    assert request_not_sent(httpx.ConnectError("refused"))
+    assert request_not_sent(httpx.ConnectTimeout("connect timed out"))
+    assert request_not_sent(httpx.PoolTimeout("no free connection"))
+
+
+def test_errors_after_sending_may_have_run():
+    # The server may have committed before the response was lost.
+    assert not request_not_sent(httpx.ReadTimeout("read timed out"))
+    assert not request_not_sent(httpx.RemoteProtocolError("server disconnected"))
+    assert not request_not_sent(requests.ReadTimeout("read timed out"))
+    assert not request_not_sent(requests.ConnectionError("connection aborted"))
+    assert not request_not_sent(RuntimeError("boom"))
+
+
+def _guarded_transport(breaker):
+    transport = HttpTransport(policies={"api": CallPolicy(retries=0)}, backoff_base=0)
+    transport.add_guard(lambda site, method, url: breaker.allow())
+
+    def track(call):
+        if call.error is not None or (call.status or 0) >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    transport.add_observer(track)
+    return transport
+
+
+@pytest.mark.parametrize(
+    "error",
+    [requests.exceptions.ChunkedEncodingError("truncated"), ValueError("adapter bug")],
+)
+def test_requests_probe_failing_with_unlisted_error_still_reports(monkeypatch, error):
+    breaker = CircuitBreaker("api", failure_threshold=1, reset_seconds=0)
+    transport = _guarded_transport(breaker)
+    breaker.record_failure()  # open
+
+    def fail(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(transport.session, "request", fail)
+    with pytest.raises(type(error)):
+        transport.get("https://example.test/", site="api")
+
+    # The failed probe re-opened the circuit instead of leaving it wedged.
+    response = requests.Response()
+    response.status_code = 200
+    response.request = requests.Request("GET", "https://example.test/").prepare()
+    monkeypatch.setattr(transport.session, "request", lambda *a, **k: response)
+    assert transport.get("https://example.test/", site="api") is response
+    assert breaker.state == "closed"
+
+
+@pytest.mark.parametrize(
+    "error",
+    [httpx.ReadError("reset"), httpx.WriteError("broken pipe"), httpx.PoolTimeout("pool"), KeyError("x")],
+)
+def test_httpx_probe_failing_with_unlisted_error_still_reports(monkeypatch, error):
+    breaker = CircuitBreaker("api", failure_threshold=1, reset_seconds=0)
+    transport = _guarded_transport(breaker)
+    breaker.record_failure()
+    outcome = {"error": error}
+
+    def handle(self, request):
+        if outcome["error"] is not None:
+            raise outcome["error"]
+        return httpx.Response(200, request=request)
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", handle)
+    client = transport.httpx_client(site="api")
+    with pytest.raises(type(error)):
+        client.get("https://example.test/")
+    outcome["error"] = None
+    assert client.get("https://example.test/").status_code == 200
+    assert breaker.state == "closed"
@@ -0,0 +1,99 @@
+import pytest
+from postgrest.exceptions import APIError
+
+import app
+from tests.supabase_stub import StubSupabase
+
+NOTIFICATIONS = [
+    {"id": "n1", "read_by": None, "metadata": {}},
+    {"id": "n2", "read_by": ["ash"], "metadata": {}},
+    {"id": "n3", "read_by": None, "metadata": {}},
+]
+REDEMPTIONS = [
+    {"id": "r1", "trainer_username": "Ash", "metadata": {}},
+    {"id": "r2", "trainer_username": "Misty", "metadata": {}},
+]
+SELECTED = ["n1", "n2", "n3", "missing", "rec:r1", "rec:r2"]
+
+
+def _bulk_state(client, p_notifications, p_redemptions):
+    for table, rows in (("notifications", p_notifications), ("redemptions", p_redemptions)):
+        for row in rows:
+            target = next(r for r in client.tables[table] if r["id"] == row["id"])
+            target.update({key: value for key, value in row.items() if key != "id"})
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    client = StubSupabase({"notifications": NOTIFICATIONS, "redemptions": REDEMPTIONS},
+                          {app.INBOX_BULK_RPC: _bulk_state})
+    monkeypatch.setattr(app, "supabase", client)
+    monkeypatch.setattr(app, "USE_NOTIFICATION_RECEIPTS", False)
+    return client
+
+
+def _post(trainer_client, action, ids=SELECTED):
+    resp = trainer_client.post("/api/inbox/bulk", json={"action": action, "message_ids": ids})
+    assert resp.status_code == 200
+    return {row["id"]: row["success"] for row in resp.get_json()["results"]}
+
+
+def test_one_fetch_per_table_and_one_batched_write(trainer_client, stub):
+    results = _post(trainer_client, "read")
+    assert results == {"n1": True, "n2": True, "n3": True, "missing": False, "rec:r1": True, "rec:r2": False}
+    assert len(stub.calls_to("notifications", "select")) == 1
+    assert len(stub.calls_to("redemptions", "select")) == 1
+    assert len(stub.calls_to(f"rpc:{app.INBOX_BULK_RPC}")) == 1
+    assert not stub.calls_to("notifications", "update") and not stub.calls_to("redemptions", "update")
+    assert [row["read_by"] for row in stub.tables["notifications"]] == [["ash"], ["ash"], ["ash"]]
+    assert stub.tables["redemptions"][0]["metadata"]["read_by"] == ["ash"]
+    assert stub.tables["redemptions"][1]["metadata"] == {}
+
+
+def test_unchanged_rows_are_not_written(trainer_client, stub):
+    _post(trainer_client, "read", ["n2"])
+    assert not stub.calls_to(f"rpc:{app.INBOX_BULK_RPC}")
+
+
+def test_missing_rpc_falls_back_to_one_update_per_changed_row(trainer_client, stub):
+    del stub.rpcs[app.INBOX_BULK_RPC]
+    results = _post(trainer_client, "delete")
+    assert results["n1"] and results["rec:r1"] and not results["rec:r2"]
+    assert len(stub.calls_to("notifications", "select")) == 1
+    assert len(stub.calls_to("notifications", "update")) == 3
+    assert len(stub.calls_to("redemptions", "update")) == 1
+    assert all(row["metadata"]["hidden_for"] == ["ash"] for row in stub.tables["notifications"])
+
+
+def test_receipts_mode_uses_one_upsert(trainer_client, stub, monkeypatch):
+    monkeypatch.setattr(app, "USE_NOTIFICATION_RECEIPTS", True)
+    results = _post(trainer_client, "read", ["n1", "n3", "missing"])
+    assert results == {"n1": True, "n3": True, "missing": False}
+    assert len(stub.calls_to("notifications", "select")) == 1
+    assert len(stub.calls_to(app.NOTIFICATION_RECEIPTS_TABLE, "select")) == 1
+    assert len(stub.calls_to(app.NOTIFICATION_RECEIPTS_TABLE, "upsert")) == 1
+    assert sorted(row["notification_id"] for row in stub.tables[app.NOTIFICATION_RECEIPTS_TABLE]) == ["n1", "n3"]
+
+
+def test_failed_batch_fetch_retries_per_message(trainer_client, stub, monkeypatch):
+    original = stub.table
+
+    def table(name):
+        query = original(name)
+        in_ = query.in_
+
+        def failing_in(column, values):
+            raise APIError({"code": "22P02", "message": "invalid input syntax for type uuid"})
+
+        query.in_ = failing_in if name == "notifications" else in_
+        return query
+
+    monkeypatch.setattr(stub, "table", table)
+    results = _post(trainer_client, "read", ["n1", "missing"])
+    assert results == {"n1": True, "missing": False}
+    assert stub.tables["notifications"][0]["read_by"] == ["ash"]
+
+
+def test_invalid_requests_are_rejected(trainer_client):
+    assert trainer_client.post("/api/inbox/bulk", json={"action": "archive", "message_ids": ["n1"]}).status_code == 400
+    assert trainer_client.post("/api/inbox/bulk", json={"action": "read", "message_ids": []}).status_code == 400
@@ -0,0 +1,83 @@
+import itertools
+
+import pytest
+
+from rdab.inbox_feed import compare_keys, decode_cursor, encode_cursor, keyset_condition, merge_sorted, pg_quote
+from tests.logic_tree import matches, parse
+
+
+# type is nullable and leads; id is unique and never null.
+ROWS = [
+    {"type": kind, "sent_at": sent, "id": f"{index:03d}"}
+    for index, (kind, sent, _) in enumerate(
+        itertools.product([None, "event", "stamp"], ["2024-01", "2024-02"], range(2))
+    )
+]
+
+
+@pytest.mark.parametrize("descending", list(itertools.product([False, True], repeat=3)))
+@pytest.mark.parametrize("inclusive", [False, True])
+def test_keyset_condition_selects_exactly_the_rows_after_the_cursor(descending, inclusive):
+    columns = ("type", "sent_at", "id")
+    for cursor in ROWS:
+        keys = [(column, cursor[column], desc) for column, desc in zip(columns, descending)]
+        tree = parse(keyset_condition(keys, inclusive=inclusive))
+        cursor_key = [cursor[column] for column in columns]
+        for row in ROWS:
+            position = compare_keys([row[column] for column in columns], cursor_key, descending)
+            expected = position > 0 or (inclusive and position == 0)
+            assert matches(tree, row) == expected, (keys, row)
+
+
+def test_paging_with_the_condition_visits_every_row_once():
+    descending = (False, True, True)
+    columns = ("type", "sent_at", "id")
+
+    def key(row):
+        return [row[column] for column in columns]
+
+    seen, cursor = [], None
+    while True:
+        remaining = ROWS
+        if cursor is not None:
+            tree = parse(keyset_condition([(c, v, d) for c, v, d in zip(columns, cursor, descending)]))
+            remaining = [row for row in ROWS if matches(tree, row)]
+        page = merge_sorted(remaining, key, descending, 4)
+        if not page:
+            break
+        seen.extend(row["id"] for row in page)
+        cursor = decode_cursor(encode_cursor(key(page[-1])))
+    assert sorted(seen) == sorted(row["id"] for row in ROWS)
+    assert len(seen) == len(set(seen))
+
+
+def test_pg_quote_escapes_quotes_and_backslashes():
+    assert pg_quote('a"b\\c') == '"a\\"b\\\\c"'
+    tree = parse(keyset_condition([("id", 'x,"y)\\', False)]))
+    assert tree == ("cmp", ("id", False, "gt", 'x,"y)\\'))
+
+
+def test_cursor_round_trip_without_padding():
+    values = ["2024-05-01T10:00:00+00:00", 1, "é", None]
+    token = encode_cursor(values)
+    assert "=" not in token
+    assert decode_cursor(token) == values
+
+
+@pytest.mark.parametrize("token", [None, "", "!!!", encode_cursor([1])[:-2] + "@@", "eyJhIjoxfQ"])
+def test_garbled_or_non_list_cursor_decodes_to_none(token):
+    # "eyJhIjoxfQ" is {"a":1}: valid JSON, but not a cursor.
+    assert decode_cursor(token) is None
+
+
+def test_compare_keys_orders_nulls_first_ascending_and_last_descending():
+    assert compare_keys([None], ["a"], [False]) < 0
+    assert compare_keys([None], ["a"], [True]) > 0
+    assert compare_keys(["a", 2], ["a", 1], [False, True]) < 0
+    assert compare_keys([1, 1], [1, 1], [False, False]) == 0
+
+
+def test_merge_sorted_interleaves_sources_and_limits():
+    rows = [{"t": 3, "s": 0}, {"t": 1, "s": 1}, {"t": 2, "s": 0}, {"t": 3, "s": 1}]
+    merged = merge_sorted(rows, lambda r: [r["t"], r["s"]], [True, False], 3)
+    assert [(r["t"], r["s"]) for r in merged] == [(3, 0), (3, 1), (2, 0)]
@@ -0,0 +1,54 @@
+import pytest
+
+import app
+from tests.logic_tree import select
+
+
+def _notification(row_id, *, read_by=None, hidden_for=None, audience="ALL"):
+    metadata = {"hidden_for": hidden_for} if hidden_for is not None else {}
+    return {"id": row_id, "audience": audience, "read_by": read_by, "metadata": metadata}
+
+
+@pytest.fixture(autouse=True)
+def legacy_arrays(monkeypatch):
+    monkeypatch.setattr(app, "USE_NOTIFICATION_RECEIPTS", False)
+
+
+def test_lists_are_written_with_one_normalized_key():
+    assert app._append_username(["Misty", "ASH"], "Ash ") == ["misty", "ash"]
+    assert app._append_username([], "Brock") == ["brock"]
+    assert app._remove_username(["Ash", "misty"], "aSH") == ["misty"]
+
+
+@pytest.mark.parametrize("session_name", ["Ash", "ash", "ASH"])
+def test_read_and_hidden_state_written_under_one_casing_is_seen_under_another(session_name):
+    rows = [_notification("n1"), _notification("n2"), _notification("n3")]
+    for row_id, action in (("n1", "read"), ("n2", "delete")):
+        row = next(r for r in rows if r["id"] == row_id)
+        row.update(app._inbox_action_update(row, "aSh", action))
+
+    visible = select(f"and({','.join(app._notification_state_conditions(session_name))})", rows)
+    assert [row["id"] for row in visible] == ["n1", "n3"]
+    unread = select(f"and({','.join(app._notification_state_conditions(session_name, read=False))})", rows)
+    assert [row["id"] for row in unread] == ["n3"]
+    read = select(f"and({','.join(app._notification_state_conditions(session_name, read=True))})", rows)
+    assert [row["id"] for row in read] == ["n1"]
+
+
+def test_rows_written_before_normalization_still_match_the_typed_name():
+    rows = [_notification("n1", read_by=["Ash"]), _notification("n2", hidden_for=["Ash"]), _notification("n3")]
+    unread = select(f"and({','.join(app._notification_state_conditions('Ash', read=False))})", rows)
+    assert [row["id"] for row in unread] == ["n3"]
+
+
+def test_actions_heal_legacy_casing_without_counting_a_state_change():
+    row = _notification("n1", read_by=["ASH"])
+    assert app._inbox_action_update(row, "Ash", "read")["read_by"] == ["ash"]
+    assert app._inbox_read_change(row, "Ash", "read") == 0
+    assert app._inbox_action_update(_notification("n2", read_by=["ash"]), "Ash", "read") is None
+    assert app._inbox_read_change(_notification("n3"), "Ash", "read") == 1
+
+
+def test_hidden_check_ignores_case():
+    assert app._message_is_hidden({"metadata": {"hidden_for": ["ash"]}}, "ASH")
+    assert not app._message_is_hidden({"metadata": {"hidden_for": ["misty"]}}, "ASH")
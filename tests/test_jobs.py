@@ -0,0 +1,152 @@
+import threading
+import time
+from contextlib import closing, contextmanager
+
+import pytest
+
+from rdab.jobs import JobFailed, JobQueue, RetryJob
+
+
+@pytest.fixture
+def queue(tmp_path):
+    # workers=0: nothing runs in the background, tests drive _claim/_run.
+    return JobQueue(tmp_path / "jobs.db", workers=0, lease_seconds=1, backoff_seconds=0)
+
+
+def _set(queue, job_id, **fields):
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    with closing(queue._connect()) as conn:
+        conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+
+def test_claim_takes_each_job_once(queue):
+    queue.register("noop", lambda payload: payload)
+    job_id = queue.enqueue("noop", {"n": 1})
+
+    row = queue._claim()
+    assert row["id"] == job_id
+    assert row["status"] == "running"
+    assert row["attempts"] == 1
+    assert row["lease_until"] > time.time()
+    assert queue._claim() is None
+
+
+def test_expired_lease_is_reclaimed_as_a_new_attempt(queue):
+    queue.register("noop", lambda payload: payload, max_attempts=2)
+    job_id = queue.enqueue("noop", {})
+    queue._claim()
+    _set(queue, job_id, lease_until=time.time() - 1)
+
+    row = queue._claim()
+    assert row["id"] == job_id
+    assert row["attempts"] == 2
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(queue):
+    queue.register("noop", lambda payload: payload)
+    job_id = queue.enqueue("noop", {})
+    queue._claim()
+    _set(queue, job_id, lease_until=time.time() - 1)
+
+    assert queue._claim() is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "Worker stopped before the job finished."
+
+
+def test_lease_is_renewed_while_a_slow_handler_runs(queue):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(payload):
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    queue.register("slow", slow, max_attempts=3)
+    job_id = queue.enqueue("slow", {})
+    runner = threading.Thread(target=queue._run, args=(queue._claim(),))
+    runner.start()
+    started.wait(5)
+    try:
+        # Well past the one-second lease: nobody else may claim the job.
+        deadline = time.time() + 2.5
+        while time.time() < deadline:
+            assert queue._claim() is None
+            time.sleep(0.2)
+    finally:
+        release.set()
+        runner.join(5)
+
+    job = queue.get(job_id)
+    assert job["status"] == "done"
+    assert job["attempts"] == 1
+    assert job["result"] == "ok"
+
+
+def test_run_that_lost_its_lease_does_not_overwrite_the_new_run(queue):
+    queue.register("noop", lambda payload: "stale")
+    job_id = queue.enqueue("noop", {})
+    row = queue._claim()
+    # Another worker reclaimed the job after this one stalled.
+    _set(queue, job_id, attempts=2, result='"fresh"')
+
+    queue._run(row)
+    job = queue.get(job_id)
+    assert job["status"] == "running"
+    assert job["result"] == "fresh"
+
+
+def test_retry_job_requeues_with_narrowed_payload(queue):
+    def flaky(payload):
+        raise RetryJob("partial", {"left": [2]})
+
+    queue.register("flaky", flaky, max_attempts=2)
+    job_id = queue.enqueue("flaky", {"left": [1, 2]})
+    queue._run(queue._claim())
+
+    job = queue.get(job_id)
+    assert job["status"] == "queued"
+    assert job["payload"] == {"left": [2]}
+    assert job["error"] == "partial"
+
+    queue._run(queue._claim())
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 2
+
+
+def test_job_failed_is_not_retried(queue):
+    def refuse(payload):
+        raise JobFailed("nope", {"ok": False})
+
+    queue.register("refuse", refuse, max_attempts=3)
+    job_id = queue.enqueue("refuse", {})
+    queue._run(queue._claim())
+
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["result"] == {"ok": False}
+    assert queue._claim() is None
+
+
+def test_handler_runs_inside_the_context_factory(tmp_path):
+    entered = []
+
+    @contextmanager
+    def context():
+        entered.append("in")
+        yield
+        entered.append("out")
+
+    queue = JobQueue(tmp_path / "jobs.db", workers=0, context_factory=context)
+    queue.register("noop", lambda payload: entered.append("run"))
+    queue.enqueue("noop", {})
+    queue._run(queue._claim())
+    assert entered == ["in", "run", "out"]
+
+
+def test_unique_enqueue_reuses_queued_job(queue):
+    queue.register("noop", lambda payload: payload)
+    first = queue.enqueue("noop", {}, unique=True)
+    assert queue.enqueue("noop", {}, unique=True) == first
+    assert queue.counts()["queued"] == 1
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app
+
+START = datetime(2030, 6, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def _event(event_id, days, name="Raid Hour", **fields):
+    start = START + timedelta(days=days)
+    return {"event_id": event_id, "name": name, "start": start, "end": start + timedelta(hours=2),
+            "location": "", "campfire_url": "", **fields}
+
+
+@pytest.fixture
+def events(monkeypatch):
+    upcoming = [
+        _event("e1", 0, "Raid Hour, Park; Lake\\Side", location="Line one\r\nLine two\rthree"),
+        _event("e2", 7, "Community Day " + "é" * 60, campfire_url="https://cmpf.re/e2"),
+    ]
+    monkeypatch.setattr(app, "fetch_upcoming_events", lambda limit=None: list(upcoming))
+    app._MEETUPS_ICS_FEEDS.clear()
+    yield upcoming
+    app._MEETUPS_ICS_FEEDS.clear()
+
+
+def _unfold(body):
+    return body.replace("\r\n ", "")
+
+
+def test_text_values_are_escaped():
+    assert app._ics_escape("a,b;c\\d\r\ne\rf\ng") == "a\\,b\\;c\\\\d\\ne\\nf\\ng"
+    assert app._ics_escape(None) == ""
+
+
+@pytest.mark.parametrize("line", ["SUMMARY:" + "x" * 200, "SUMMARY:" + "é" * 90, "SUMMARY:" + "a🎉" * 40])
+def test_long_lines_fold_at_75_octets_on_character_boundaries(line):
+    folded = app._ics_fold(line)
+    physical = folded.split("\r\n")
+    assert all(len(part.encode("utf-8")) <= 75 for part in physical)
+    assert all(part.startswith(" ") for part in physical[1:])
+    assert _unfold(folded) == line
+
+
+def test_short_lines_are_untouched():
+    assert app._ics_fold("SUMMARY:" + "x" * 67) == "SUMMARY:" + "x" * 67
+
+
+def test_feed_lists_every_event_with_escaped_folded_text(client, events):
+    resp = client.get("/meetups.ics")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/calendar"
+    body = resp.get_data(as_text=True)
+    assert all(len(line.encode("utf-8")) <= 75 for line in body.split("\r\n"))
+    text = _unfold(body)
+    assert "SUMMARY:Raid Hour\\, Park\\; Lake\\\\Side" in text
+    assert "LOCATION:Line one\\nLine two\\nthree" in text
+    assert "UID:e2@rdab.app" in text and "URL:https://cmpf.re/e2" in text
+    assert text.count("BEGIN:VEVENT") == 2
+
+
+def test_unchanged_events_answer_304_with_a_stable_etag(client, events):
+    first = client.get("/meetups.ics")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert client.get("/meetups.ics", headers={"If-None-Match": etag}).status_code == 304
+
+    # Another worker (empty feed cache) hands out the same validator.
+    app._MEETUPS_ICS_FEEDS.clear()
+    assert client.get("/meetups.ics").headers["ETag"] == etag
+
+    events.append(_event("e3", 14))
+    changed = client.get("/meetups.ics", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_since_narrows_the_window(client, events):
+    text = client.get("/meetups.ics", query_string={"since": "2030-06-03"}).get_data(as_text=True)
+    assert "UID:e1@" not in text and "UID:e2@" in text
+    # A naive value is London time: 10:00 BST is 09:00 UTC, so e1 still counts.
+    text = client.get("/meetups.ics", query_string={"since": "2030-06-01T10:00"}).get_data(as_text=True)
+    assert "UID:e1@" in text
+
+
+@pytest.mark.parametrize("since", ["yesterday", "2030-13-01", "99999999999999999999"])
+def test_bad_since_is_a_400(client, events, since):
+    resp = client.get("/meetups.ics", query_string={"since": since})
+    assert resp.status_code == 400
+    assert "since" in resp.get_json()["error"]
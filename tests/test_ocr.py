@@ -0,0 +1,76 @@
+import importlib.util
+import json
+import os
+import stat
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from rdab.ocr import MAX_LINE_HEIGHT, OcrEngine, OcrError, extract_trainer_name, preprocess_trainer_name
+
+ROOT = Path(__file__).resolve().parent.parent
+_spec = importlib.util.spec_from_file_location("benchmark_ocr", ROOT / "scripts" / "benchmark_ocr.py")
+benchmark_ocr = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(benchmark_ocr)
+CORPUS = json.loads((ROOT / "benchmarks" / "ocr" / "corpus.json").read_text(encoding="utf-8"))["samples"]
+
+
+def _fake_tesseract(tmp_path, body):
+    script = tmp_path / "tesseract"
+    script.write_text(f"#!{sys.executable}\nimport sys, time\nsys.stdin.buffer.read()\n{body}\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+@pytest.mark.parametrize("sample", CORPUS, ids=lambda sample: sample.get("id") or sample["path"])
+def test_preprocessing_keeps_only_the_name_line(sample):
+    region = preprocess_trainer_name(benchmark_ocr.load_sample(sample))
+    assert region.mode == "L"
+    assert region.height <= MAX_LINE_HEIGHT * 1.5 + 1
+    # Exactly one run of inked rows: the buddy line below must be cropped away.
+    data = region.tobytes()
+    inked = [data[y * region.width:(y + 1) * region.width].count(0) > 0 for y in range(region.height)]
+    runs = sum(1 for y, ink in enumerate(inked) if ink and (y == 0 or not inked[y - 1]))
+    assert runs == 1
+
+
+def test_engine_returns_first_line(tmp_path):
+    engine = OcrEngine(cmd=_fake_tesseract(tmp_path, "print('  TylaeTheTrainer  ')\nprint('& Groudon100')"))
+    image = Image.new("RGB", (400, 800), "white")
+    assert engine.read_trainer_name(image).text == "TylaeTheTrainer"
+    assert engine.stats()["calls"] == 1
+
+
+def test_engine_reports_tesseract_errors(tmp_path):
+    engine = OcrEngine(cmd=_fake_tesseract(tmp_path, "sys.stderr.write('bad image')\nsys.exit(1)"))
+    with pytest.raises(OcrError, match="bad image"):
+        engine.read_trainer_name(Image.new("RGB", (400, 800), "white"))
+    assert engine.stats()["failures"] == 1
+    assert extract_trainer_name(Image.new("RGB", (400, 800), "white"), engine) is None
+
+
+def test_engine_kills_slow_runs(tmp_path):
+    engine = OcrEngine(cmd=_fake_tesseract(tmp_path, "time.sleep(5)"), timeout=0.5)
+    with pytest.raises(OcrError, match="timed out"):
+        engine.image_to_text(Image.new("L", (10, 10)))
+
+
+def test_engine_missing_binary():
+    engine = OcrEngine(cmd=os.path.join("/nonexistent", "tesseract"))
+    with pytest.raises(OcrError, match="could not start"):
+        engine.image_to_text(Image.new("L", (10, 10)))
+
+
+def test_engine_rejects_callers_when_every_slot_is_busy(tmp_path):
+    engine = OcrEngine(cmd=_fake_tesseract(tmp_path, "time.sleep(1)"), max_concurrency=1, queue_timeout=0.1)
+    worker = threading.Thread(target=lambda: engine.image_to_text(Image.new("L", (10, 10))))
+    worker.start()
+    try:
+        threading.Event().wait(0.3)
+        with pytest.raises(OcrError, match="busy"):
+            engine.image_to_text(Image.new("L", (10, 10)))
+    finally:
+        worker.join()
@@ -0,0 +1,83 @@
+import pytest
+
+import app
+from tests.supabase_stub import StubSupabase
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    client = StubSupabase({
+        "lugia_ledger": [
+            {"id": 1, "trainer": "Ash", "reason": "Community Day", "count": 2, "created_at": "2024-01-01T10:00:00+00:00"},
+            {"id": 2, "trainer": "Ash", "reason": "Raid Hour", "count": 1, "created_at": "2024-02-01T10:00:00+00:00"},
+            {"id": 3, "trainer": "Ash", "reason": "Correction", "count": -1, "created_at": "2024-03-01T10:00:00+00:00"},
+        ],
+        "events": [],
+    })
+    monkeypatch.setattr(app, "supabase", client)
+    monkeypatch.setattr(app, "USE_SUPABASE", True)
+    app.PASSPORT_PROJECTIONS.clear()
+    with app.app.test_request_context():
+        yield client
+    app.PASSPORT_PROJECTIONS.clear()
+
+
+def test_cached_view_costs_one_count_query(ledger):
+    total, stamps, _ = app.get_passport_stamps("Ash")
+    assert total == 3
+    assert [stamp["name"] for stamp in stamps] == ["Raid Hour", "Community Day"]
+    reads = len(ledger.calls_to("lugia_ledger"))
+
+    assert app.get_passport_stamps("ash")[0] == 3
+    assert len(ledger.calls_to("lugia_ledger")) == reads + 1
+    assert app.PASSPORT_PROJECTIONS.get("ash")["rows"] == 3
+
+
+def test_entries_written_here_are_folded_in_without_a_reload(ledger):
+    app.get_passport_stamps("Ash")
+    for record in ({"id": 4, "trainer": "Ash", "reason": "Spotlight Hour", "count": 1},
+                   {"id": 5, "trainer": "Ash", "reason": "Correction", "count": -1}):
+        ledger.tables["lugia_ledger"].append(record)
+        app.record_passport_ledger_entry("ASH", record)
+    reads = len(ledger.calls_to("lugia_ledger"))
+
+    total, stamps, _ = app.get_passport_stamps("Ash")
+    assert total == 4
+    assert stamps[0]["name"] == "Spotlight Hour"
+    assert len(ledger.calls_to("lugia_ledger")) == reads + 1  # just the count check
+
+
+def test_rows_written_by_another_worker_trigger_a_reload(ledger):
+    app.get_passport_stamps("Ash")
+    ledger.tables["lugia_ledger"].append({
+        "id": 4, "trainer": "ash", "reason": "Spotlight Hour", "count": 3, "created_at": "2024-04-01T10:00:00+00:00",
+    })
+
+    total, stamps, _ = app.get_passport_stamps("Ash")
+    assert total == 6
+    assert stamps[0]["name"] == "Spotlight Hour"
+
+
+def test_failed_count_serves_the_cached_projection(ledger):
+    app.get_passport_stamps("Ash")
+    ledger.failures["lugia_ledger"] = RuntimeError("statement timeout")
+    assert app.get_passport_stamps("Ash")[0] == 3
+
+
+def test_invalidate_drops_the_projection_under_any_casing(ledger):
+    app.get_passport_stamps("Ash")
+    app.invalidate_passport_projection(" ASH ")
+    assert app.PASSPORT_PROJECTIONS.get("ash") is None
+
+
+def test_writes_outside_a_request_drop_the_projection(ledger, monkeypatch):
+    app.get_passport_stamps("Ash")
+    monkeypatch.setattr(app, "has_request_context", lambda: False)
+    app.record_passport_ledger_entry("Ash", {"reason": "Raid Hour", "count": 1})
+    assert app.PASSPORT_PROJECTIONS.get("ash") is None
+
+
+def test_another_campfire_name_reloads(ledger):
+    ledger.tables["lugia_ledger"].append({"id": 4, "trainer": "AshK", "campfire": "ashk", "reason": "Raid Hour", "count": 1})
+    assert app.get_passport_stamps("Ash")[0] == 3
+    assert app.get_passport_stamps("Ash", "AshK")[0] == 4
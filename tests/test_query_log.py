@@ -0,0 +1,53 @@
+from rdab.query_log import QueryLog, describe_postgrest_call
+
+BASE = "https://project.supabase.co"
+
+
+def test_select_with_filters_and_content_range():
+    table, operation, rows, signature = describe_postgrest_call(
+        "GET",
+        f"{BASE}/rest/v1/notifications?select=*&trainer=eq.ash&read=is.false&limit=20",
+        {},
+        {"content-range": "0-19/57"},
+    )
+    assert (table, operation, rows) == ("notifications", "select", 20)
+    assert signature == "select notifications [read,trainer]"
+
+
+def test_operations_by_method_and_prefer_header():
+    url = f"{BASE}/rest/v1/lugia_ledger"
+    assert describe_postgrest_call("POST", url)[1] == "insert"
+    assert describe_postgrest_call("POST", url, {"Prefer": "resolution=merge-duplicates"})[1] == "upsert"
+    assert describe_postgrest_call("PATCH", url + "?id=eq.1")[1] == "update"
+    assert describe_postgrest_call("DELETE", url + "?id=eq.1")[1] == "delete"
+    assert describe_postgrest_call("HEAD", url)[1] == "count"
+
+
+def test_rpc_and_empty_ranges():
+    table, operation, rows, _ = describe_postgrest_call(
+        "POST", f"{BASE}/rest/v1/rpc/bulletin_toggle_like", {}, {"content-range": "*/0"}
+    )
+    assert (table, operation, rows) == ("bulletin_toggle_like", "rpc", 0)
+
+
+def test_non_rest_traffic_is_ignored():
+    assert describe_postgrest_call("GET", f"{BASE}/auth/v1/user") is None
+    assert describe_postgrest_call("POST", f"{BASE}/storage/v1/object/catalog/a.webp") is None
+
+
+def test_log_summaries_and_repeats():
+    log = QueryLog()
+    for _ in range(3):
+        log.record("sheet1", "select", 1, 10.0, 200, "select sheet1 [trainer_username]")
+    log.record("events", "select", 5, 40.0, 200, "select events")
+    assert log.count == 4
+    assert log.by_table() == [("events", 1, 40.0), ("sheet1", 3, 30.0)]
+    assert log.repeated(3) == [("select sheet1 [trainer_username]", 3)]
+    assert log.server_timing().startswith('db;dur=70.0;desc="4 queries", db-events;dur=40.0')
+    assert log.summary_line() == "supabase=4 70.0ms (events×1, sheet1×3)"
+
+
+def test_server_timing_tokens_are_sanitized():
+    log = QueryLog()
+    log.record('odd "table"', "select", None, 1.0, 200, "x")
+    assert 'db-odd__table_;dur=1.0' in log.server_timing()
@@ -0,0 +1,87 @@
+import json
+import os
+
+from rdab.stamp_icons import DEFAULT_RULES_PATH, StampIconRegistry, StampIconResolver
+
+
+def _url(path):
+    return f"/static/{path}"
+
+
+def _if_elif_chain(rules, reason):
+    """The lookup the rule table replaced: exact rules, then the first needle found."""
+    reason = reason.strip().lower()
+    for rule in rules:
+        if rule["match"] == "exact" and rule["value"] == reason:
+            return _url(rule["icon"])
+    for rule in rules:
+        if rule["match"] == "contains" and rule["value"] in reason:
+            return _url(rule["icon"])
+    return None
+
+
+def test_default_rules_match_the_if_elif_chain():
+    rules = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8"))
+    resolver = StampIconResolver(rules, _url)
+    reasons = [
+        "Signup Bonus", " signup bonus ", "signup bonus extra", "CDL Finals", "Classic Win",
+        "win the classic cdl", "Normal meetup", "stamps owed", "LCCGOWA", "Beta tester",
+        "newyear26 party", "Birthday", "awards25", "CDEX", "Community Day", "", "winner beta",
+    ]
+    for reason in reasons:
+        assert resolver.resolve(reason) == _if_elif_chain(rules, reason), reason
+
+
+def test_rule_order_beats_position_in_the_reason():
+    resolver = StampIconResolver([
+        {"match": "contains", "value": "win", "icon": "icons/win.png"},
+        {"match": "contains", "value": "classic", "icon": "icons/classic.png"},
+    ], _url)
+    assert resolver.resolve("Classic win") == "/static/icons/win.png"
+    assert resolver.resolve("classic") == "/static/icons/classic.png"
+    assert resolver.resolve(None) is None
+
+
+def test_invalid_rules_are_skipped_and_absolute_icons_pass_through():
+    resolver = StampIconResolver([
+        {"match": "regex", "value": "a.*", "icon": "icons/regex.png"},
+        {"match": "contains", "value": "", "icon": "icons/empty.png"},
+        {"match": "contains", "value": "raid", "icon": ""},
+        {"value": "raid", "icon": "https://cdn.test/raid.png"},
+        {"match": "EXACT", "value": "(c++)", "icon": "icons/cpp.png"},
+    ], _url)
+    assert resolver.resolve("a raid") == "https://cdn.test/raid.png"
+    assert resolver.resolve("(C++)") == "/static/icons/cpp.png"
+    assert resolver.resolve("abc") is None
+
+
+def test_icon_urls_are_built_once():
+    built = []
+    resolver = StampIconResolver([{"match": "contains", "value": "cdl", "icon": "icons/cdl.png"}],
+                                 lambda path: built.append(path) or _url(path))
+    for _ in range(3):
+        resolver.resolve("cdl")
+        resolver.icon_url("icons/tickstamp.png")
+    assert built == ["icons/cdl.png", "icons/tickstamp.png"]
+
+
+def test_registry_reloads_on_change_and_keeps_the_last_good_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"match": "contains", "value": "raid", "icon": "icons/raid.png"}]))
+    registry = StampIconRegistry(_url, path)
+    first = registry.resolver()
+    assert registry.resolver() is first
+    assert first.resolve("Raid Hour") == "/static/icons/raid.png"
+
+    path.write_text(json.dumps([{"match": "contains", "value": "raid", "icon": "icons/raid2.png"}]))
+    os.utime(path, (1, 1))
+    assert registry.resolver().resolve("Raid Hour") == "/static/icons/raid2.png"
+
+    path.write_text("[not json")
+    os.utime(path, (2, 2))
+    assert registry.resolver().resolve("Raid Hour") == "/static/icons/raid2.png"
+
+
+def test_missing_rules_file_resolves_nothing(tmp_path):
+    registry = StampIconRegistry(_url, tmp_path / "missing.json")
+    assert registry.resolver().resolve("cdl") is None
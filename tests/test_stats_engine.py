@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from rdab.stats_engine import StatsEngine
+
+NOW = datetime.now(timezone.utc)
+FAR_FUTURE = NOW + timedelta(days=365)
+
+
+def _iso(days_ago):
+    return (NOW - timedelta(days=days_ago)).isoformat()
+
+
+class Source:
+    """Mutable Supabase stand-in; set ``fail`` to make every loader return None."""
+
+    def __init__(self, events, attendance, accounts=()):
+        self.events = [dict(row) for row in events]
+        self.attendance = [dict(row) for row in attendance]
+        self.accounts = [dict(row) for row in accounts]
+        self.fail = False
+        self.attendance_calls = []
+
+    def load_events(self):
+        return None if self.fail else [dict(row) for row in self.events]
+
+    def load_attendance(self, event_ids):
+        self.attendance_calls.append(event_ids)
+        if self.fail:
+            return None
+        wanted = None if event_ids is None else {str(eid).lower() for eid in event_ids}
+        return [dict(row) for row in self.attendance
+                if wanted is None or str(row["event_id"]).lower() in wanted]
+
+    def load_accounts(self):
+        return None if self.fail else [dict(row) for row in self.accounts]
+
+    def engine(self, **options):
+        options.setdefault("delta_seconds", 0)
+        options.setdefault("rebuild_seconds", 3600)
+        return StatsEngine(self.load_events, self.load_attendance, self.load_accounts, **options)
+
+
+def _checkin(event_id, user, status="CHECKED_IN"):
+    return {"event_id": event_id, "campfire_username": user, "display_name": user.title(), "rsvp_status": status}
+
+
+EVENTS = [
+    {"event_id": "OLD1", "name": "Old meetup", "start_time": "2023-02-10T10:00:00Z"},
+    {"event_id": "OLD2", "name": "Older meetup", "start_time": "2023-05-10T10:00:00Z"},
+    {"event_id": "HOT1", "name": "Last week", "start_time": _iso(3)},
+    {"event_id": "BAD", "name": "No date", "start_time": "sometime soon"},
+    {"event_id": "NONE", "name": "Missing date", "start_time": None},
+]
+ATTENDANCE = [
+    _checkin("OLD1", "ash"), _checkin("OLD1", "misty"), _checkin("OLD1", "brock", "GOING"),
+    _checkin("OLD2", "ash"),
+    _checkin("HOT1", "misty"),
+    _checkin("BAD", "ash"), _checkin("NONE", "misty"),
+]
+
+
+def _summary(engine, group="month", start=None):
+    return engine.summarize(start, FAR_FUTURE, group, lambda value: value or "Standard")
+
+
+def _rollups(summary):
+    return {
+        "growth": list(zip(summary["growth_labels"], summary["growth_events"], summary["growth_attend"])),
+        "events": dict(summary["counts_by_event"]),
+        "trainers": dict(summary["counts_by_trainer"]),
+        "rsvps": dict(summary["rsvp_totals"]),
+        "top_trainers": summary["top_trainers"],
+    }
+
+
+def test_rebuild_groups_dated_events_and_drops_undated_ones():
+    engine = Source(EVENTS, ATTENDANCE).engine()
+    summary = _summary(engine, "quarter")
+    assert summary["filtered_event_ids"] == ["hot1", "old2", "old1"]
+    assert summary["growth_labels"][:2] == ["Q1 2023", "Q2 2023"]
+    assert "Unknown" not in summary["growth_labels"]
+    assert dict(summary["counts_by_event"]) == {"old1": 2, "old2": 1, "hot1": 1}
+    assert dict(summary["counts_by_trainer"]) == {"ash": 2, "misty": 2}
+    assert summary["rsvp_totals"]["old1"] == 3
+    # Undated events stay out of the rollups but are still rows in the table.
+    assert summary["events_count"] == 5
+    assert summary["attendance_count"] == len(ATTENDANCE)
+
+
+def test_ranged_summary_only_counts_events_in_range():
+    engine = Source(EVENTS, ATTENDANCE).engine()
+    summary = _summary(engine, start=NOW - timedelta(days=30))
+    assert summary["filtered_event_ids"] == ["hot1"]
+    assert dict(summary["counts_by_trainer"]) == {"misty": 1}
+    assert summary["growth_events"] == [1]
+
+
+def test_hot_window_deltas_match_a_full_rebuild():
+    source = Source(EVENTS, ATTENDANCE)
+    engine = source.engine()
+    _summary(engine)
+
+    source.attendance += [_checkin("HOT1", "ash"), _checkin("HOT1", "gary", "GOING")]
+    source.attendance = [
+        row for row in source.attendance if (row["event_id"], row["campfire_username"]) != ("HOT1", "misty")
+    ]
+    source.events.append({"event_id": "HOT2", "name": "Tomorrow", "start_time": _iso(-1)})
+    source.attendance.append(_checkin("HOT2", "misty", "GOING"))
+    source.events.append({"event_id": "BAD2", "name": "Still no date", "start_time": "tbd"})
+
+    incremental = {group: _summary(engine, group) for group in StatsEngine.GROUP_KEYS}
+    # Only the hot window was re-pulled.
+    assert source.attendance_calls[0] is None
+    assert all(sorted(call) == ["HOT1", "HOT2"] for call in source.attendance_calls[1:])
+
+    for group, summary in incremental.items():
+        assert _rollups(summary) == _rollups(_summary(source.engine(), group)), group
+    assert incremental["month"]["events_count"] == 7
+    assert dict(incremental["month"]["counts_by_event"]) == {"old1": 2, "old2": 1, "hot1": 1}
+
+
+def test_trainer_without_check_ins_left_drops_out_of_the_rankings():
+    source = Source(EVENTS[2:3], [_checkin("HOT1", "gary")])
+    engine = source.engine()
+    assert _summary(engine)["top_trainers"] == [{"trainer": "Gary", "count": 1}]
+    source.attendance = []
+    assert _summary(engine)["top_trainers"] == []
+    assert _summary(engine)["growth_attend"] == [0]
+
+
+def test_failed_reload_keeps_serving_the_previous_rollups():
+    source = Source(EVENTS, ATTENDANCE)
+    engine = source.engine()
+    before = _rollups(_summary(engine))
+    source.fail = True
+    engine.invalidate()
+    assert _rollups(_summary(engine)) == before
+
+
+def test_cold_start_failure_serves_empty_stats():
+    source = Source(EVENTS, ATTENDANCE)
+    source.fail = True
+    summary = _summary(source.engine())
+    assert summary["filtered_event_ids"] == []
+    assert summary["events_count"] == 0
+
+
+@pytest.mark.parametrize("stamps, label", [(0, "0–4"), (7, "5–9"), (12, "10–19"), (40, "20+")])
+def test_record_account_moves_the_trainer_between_stamp_bins(stamps, label):
+    source = Source(EVENTS, ATTENDANCE, [{"trainer_username": "Ash", "account_type": "Standard", "stamps": 3}])
+    engine = source.engine()
+    _summary(engine)
+    engine.record_account("ASH", stamps=stamps, account_type="Admin")
+    summary = _summary(engine)
+    assert dict(zip(summary["stamp_labels"], summary["stamp_counts"]))[label] == 1
+    assert dict(zip(summary["account_labels"], summary["account_counts"])) == {"Admin": 1}
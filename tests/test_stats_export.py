@@ -0,0 +1,23 @@
+import pytest
+
+import app
+
+
+def _rows_then_failure(table):
+    yield {"event_id": "A1", "name": "Community Day", "tags": ["raid"]}
+    yield {"event_id": "B2", "name": "Raid Hour", "extra": "dropped"}
+    raise RuntimeError("statement timeout")
+
+
+def test_csv_export_marks_and_aborts_a_failed_stream(monkeypatch):
+    monkeypatch.setattr(app, "_export_rows", _rows_then_failure)
+    chunks = []
+    with pytest.raises(RuntimeError):
+        for chunk in app._stream_stats_csv("events"):
+            chunks.append(chunk)
+    assert "".join(chunks).splitlines() == [
+        "event_id,name,tags",
+        'A1,Community Day,"[""raid""]"',
+        "B2,Raid Hour,",
+        "# events export failed after 2 rows",
+    ]
@@ -0,0 +1,73 @@
+import pytest
+
+import app
+from rdab.cache import TTLCache
+from tests.supabase_stub import StubSupabase
+
+
+@pytest.fixture
+def sheet1(monkeypatch):
+    client = StubSupabase({"sheet1": [
+        {"trainer_username": "AshK", "stamps": 3},
+        {"trainer_username": "Misty", "stamps": 5},
+        {"trainer_username": "Brock", "stamps": 1},
+    ]})
+    monkeypatch.setattr(app, "supabase", client)
+    monkeypatch.setattr(app, "TRAINER_PROFILE_CACHE", TTLCache(maxsize=2, ttl=60))
+    return client
+
+
+def _fetches(client):
+    return len(client.calls_to("sheet1", "select"))
+
+
+def test_one_fetch_per_request_then_served_from_the_worker_cache(sheet1):
+    with app.app.test_request_context():
+        assert app.find_user("ashk")[1]["stamps"] == 3
+        assert app.find_user("ASHK ")[1]["stamps"] == 3
+    with app.app.test_request_context():
+        assert app.find_user("AshK")[1]["stamps"] == 3
+    assert _fetches(sheet1) == 1
+
+
+def test_callers_get_copies_of_cached_records(sheet1):
+    app.find_user("AshK")[1]["stamps"] = 99
+    assert app.find_user("AshK")[1]["stamps"] == 3
+
+
+def test_worker_cache_evicts_least_recently_used(sheet1):
+    app.find_user("AshK")
+    app.find_user("Misty")
+    app.find_user("AshK")
+    app.find_user("Brock")  # maxsize 2: Misty goes
+    assert _fetches(sheet1) == 3
+    app.find_user("AshK")
+    assert _fetches(sheet1) == 3
+    app.find_user("Misty")
+    assert _fetches(sheet1) == 4
+
+
+def test_entries_expire_after_the_ttl(sheet1, monkeypatch):
+    monkeypatch.setattr(app, "TRAINER_PROFILE_CACHE", TTLCache(maxsize=8, ttl=0))
+    app.find_user("AshK")
+    app.find_user("AshK")
+    assert _fetches(sheet1) == 2
+
+
+def test_invalidate_drops_worker_and_request_copies(sheet1):
+    with app.app.test_request_context():
+        app.find_user("AshK")
+        sheet1.tables["sheet1"][0]["stamps"] = 4
+        assert app.find_user("AshK")[1]["stamps"] == 3
+
+        app.invalidate_trainer_record(" ashk ")
+        assert app.find_user("AshK")[1]["stamps"] == 4
+    assert _fetches(sheet1) == 2
+
+
+def test_fresh_lookups_bypass_and_refill_the_caches(sheet1):
+    app.find_user("AshK")
+    sheet1.tables["sheet1"][0]["stamps"] = 10
+    assert app.find_user("AshK", fresh=True)[1]["stamps"] == 10
+    assert app.find_user("AshK")[1]["stamps"] == 10
+    assert _fetches(sheet1) == 2
@@ -0,0 +1,122 @@
+import time
+
+import pytest
+
+import app
+from rdab.unread_counts import UnreadCounter
+from tests.supabase_stub import StubSupabase
+
+
+class Recount:
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+        self.calls = []
+
+    def __call__(self, trainer):
+        self.calls.append(trainer)
+        return self.counts.get(trainer.lower(), 0)
+
+
+def test_get_recounts_once_then_serves_nudged_count():
+    recount = Recount({"ash": 3})
+    counter = UnreadCounter(recount, reconcile_seconds=300, timer=False)
+    assert counter.get("Ash") == 3
+    counter.record_read("ash")
+    counter.record_sent("ALL")
+    counter.record_sent("ASH ")
+    assert counter.get("ash") == 4
+    assert recount.calls == ["Ash"]
+
+
+def test_nudges_for_unknown_trainers_are_ignored():
+    counter = UnreadCounter(Recount(), timer=False)
+    counter.record_unread("misty")
+    counter.record_sent("ALL")
+    assert len(counter) == 0
+
+
+def test_failed_recount_keeps_last_value():
+    counts = {"ash": 2}
+    counter = UnreadCounter(lambda trainer: counts.get(trainer), reconcile_seconds=0, timer=False)
+    assert counter.get("ash") == 2
+    counts["ash"] = None
+    assert counter.get("ash") == 2
+    assert counter.get("brock") == 0
+
+
+def test_size_is_bounded_least_recently_read_first_out():
+    counter = UnreadCounter(Recount(), maxsize=2, timer=False)
+    counter.get("ash")
+    counter.get("brock")
+    counter.get("ash")
+    counter.get("misty")
+    assert len(counter) == 2
+    assert counter.reconcile_due() == 0  # both fresh
+    assert set(counter._counts) == {"ash", "misty"}
+
+
+def test_reconcile_due_recounts_stale_entries_and_drops_idle_trainers():
+    recount = Recount({"ash": 1, "brock": 5})
+    counter = UnreadCounter(recount, reconcile_seconds=60, idle_seconds=600, timer=False)
+    counter.get("Ash")
+    counter.get("brock")
+    now = time.monotonic()
+    counter._counts["ash"][1] = now - 40     # due: older than half the window
+    counter._counts["brock"][2] = now - 700  # nobody looked for a while
+
+    recount.counts["ash"] = 7
+    assert counter.reconcile_due() == 1
+    assert recount.calls[-1] == "Ash"
+    assert "brock" not in counter._counts
+    assert counter.get("ash") == 7
+
+
+def test_timer_reconciles_in_the_background():
+    recount = Recount({"ash": 1})
+    counter = UnreadCounter(recount, reconcile_seconds=0.2)
+    assert counter.get("ash") == 1
+    recount.counts["ash"] = 4
+    deadline = time.monotonic() + 3
+    while counter._counts["ash"][0] != 4 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert counter._counts["ash"][0] == 4
+
+
+@pytest.fixture
+def badge(monkeypatch):
+    """app.INBOX_UNREAD primed with a count of 3 for ash."""
+    counter = UnreadCounter(lambda trainer: 3, timer=False)
+    monkeypatch.setattr(app, "INBOX_UNREAD", counter)
+    counter.get("ash")
+    return counter
+
+
+def test_hiding_unread_messages_counts_as_reading_them(badge, monkeypatch):
+    monkeypatch.setattr(app, "USE_NOTIFICATION_RECEIPTS", False)
+    monkeypatch.setattr(app, "supabase", StubSupabase({"notifications": [
+        {"id": "n1", "read_by": None, "metadata": {}},
+        {"id": "n2", "read_by": ["Ash"], "metadata": {}},
+        {"id": "n3", "read_by": None, "metadata": {"hidden_for": ["ash"]}},
+    ]}))
+    outcome = app._apply_inbox_bulk_action(["n1", "n2", "n3"], "Ash", "delete")
+    assert outcome == {"n1": True, "n2": True, "n3": True}
+    assert badge.get("ash") == 2  # only n1 was unread and visible
+
+    assert app._handle_notification_bulk_action("n1", "Ash", "delete")
+    assert badge.get("ash") == 2
+
+
+def test_hiding_unread_messages_counts_as_reading_them_with_receipts(badge, monkeypatch):
+    monkeypatch.setattr(app, "USE_NOTIFICATION_RECEIPTS", True)
+    monkeypatch.setattr(app, "supabase", StubSupabase({
+        "notifications": [{"id": "n1"}, {"id": "n2"}, {"id": "n3"}],
+        "notification_receipts": [
+            {"notification_id": "n2", "trainer": "ash", "read_at": "2024-01-01", "hidden_at": None},
+            {"notification_id": "n3", "trainer": "ash", "read_at": None, "hidden_at": "2024-01-01"},
+        ],
+    }))
+    app._apply_inbox_bulk_action(["n1", "n2", "n3"], "Ash", "delete")
+    assert badge.get("ash") == 2
+
+    assert app._handle_notification_bulk_action("n1", "Ash", "delete")
+    assert badge.get("ash") == 2
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app
+from rdab.upcoming_events import UpcomingEvents
+from tests.supabase_stub import StubSupabase
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _iso(hours):
+    return (NOW + timedelta(hours=hours)).isoformat()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    client = StubSupabase({"events": [
+        {"id": 1, "event_id": "past", "name": "Yesterday", "start_time": _iso(-24)},
+        {"id": 2, "event_id": "later", "name": "Next week", "start_time": _iso(24 * 7)},
+        {"id": 3, "event_id": "soon", "name": "Tomorrow", "start_time": _iso(24), "end_time": _iso(27)},
+        {"id": 4, "event_id": "tbd", "name": "No date", "start_time": None},
+    ]})
+    monkeypatch.setattr(app, "supabase", client)
+    monkeypatch.setattr(app, "USE_SUPABASE", True)
+    app.invalidate_read_cache("events")
+    yield client
+    app.invalidate_read_cache("events")
+
+
+def test_only_future_rows_are_fetched_in_start_order(stub):
+    events = app._load_upcoming_supabase_events()
+    assert [event["event_id"] for event in events] == ["soon", "later"]
+    [(_, _, filters)] = stub.calls_to("events", "select")
+    assert any(label.startswith("start_time=gte.") for label in filters)
+    assert events[0]["end"] - events[0]["start"] == timedelta(hours=3)
+    assert events[1]["end"] - events[1]["start"] == timedelta(hours=2)  # default length
+
+
+def test_upcoming_rows_are_cached_between_calls(stub):
+    app._upcoming_supabase_events()
+    app._upcoming_supabase_events()
+    assert len(stub.calls_to("events", "select")) == 1
+
+    app.invalidate_read_cache("events")
+    app._upcoming_supabase_events()
+    assert len(stub.calls_to("events", "select")) == 2
+
+
+def test_fetch_failure_serves_nothing_rather_than_erroring(stub):
+    stub.failures["events"] = RuntimeError("timeout")
+    assert app._upcoming_supabase_events() == []
+
+
+def _event(event_id, start_hours, length_hours=2):
+    start = NOW + timedelta(hours=start_hours)
+    return {"event_id": event_id, "start": start, "end": start + timedelta(hours=length_hours)}
+
+
+def test_cutoff_is_reapplied_to_cached_lists():
+    remote = [_event("a", 1), _event("c", 5)]
+    local = [_event("b", 3), _event("gone", -1)]
+    upcoming = UpcomingEvents(lambda: remote, lambda: local)
+    assert [e["event_id"] for e in upcoming.events(now=NOW)] == ["a", "b", "c"]
+    # An hour and a half later "a" has started: it drops out without a refetch.
+    assert [e["event_id"] for e in upcoming.events(now=NOW + timedelta(hours=1.5))] == ["b", "c"]
+    assert [e["event_id"] for e in upcoming.events(limit=1, now=NOW)] == ["a"]
+
+
+def test_callers_get_their_own_copies():
+    remote = [_event("a", 1)]
+    upcoming = UpcomingEvents(lambda: remote, lambda: None)
+    upcoming.events(now=NOW)[0]["extra"] = True
+    assert "extra" not in remote[0]
@@ -0,0 +1,66 @@
+import os
+from datetime import datetime, timezone
+
+from PIL import Image
+
+from rdab.uploads import process_image, sweep_spool, thumbnail_key, thumbnail_url, upload_object_key
+
+
+def test_object_keys_are_webp_only_for_decodable_images():
+    now = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert upload_object_key("My Photo.JPG", "catalog", now=now).startswith("catalog/My_Photo_20250102030405_")
+    assert upload_object_key("photo.jpg", "catalog", now=now).endswith(".webp")
+    assert upload_object_key("receipt.pdf", "", now=now).endswith(".pdf")
+
+
+def test_thumbnail_url_only_rewrites_pipeline_keys():
+    key = upload_object_key("a.png", "catalog")
+    url = f"https://cdn.test/storage/v1/object/public/catalog/{key}?v=1"
+    assert thumbnail_url(url) == f"https://cdn.test/storage/v1/object/public/catalog/{thumbnail_key(key)}?v=1"
+    assert "/thumbs/" in thumbnail_url(url)
+    assert thumbnail_url("https://cdn.test/catalog/legacy.png") == "https://cdn.test/catalog/legacy.png"
+    assert thumbnail_url(None) is None
+
+
+def test_process_image_orients_strips_and_bounds(tmp_path):
+    source = tmp_path / "upload"
+    img = Image.new("RGB", (300, 100), "red")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90° clockwise when displayed
+    exif[0x010F] = "PhoneMaker"
+    img.save(source, "JPEG", exif=exif.tobytes())
+
+    result = process_image(source, object_key="catalog/a_20250102030405_0123abcd.webp",
+                           max_dimension=200, thumb_dimension=50)
+    assert result.content_type == "image/webp"
+    assert (result.width, result.height) == (67, 200)
+    out = tmp_path / "out.webp"
+    out.write_bytes(result.data)
+    with Image.open(out) as stored:
+        assert stored.size == (67, 200)
+        assert not stored.getexif()
+    thumb = tmp_path / "thumb.webp"
+    thumb.write_bytes(result.thumbnail)
+    with Image.open(thumb) as stored:
+        assert max(stored.size) == 50
+
+
+def test_undecodable_upload_is_stored_as_is(tmp_path):
+    source = tmp_path / "upload"
+    source.write_bytes(b"not an image")
+    result = process_image(source, object_key="catalog/a_20250102030405_0123abcd.webp",
+                           content_type="image/heic")
+    assert result.data == b"not an image"
+    assert result.content_type == "image/heic"
+    assert result.thumbnail is None
+
+
+def test_sweep_spool_removes_only_stale_uploads(tmp_path):
+    now = 1_700_000_000
+    stale, fresh, other = tmp_path / "a.upload", tmp_path / "b.upload", tmp_path / "notes.txt"
+    for path, age in ((stale, 7200), (fresh, 60), (other, 7200)):
+        path.write_bytes(b"x")
+        os.utime(path, (now - age, now - age))
+    assert sweep_spool(tmp_path, 3600, now=now) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["b.upload", "notes.txt"]
+    assert sweep_spool(tmp_path / "missing", 3600) == 0